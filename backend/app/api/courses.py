@@ -71,7 +71,7 @@ async def get_course_detail(
 ):
     """Get course details"""
     # Try cache
-    cache_key = CacheKeys.course_detail(course_id)
+    cache_key = CacheKeys.course_detail_raw(course_id)
     cached = await cache.get(cache_key)
     
     if cached:
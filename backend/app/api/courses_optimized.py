@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
 from typing import List, Optional
 import logging
 
-from app.cache import cache, CacheKeys, CacheTTL
+from app.cache import cache, CacheKeys, CacheTags, CacheTTL, MISSING, TOMBSTONE
 from app.db_optimization import db_optimizer
 from app.schemas_dynamodb import CourseResponse, CourseCreate
 from app.auth import get_current_user
@@ -71,7 +71,7 @@ async def list_courses_optimized(
         result = [CourseResponse(**course) for course in courses]
         
         # Store in cache for next request
-        await cache.set(cache_key, result, CacheTTL.COURSE_LIST)
+        await cache.set(cache_key, result, CacheTTL.COURSE_LIST, tags=[CacheTags.semester(semester_id)])
         
         return result[skip:skip + limit]
         
@@ -89,9 +89,12 @@ async def get_course_detail_optimized(course_id: str):
     """
     
     # Try cache first
-    cache_key = CacheKeys.course_detail(course_id)
-    cached = await cache.get(cache_key)
+    cache_key = CacheKeys.course_detail_raw(course_id)
+    cached = await cache.get(cache_key, negative=True)
     
+    if cached is MISSING:
+        logger.info(f"Cache HIT (negative): course {course_id}")
+        raise HTTPException(status_code=404, detail="Course not found")
     if cached:
         logger.info(f"Cache HIT: course {course_id}")
         return CourseResponse(**cached)
@@ -104,6 +107,7 @@ async def get_course_detail_optimized(course_id: str):
         response = table.get_item(Key={'course_id': course_id})
         
         if 'Item' not in response:
+            await cache.set_missing(cache_key)
             raise HTTPException(status_code=404, detail="Course not found")
         
         course = response['Item']
@@ -144,6 +148,9 @@ async def create_course_optimized(
         
         table.put_item(Item=course_dict)
         
+        # Clear a "not found" tombstone for this id right away
+        await cache.delete(CacheKeys.course_detail_raw(course_dict['course_id']))
+        
         # Invalidate cache in background (non-blocking)
         background_tasks.add_task(
             invalidate_course_caches,
@@ -183,7 +190,7 @@ async def update_course_optimized(
         table.put_item(Item=course_dict)
         
         # Write-through cache: Update cache immediately
-        cache_key = CacheKeys.course_detail(course_id)
+        cache_key = CacheKeys.course_detail_raw(course_id)
         await cache.set(cache_key, course_dict, CacheTTL.COURSE_DETAIL)
         
         # Invalidate list caches in background
@@ -216,18 +223,10 @@ async def get_courses_batch_optimized(course_ids: str):
             detail="Maximum 100 courses per batch request"
         )
     
-    # Check cache first for each ID
-    cached_courses = []
-    missing_ids = []
-    
-    for course_id in ids:
-        cache_key = CacheKeys.course_detail(course_id)
-        cached = await cache.get(cache_key)
-        
-        if cached:
-            cached_courses.append(cached)
-        else:
-            missing_ids.append(course_id)
+    # Check cache first for all IDs (one MGET); known-missing ids are skipped
+    cached = await cache.get_many([CacheKeys.course_detail_raw(cid) for cid in ids], negative=True)
+    cached_courses = [c for c in cached.values() if c is not MISSING]
+    missing_ids = [cid for cid in ids if CacheKeys.course_detail_raw(cid) not in cached]
     
     logger.info(f"Batch fetch: {len(cached_courses)} cached, {len(missing_ids)} missing")
     
@@ -236,11 +235,14 @@ async def get_courses_batch_optimized(course_ids: str):
         keys = [{'course_id': {'S': cid}} for cid in missing_ids]
         db_courses = await db_optimizer.batch_get_items('Courses', keys)
         
-        # Cache the fetched courses
-        for course in db_courses:
-            cache_key = CacheKeys.course_detail(course['course_id'])
-            await cache.set(cache_key, course, CacheTTL.COURSE_DETAIL)
-            cached_courses.append(course)
+        # Cache the fetched courses and tombstones for ids not found (one pipeline)
+        entries = {CacheKeys.course_detail_raw(cid): (TOMBSTONE, CacheTTL.NEGATIVE) for cid in missing_ids}
+        entries.update({
+            CacheKeys.course_detail_raw(course['course_id']): (course, CacheTTL.COURSE_DETAIL)
+            for course in db_courses
+        })
+        await cache.set_many(entries)
+        cached_courses.extend(db_courses)
     
     return [CourseResponse(**c) for c in cached_courses]
 
@@ -273,13 +275,15 @@ async def get_popular_courses_optimized(
         expression_values={':sid': {'N': str(semester_id)}}
     )
     
-    # Batch fetch enrollment counts
+    # Batch fetch enrollment counts (one MGET)
     course_ids = [c['course_id'] for c in courses]
+    cached_counts = await cache.get_many([CacheKeys.enrollment_count(cid) for cid in course_ids])
     enrollment_counts = {}
+    fresh_counts = {}
     
     for cid in course_ids:
         count_key = CacheKeys.enrollment_count(cid)
-        count = await cache.get(count_key)
+        count = cached_counts.get(count_key)
         
         if count is None:
             # Fallback: Query enrollments table
@@ -290,11 +294,13 @@ async def get_popular_courses_optimized(
                 expression_values={':cid': {'S': cid}}
             )
             count = len(enrollments)
-            # Cache count
-            await cache.set(count_key, count, CacheTTL.ENROLLMENT_LIST)
+            fresh_counts[count_key] = (count, CacheTTL.ENROLLMENT_LIST)
         
         enrollment_counts[cid] = count
     
+    # Cache computed counts (one pipeline)
+    await cache.set_many(fresh_counts)
+    
     # Sort by enrollment count
     sorted_courses = sorted(
         courses,
@@ -305,7 +311,7 @@ async def get_popular_courses_optimized(
     result = [CourseResponse(**c) for c in sorted_courses]
     
     # Cache for 15 minutes (longer TTL for expensive computation)
-    await cache.set(cache_key, result, CacheTTL.POPULAR_COURSES)
+    await cache.set(cache_key, result, CacheTTL.POPULAR_COURSES, tags=[CacheTags.semester(semester_id)])
     
     return result
 
@@ -313,9 +319,10 @@ async def get_popular_courses_optimized(
 # Background task helper
 async def invalidate_course_caches(semester_id: int):
     """
-    Invalidate all course list caches for a semester
+    Invalidate all course list caches for a semester (keys tagged with it,
+    plus a pattern delete for keys written before tagging)
     Runs in background to not block response
     """
-    pattern = f"courses:semester:{semester_id}*"
-    deleted = await cache.delete_pattern(pattern)
+    deleted = await cache.invalidate_tag(CacheTags.semester(semester_id))
+    deleted += await cache.delete_pattern(f"courses:semester:{semester_id}*")
     logger.info(f"Invalidated {deleted} cache entries for semester {semester_id}")
@@ -1,52 +1,233 @@
 """
 API Routes - Courses (DynamoDB Implementation)
 """
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, Request, status, Depends
 from typing import Optional, List
 import uuid
 from datetime import datetime
 
-from app.dynamodb import get_item, put_item, scan_items, query_items, update_item, delete_item, Tables, db
 from app.auth import get_current_user
+from app.concurrency import CapacityExceeded
+from app.cache import cache, cached, CacheKeys, CacheTags, CacheTTL
+from app.catalog import catalog
+from app.course_import import import_courses
+from app.course_repository import course_repository, section_summary, with_availability
+from app.prerequisites import parse_prerequisites, save_prerequisites, validate_prerequisites, PrerequisiteCycleError
+from app.rollover import rollover_semester, RolloverError
+from app.seat_engine import seat_engine
 from app.schemas_dynamodb import TokenData
-from boto3.dynamodb.conditions import Key, Attr
 
 router = APIRouter(prefix="/api/courses", tags=["Courses"])
 
 
+def course_list_key(semester: Optional[str] = None) -> str:
+    return CacheKeys.course_list(semester) if semester else CacheKeys.course_list_all()
+
+
+def list_tags(semester: Optional[str] = None) -> List[str]:
+    """Tags for a course list key: its semester, or 'all' for the all-courses list"""
+    return [CacheTags.semester(semester or 'all')]
+
+
+@cached(course_list_key, ttl=CacheTTL.COURSE_LIST, stale_ttl=CacheTTL.STALE, tags=list_tags)
+async def load_course_list(semester: Optional[str] = None) -> List[dict]:
+    """Catalog document for a semester (or all active courses), one recompute per key at a time"""
+    courses = await catalog.read(semester)
+    if courses is None:
+        # Not materialized yet: GSI query (or scan without semester) + store
+        courses = await catalog.rebuild(semester)
+    return courses
+
+
+# Unknown ids are cached as None for NEGATIVE seconds, so repeated lookups skip DynamoDB
+@cached(
+    CacheKeys.course_detail,
+    ttl=CacheTTL.COURSE_DETAIL,
+    stale_ttl=CacheTTL.STALE,
+    negative_ttl=CacheTTL.NEGATIVE,
+    tags=lambda course_id: [CacheTags.course(course_id)]
+)
+async def load_course(course_id: str) -> Optional[dict]:
+    """Course bundle (sections with schedules); None if not found"""
+    return await course_repository.get_course(course_id)
+
+
 @router.get("")
 async def list_courses(semester: Optional[str] = None):
-    """List all courses, optionally filtered by semester"""
+    """
+    List all courses, optionally filtered by semester
+    Served from the materialized catalog (one Query); built on first miss
+    """
+    cache_key = course_list_key(semester)
+    seats_key = CacheKeys.catalog_seats(semester)
+    # List entry and seat overlay in one MGET
+    values = await cache.get_many([cache_key, seats_key])
     try:
-        if semester:
-            # Use GSI index for fast semester queries
-            table = db.get_table(Tables.COURSES)
-            response = table.query(
-                IndexName='semester-index',
-                KeyConditionExpression=Key('semester').eq(semester),
-                FilterExpression=Attr('is_active').eq(True)
-            )
-            courses = response.get('Items', [])
-        else:
-            # If no semester filter, scan all courses
-            # Note: Consider requiring semester parameter for production
-            courses = await scan_items(Tables.COURSES)
-            courses = [c for c in courses if c.get('is_active', True)]
-        
-        return courses
+        courses = await load_course_list.from_entry(cache.as_entry(values.get(cache_key)), semester)
+    except CapacityExceeded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to load courses: {str(e)}")
+    
+    # Seat counts change with every enrollment - overlay them live
+    return await attach_section_availability(courses, seats_key, values.get(seats_key))
 
 
 @router.get("/{course_id}")
 async def get_course(course_id: str):
-    """Get course details by ID"""
-    course = await get_item(Tables.COURSES, {'course_id': course_id})
+    """Get course details by ID, with sections and their schedules"""
+    cache_key = CacheKeys.course_detail(course_id)
+    seats_key = CacheKeys.course_seats(course_id)
+    # Detail entry and seat overlay in one MGET
+    values = await cache.get_many([cache_key, seats_key])
+    course = await load_course.from_entry(cache.as_entry(values.get(cache_key)), course_id)
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
     
+    return (await attach_section_availability([course], seats_key, values.get(seats_key)))[0]
+
+
+@router.post("/{course_id}/sections")
+async def create_section(
+    course_id: str,
+    section_data: dict,
+    current_user: TokenData = Depends(get_current_user)
+):
+    """Add a section with its own seat counter to a course (admin only)"""
+    if current_user.user_type != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can create sections"
+        )
+    
+    course = await course_repository.get_course(course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     
-    return course
+    new_section = {
+        'section_id': str(uuid.uuid4()),
+        'course_id': course_id,
+        'semester_id': course.get('semester'),
+        'section_code': section_data.get('section_code', f"S{len(course['sections']) + 1}"),
+        'teacher_id': section_data.get('teacher_id', course.get('teacher_id')),
+        'max_students': section_data.get('max_students', course.get('max_students', 30)),
+        'enrolled_count': 0,
+        'is_active': True,
+        'created_at': datetime.utcnow().isoformat(),
+        'updated_at': datetime.utcnow().isoformat()
+    }
+    
+    if not await course_repository.save_section(new_section):
+        raise HTTPException(status_code=500, detail="Failed to create section")
+    
+    sections = [section_summary(s) for s in course['sections']] + [section_summary(new_section)]
+    await catalog.apply({**course, 'sections': sections})
+    await invalidate_course_caches(course_id, course.get('semester'))
+    
+    return new_section
+
+
+@router.put("/{course_id}/sections/{section_id}")
+async def update_section(
+    course_id: str,
+    section_id: str,
+    section_data: dict,
+    current_user: TokenData = Depends(get_current_user)
+):
+    """Update a section (admin only); capacity changes apply to the seat engine too"""
+    if current_user.user_type != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can update sections"
+        )
+    
+    section = await course_repository.get_section(section_id)
+    if not section or section.get('course_id') != course_id:
+        raise HTTPException(status_code=404, detail="Section not found")
+    
+    updates = {
+        'updated_at': datetime.utcnow().isoformat()
+    }
+    for field in ['section_code', 'teacher_id', 'max_students', 'is_active']:
+        if field in section_data:
+            updates[field] = section_data[field]
+    
+    # Conditional update: one round trip, 404 if the section was deleted meanwhile
+    try:
+        result = await course_repository.update_section(section_id, updates)
+    except CapacityExceeded:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update section: {str(e)}")
+    if result is None:
+        raise HTTPException(status_code=404, detail="Section not found")
+    
+    _, updated_section = result
+    if 'max_students' in updates:
+        await seat_engine.resize(course_id, section_id, updates['max_students'])
+    
+    course = await course_repository.get_course(course_id)
+    if course:
+        sections = [
+            section_summary(updated_section if s['section_id'] == section_id else s)
+            for s in course['sections']
+            if s['section_id'] != section_id or updated_section.get('is_active', True)
+        ]
+        await catalog.apply({**course, 'sections': sections})
+        await invalidate_course_caches(course_id, course.get('semester'))
+    
+    return updated_section
+
+
+@router.post("/rollover")
+async def rollover_semester_courses(
+    rollover_data: dict,
+    current_user: TokenData = Depends(get_current_user)
+):
+    """Clone a semester's courses and sections into a new semester (admin only)"""
+    if current_user.user_type != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can roll over semesters"
+        )
+    
+    source = rollover_data.get('source_semester')
+    target = rollover_data.get('target_semester')
+    if not source or not target:
+        raise HTTPException(status_code=400, detail="source_semester and target_semester are required")
+    
+    try:
+        result = await rollover_semester(source, target, force=bool(rollover_data.get('force')))
+    except RolloverError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return result.to_dict()
+
+
+@router.post("/import")
+async def import_courses_stream(
+    request: Request,
+    format: Optional[str] = None,
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Bulk import courses from a raw CSV (header row) or NDJSON request body (admin only)
+    The body is streamed; format comes from ?format= or the Content-Type.
+    Returns per-row errors and throughput statistics
+    """
+    if current_user.user_type != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can import courses"
+        )
+    
+    if format is None:
+        content_type = request.headers.get('content-type', '')
+        format = 'ndjson' if 'json' in content_type else 'csv'
+    if format not in ('csv', 'ndjson'):
+        raise HTTPException(status_code=400, detail="format must be csv or ndjson")
+    
+    result = await import_courses(request.stream(), format)
+    return result.to_dict()
 
 
 @router.post("")
@@ -82,8 +263,15 @@ async def create_course(
         'updated_at': datetime.utcnow().isoformat()
     }
     
+    # A new course has no dependents, so its prerequisites can't close a cycle
+    prerequisites = parse_prerequisites(course_data.get('prerequisites'))
+    
     # Save to DynamoDB
-    await put_item(Tables.COURSES, new_course)
+    await course_repository.create_course(new_course)
+    if prerequisites:
+        await save_prerequisites(course_id, prerequisites)
+    await catalog.apply(new_course)
+    await invalidate_course_caches(course_id, new_course['semester'])
     
     return new_course
 
@@ -101,11 +289,6 @@ async def update_course(
             detail="Only admins can update courses"
         )
     
-    # Check if course exists
-    course = await get_item(Tables.COURSES, {'course_id': course_id})
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-    
     # Update fields
     updates = {
         'updated_at': datetime.utcnow().isoformat()
@@ -117,11 +300,31 @@ async def update_course(
         if field in course_data:
             updates[field] = course_data[field]
     
-    # Update in DynamoDB
-    await update_item(Tables.COURSES, {'course_id': course_id}, updates)
+    prerequisites = None
+    if 'prerequisites' in course_data:
+        prerequisites = parse_prerequisites(course_data['prerequisites'])
+        try:
+            await validate_prerequisites(course_id, prerequisites)
+        except PrerequisiteCycleError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    # Conditional update: one round trip, 404 if the course does not exist
+    try:
+        result = await course_repository.update_course(course_id, updates)
+    except CapacityExceeded:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update course: {str(e)}")
+    if result is None:
+        raise HTTPException(status_code=404, detail="Course not found")
     
-    # Get updated course
-    updated_course = await get_item(Tables.COURSES, {'course_id': course_id})
+    course, updated_course = result
+    if prerequisites is not None:
+        await save_prerequisites(course_id, prerequisites)
+    if 'max_students' in updates:
+        await seat_engine.resize(course_id, None, updates['max_students'])
+    await catalog.apply(updated_course, previous_semester=course.get('semester'))
+    await invalidate_course_caches(course_id, course.get('semester'), updated_course.get('semester'))
     return updated_course
 
 
@@ -137,15 +340,74 @@ async def delete_course(
             detail="Only admins can delete courses"
         )
     
-    # Check if course exists
-    course = await get_item(Tables.COURSES, {'course_id': course_id})
-    if not course:
+    # Soft delete - set is_active to False (404 if the course does not exist)
+    try:
+        result = await course_repository.update_course(course_id, {
+            'is_active': False,
+            'updated_at': datetime.utcnow().isoformat()
+        })
+    except CapacityExceeded:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to delete course: {str(e)}")
+    if result is None:
         raise HTTPException(status_code=404, detail="Course not found")
     
-    # Soft delete - set is_active to False
-    await update_item(Tables.COURSES, {'course_id': course_id}, {
-        'is_active': False,
-        'updated_at': datetime.utcnow().isoformat()
-    })
+    course, deleted_course = result
+    await catalog.apply(deleted_course)
+    await invalidate_course_caches(course_id, course.get('semester'))
     
     return {"message": "Course deleted successfully"}
+
+
+async def invalidate_course_caches(course_id: str, *semesters: Optional[str]):
+    """
+    Drop cached detail (both key formats) and the catalog lists the course
+    appears in: the tagged keys, plus explicit deletes for keys written
+    before tagging
+    """
+    semesters = {s for s in semesters if s}
+    keys = [CacheKeys.course_detail(course_id), CacheKeys.course_detail_raw(course_id), CacheKeys.course_list_all()]
+    keys += [CacheKeys.course_list(s) for s in semesters]
+    await cache.delete(*keys)
+    await cache.invalidate_tag(
+        CacheTags.course(course_id),
+        *[t for s in [None, *semesters] for t in list_tags(s)]
+    )
+
+
+async def attach_section_availability(
+    courses: List[dict],
+    seats_key: Optional[str] = None,
+    seats: Optional[dict] = None
+) -> List[dict]:
+    """
+    Overlay live per-section seat counts (cached briefly under seats_key, or
+    passed in when the caller already read that key) and derive course
+    totals from sections, since catalog/detail copies lag enrollments
+    """
+    section_ids = [s['section_id'] for c in courses for s in c.get('sections', [])]
+    if not section_ids:
+        return courses
+    
+    if seats is None and seats_key:
+        seats = await cache.get(seats_key)
+    if seats is None:
+        seats = await course_repository.section_seats(section_ids)
+        if seats_key:
+            await cache.set(seats_key, seats, CacheTTL.SECTION_SLOTS)
+    
+    result = []
+    for course in courses:
+        if not course.get('sections'):
+            result.append(course)
+            continue
+        sections = [with_availability({**s, **seats.get(s['section_id'], {})}) for s in course['sections']]
+        result.append({
+            **course,
+            'sections': sections,
+            'enrolled_count': sum(int(s.get('enrolled_count') or 0) for s in sections),
+            'max_students': sum(int(s.get('max_students') or 0) for s in sections),
+            'available_slots': sum(s['available_slots'] for s in sections)
+        })
+    return result
@@ -1,16 +1,20 @@
 """
 API Routes - Enrollments (DynamoDB Implementation)
 """
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, Request, status, Depends
 from typing import List
 import uuid
 from datetime import datetime
 from boto3.dynamodb.conditions import Key
 
-from app.dynamodb import get_db, get_item, put_item, scan_items, update_item, delete_item, query_items, Tables, db
+from app.dynamodb import get_item, batch_get_items, put_item, scan_items, delete_item, query_items, Tables
 from app.auth import get_current_user
+from app.audit import audit_trail
+from app.concurrency import CapacityExceeded
+from app.course_repository import course_repository
+from app.prerequisites import prerequisite_graph, load_dynamodb_edges, PASSING_GRADES
+from app.seat_engine import seat_engine, RESERVED, FULL, DUPLICATE, REJECTED_STATUS
 from app.schemas_dynamodb import TokenData
-from boto3.dynamodb.conditions import Attr
 
 router = APIRouter(prefix="/api/enrollments", tags=["Enrollments"])
 
@@ -18,13 +22,24 @@ router = APIRouter(prefix="/api/enrollments", tags=["Enrollments"])
 @router.post("")
 async def enroll_course(
     enrollment_data: dict,
+    request: Request,
     current_user: TokenData = Depends(get_current_user)
 ):
-    """Enroll in a course"""
+    """Enroll in a course, or in a specific section of it (section_id)"""
+    section_id = enrollment_data.get('section_id')
     course_id = enrollment_data.get('course_id')
     
+    section = None
+    if section_id:
+        section = await course_repository.get_section(section_id)
+        if not section or not section.get('is_active', True):
+            raise HTTPException(status_code=404, detail="Section not found")
+        if course_id and course_id != section['course_id']:
+            raise HTTPException(status_code=400, detail="Section does not belong to this course")
+        course_id = section['course_id']
+    
     if not course_id:
-        raise HTTPException(status_code=400, detail="course_id is required")
+        raise HTTPException(status_code=400, detail="course_id or section_id is required")
     
     # Check if course exists
     course = await get_item(Tables.COURSES, {'course_id': course_id})
@@ -34,22 +49,30 @@ async def enroll_course(
     if not course.get('is_active', False):
         raise HTTPException(status_code=400, detail="Course is not active")
     
-    # Check if already enrolled using GSI
-    table = db.get_table(Tables.ENROLLMENTS)
-    response = table.query(
-        IndexName='student-semester-index',
-        KeyConditionExpression=Key('student_id').eq(current_user.user_id),
-        FilterExpression=Attr('course_id').eq(course_id)
+    # Student's enrollments via GSI (duplicate check + completed courses)
+    my_enrollments = await query_items(
+        Tables.ENROLLMENTS,
+        Key('student_id').eq(current_user.user_id),
+        index_name='student-semester-index'
     )
-    if response.get('Items'):
+    if any(e.get('course_id') == course_id and e.get('status') != REJECTED_STATUS for e in my_enrollments):
         raise HTTPException(status_code=400, detail="Already enrolled in this course")
     
-    # Check capacity
-    enrolled_count = course.get('enrolled_count', 0)
-    max_students = course.get('max_students', 30)
+    # Check prerequisites against the cached graph (no per-prerequisite queries)
+    graph = await prerequisite_graph.get(load_dynamodb_edges)
+    completed = {
+        e['course_id']: e.get('final_grade')
+        for e in my_enrollments
+        if e.get('status') == 'completed' or e.get('grade') in PASSING_GRADES
+    }
+    prereq_met, prereq_error = graph.check(course_id, completed)
+    if not prereq_met:
+        raise HTTPException(status_code=400, detail=prereq_error)
     
-    if enrolled_count >= max_students:
-        raise HTTPException(status_code=400, detail="Course is full")
+    # Check capacity (fast fail; the seat reservation below is authoritative)
+    seats = section or course
+    if seats.get('enrolled_count', 0) >= seats.get('max_students', 30):
+        raise HTTPException(status_code=400, detail="Section is full" if section else "Course is full")
     
     # Create enrollment
     enrollment_id = str(uuid.uuid4())
@@ -63,16 +86,27 @@ async def enroll_course(
         'enrollment_date': datetime.utcnow().isoformat(),
         'created_at': datetime.utcnow().isoformat()
     }
+    if section_id:
+        new_enrollment['section_id'] = section_id
     
-    # Save enrollment
-    await put_item(Tables.ENROLLMENTS, new_enrollment)
+    # Redis seat engine: one atomic script call; the enrollment is persisted in the background
+    outcome = await seat_engine.reserve(new_enrollment)
+    if outcome == DUPLICATE:
+        raise HTTPException(status_code=400, detail="Already enrolled in this course")
+    if outcome == FULL:
+        raise HTTPException(status_code=400, detail="Section is full" if section else "Course is full")
     
-    # Update course enrolled count
-    await update_item(Tables.COURSES, {'course_id': course_id}, {
-        'enrolled_count': enrolled_count + 1,
-        'updated_at': datetime.utcnow().isoformat()
-    })
+    if outcome != RESERVED:
+        # Reserve a seat atomically; the condition guards against concurrent enrollments
+        if not await course_repository.reserve_seat(course_id, section_id):
+            raise HTTPException(status_code=400, detail="Section is full" if section else "Course is full")
+        
+        # Save enrollment (release the seat if it fails)
+        if not await put_item(Tables.ENROLLMENTS, new_enrollment):
+            await course_repository.release_seat(course_id, section_id)
+            raise HTTPException(status_code=500, detail="Failed to save enrollment")
     
+    audit_trail.record('registered', new_enrollment, request)
     return new_enrollment
 
 
@@ -83,26 +117,23 @@ async def get_my_enrollments(
     """Get current user's enrollments"""
     try:
         # Use GSI to query enrollments by student_id
-        table = db.get_table(Tables.ENROLLMENTS)
-        response = table.query(
-            IndexName='student-semester-index',
-            KeyConditionExpression=Key('student_id').eq(current_user.user_id)
+        my_enrollments = await query_items(
+            Tables.ENROLLMENTS,
+            Key('student_id').eq(current_user.user_id),
+            index_name='student-semester-index'
         )
-        my_enrollments = response.get('Items', [])
         
-        # Enrich with course data
-        result = []
-        for enrollment in my_enrollments:
-            course_id = enrollment.get('course_id')
-            course = await get_item(Tables.COURSES, {'course_id': course_id})
-            
-            enrollment_with_course = {
-                **enrollment,
-                'course': course
-            }
-            result.append(enrollment_with_course)
+        # Enrich with course data (one BatchGetItem for all distinct courses)
+        course_ids = {e['course_id'] for e in my_enrollments if e.get('course_id')}
+        courses = await batch_get_items(Tables.COURSES, [{'course_id': c} for c in course_ids])
+        courses_by_id = {c['course_id']: c for c in courses}
         
-        return result
+        return [
+            {**enrollment, 'course': courses_by_id.get(enrollment.get('course_id'))}
+            for enrollment in my_enrollments
+        ]
+    except CapacityExceeded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to load enrollments: {str(e)}")
 
@@ -110,11 +141,15 @@ async def get_my_enrollments(
 @router.delete("/{enrollment_id}")
 async def drop_course(
     enrollment_id: str,
+    request: Request,
     current_user: TokenData = Depends(get_current_user)
 ):
     """Drop a course (delete enrollment)"""
-    # Check if enrollment exists
+    # Check if enrollment exists (or is reserved in the seat engine but not persisted yet)
     enrollment = await get_item(Tables.ENROLLMENTS, {'enrollment_id': enrollment_id})
+    queued = None
+    if not enrollment:
+        enrollment = queued = await seat_engine.find_queued(enrollment_id)
     
     if not enrollment:
         raise HTTPException(status_code=404, detail="Enrollment not found")
@@ -128,18 +163,24 @@ async def drop_course(
     
     course_id = enrollment.get('course_id')
     
+    if queued:
+        # Withdraw the reservation before it is written; its seat goes back in Redis
+        if not await seat_engine.cancel(enrollment_id):
+            raise HTTPException(status_code=409, detail="Enrollment is still being saved, try again")
+        audit_trail.record('dropped', enrollment, request)
+        return {"message": "Course dropped successfully"}
+    
     # Delete enrollment
     await delete_item(Tables.ENROLLMENTS, {'enrollment_id': enrollment_id})
+    if enrollment.get('status') == REJECTED_STATUS:
+        # Turned down by the seat engine: it never held a seat
+        audit_trail.record('dropped', enrollment, request)
+        return {"message": "Course dropped successfully"}
     
-    # Update course enrolled count
-    course = await get_item(Tables.COURSES, {'course_id': course_id})
-    if course:
-        enrolled_count = course.get('enrolled_count', 0)
-        if enrolled_count > 0:
-            await update_item(Tables.COURSES, {'course_id': course_id}, {
-                'enrolled_count': enrolled_count - 1,
-                'updated_at': datetime.utcnow().isoformat()
-            })
+    # Give the seat back to the section (or course) it was taken from
+    await course_repository.release_seat(course_id, enrollment.get('section_id'))
+    await seat_engine.release(course_id, enrollment.get('section_id'), enrollment.get('student_id'))
+    audit_trail.record('dropped', enrollment, request)
     
     return {"message": "Course dropped successfully"}
 
@@ -162,16 +203,12 @@ async def get_course_enrollments(
     # Filter by course
     course_enrollments = [e for e in all_enrollments if e.get('course_id') == course_id]
     
-    # Enrich with student data
-    result = []
-    for enrollment in course_enrollments:
-        student_id = enrollment.get('student_id')
-        student = await get_item(Tables.USERS, {'user_id': student_id})
-        
-        enrollment_with_student = {
-            **enrollment,
-            'student': student
-        }
-        result.append(enrollment_with_student)
+    # Enrich with student data (one BatchGetItem for all distinct students)
+    student_ids = {e['student_id'] for e in course_enrollments if e.get('student_id')}
+    students = await batch_get_items(Tables.USERS, [{'user_id': s} for s in student_ids])
+    students_by_id = {s['user_id']: s for s in students}
     
-    return result
+    return [
+        {**enrollment, 'student': students_by_id.get(enrollment.get('student_id'))}
+        for enrollment in course_enrollments
+    ]
@@ -0,0 +1,133 @@
+"""
+Transparent compression of large item attributes
+Attributes declared in ATTRIBUTE_CODECS (app/dynamodb.py) are stored as
+compressed Binary once they exceed ATTRIBUTE_COMPRESSION_MIN_BYTES, which
+keeps items under the 4 KB read-unit boundary. Values carry a 2-byte header
+(marker + codec id) so readers decode them regardless of the write setting.
+"""
+import logging
+import zlib
+from typing import Any, Dict, Iterable, Optional
+
+from app.config import settings
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+CODEC_MARKER = 0xC1
+
+
+class AttributeCodec:
+    """Base codec: bytes in, bytes out"""
+    name = "identity"
+    codec_id = 0
+
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def decompress(self, data: bytes) -> bytes:
+        return data
+
+
+class ZlibCodec(AttributeCodec):
+    name = "zlib"
+    codec_id = 1
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, 6)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class ZstdCodec(AttributeCodec):
+    name = "zstd"
+    codec_id = 2
+
+    def compress(self, data: bytes) -> bytes:
+        return zstandard.ZstdCompressor(level=3).compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zstandard.ZstdDecompressor().decompress(data)
+
+
+CODECS = {codec.name: codec for codec in (ZlibCodec(), ZstdCodec())}
+CODECS_BY_ID = {codec.codec_id: codec for codec in CODECS.values()}
+
+
+def get_codec(name: str) -> AttributeCodec:
+    """Resolve codec by name, falling back to zlib if zstandard is missing"""
+    if name == "zstd" and zstandard is None:
+        logger.warning("zstandard not installed, using zlib for attribute compression")
+        name = "zlib"
+    return CODECS[name]
+
+
+def _as_bytes(value: Any) -> Optional[bytes]:
+    """Raw bytes of a Binary attribute (boto3 wraps them in types.Binary)"""
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    raw = getattr(value, 'value', None)
+    if isinstance(raw, (bytes, bytearray)):
+        return bytes(raw)
+    return None
+
+
+def encode_value(value: Any, codec_name: str, min_bytes: int = None) -> Any:
+    """Compress a string value if it is large enough and actually shrinks"""
+    if not isinstance(value, str):
+        return value
+
+    min_bytes = settings.ATTRIBUTE_COMPRESSION_MIN_BYTES if min_bytes is None else min_bytes
+    data = value.encode('utf-8')
+    if len(data) < min_bytes:
+        return value
+
+    codec = get_codec(codec_name)
+    compressed = bytes([CODEC_MARKER, codec.codec_id]) + codec.compress(data)
+    return compressed if len(compressed) < len(data) else value
+
+
+def decode_value(value: Any) -> Any:
+    """Inverse of encode_value; non-compressed values pass through"""
+    data = _as_bytes(value)
+    if data is None or len(data) < 2 or data[0] != CODEC_MARKER:
+        return value
+
+    codec = CODECS_BY_ID.get(data[1])
+    if codec is None:
+        logger.warning(f"Unknown attribute codec id {data[1]}, returning raw value")
+        return value
+    return codec.decompress(data[2:]).decode('utf-8')
+
+
+def encode_attributes(codecs: Dict[str, str], item: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of item with declared attributes compressed (no-op when disabled)"""
+    if not codecs or not settings.ATTRIBUTE_COMPRESSION_ENABLED:
+        return item
+
+    encoded = dict(item)
+    for name, codec_name in codecs.items():
+        if name in encoded:
+            encoded[name] = encode_value(encoded[name], codec_name)
+    return encoded
+
+
+def decode_attributes(
+    codecs: Dict[str, str],
+    item: Optional[Dict[str, Any]],
+    only: Optional[Iterable[str]] = None
+) -> Optional[Dict[str, Any]]:
+    """Decode declared attributes in place; `only` limits decoding to those names"""
+    if not codecs or not item:
+        return item
+
+    names = codecs.keys() if only is None else [n for n in only if n in codecs]
+    for name in names:
+        if name in item:
+            item[name] = decode_value(item[name])
+    return item
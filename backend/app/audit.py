@@ -0,0 +1,283 @@
+"""
+Write-behind enrollment audit trail
+Enroll/drop append a record to an in-memory queue and to a local spool
+file, and return without another synchronous DynamoDB write. A background
+task flushes the queue into EnrollmentHistory with BatchWriteItem once
+AUDIT_BATCH_SIZE records are queued or AUDIT_FLUSH_INTERVAL_SECONDS pass.
+
+Spool: records are appended (one JSON line each) to the active segment
+file. A flush rotates to a new segment, writes the queued records and
+deletes the older segments once they are stored; records that fail are
+re-queued (and re-spooled). If the write itself errors, the whole batch is
+re-queued and the older segments are kept. Re-queued records beyond
+AUDIT_MAX_QUEUE_SIZE are dropped and logged. On startup, leftover segments
+are replayed, so records survive crashes and restarts. Writes are keyed by
+history_id, so a replay after a partial flush is idempotent.
+
+Each worker process claims its own spool slot directory with an exclusive
+file lock, and adopts segments of slots no live worker holds.
+"""
+import asyncio
+import glob
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from app.cache import json_default
+from app.config import settings
+from app.dynamodb import ParallelBatchWriter, Tables
+from app.metrics import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: single slot, no locking
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SPOOL_PATTERN = "audit-{:012d}.spool"
+MAX_SLOTS = 64
+
+
+def client_info(request) -> Dict[str, Optional[str]]:
+    """Client IP (first X-Forwarded-For hop behind the ALB) and user agent"""
+    if request is None:
+        return {'ip_address': None, 'user_agent': None}
+    forwarded = request.headers.get('x-forwarded-for')
+    ip_address = forwarded.split(',')[0].strip() if forwarded else (
+        request.client.host if request.client else None
+    )
+    return {
+        'ip_address': ip_address,
+        'user_agent': (request.headers.get('user-agent') or '')[:200] or None
+    }
+
+
+class AuditTrail:
+    """Queue + spool + periodic BatchWriteItem flush"""
+
+    def __init__(self, spool_dir: str = None):
+        self.root_dir = spool_dir or settings.AUDIT_SPOOL_DIR
+        self.spool_dir = self.root_dir
+        self._slot_lock = None
+        self._queue: List[Dict[str, Any]] = []
+        self._segment = 0
+        self._spool = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # ----- Recording -----
+
+    def record(
+        self,
+        action: str,
+        enrollment: Dict[str, Any],
+        request=None,
+        note: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Queue an audit record (non-blocking); returns it"""
+        if not settings.AUDIT_ENABLED:
+            return {}
+        entry = {
+            'history_id': str(uuid.uuid4()),
+            'enrollment_id': enrollment.get('enrollment_id'),
+            'timestamp': int(time.time() * 1000),
+            'action': action,
+            'student_id': enrollment.get('student_id'),
+            'course_id': enrollment.get('course_id'),
+            'section_id': enrollment.get('section_id'),
+            'note': note,
+            **client_info(request)
+        }
+        entry = {k: v for k, v in entry.items() if v is not None}
+        self._append(entry)
+        return entry
+
+    def _append(self, entry: Dict[str, Any]):
+        self._queue.append(entry)
+        self._spool_write([entry])
+        metrics.gauge('audit_queue_depth', len(self._queue))
+        if self._wakeup and len(self._queue) >= settings.AUDIT_BATCH_SIZE:
+            self._wakeup.set()
+
+    def _spool_write(self, entries: List[Dict[str, Any]]):
+        if not self._spool:
+            return
+        try:
+            self._spool.writelines(json.dumps(e, default=json_default) + "\n" for e in entries)
+            self._spool.flush()
+        except OSError as e:
+            logger.error(f"Audit spool write failed: {e}")
+
+    def _requeue(self, entries: List[Dict[str, Any]], spool: bool):
+        """Put unsent records back ahead of newer ones, keeping the queue under AUDIT_MAX_QUEUE_SIZE"""
+        room = max(settings.AUDIT_MAX_QUEUE_SIZE - len(self._queue), 0)
+        if len(entries) > room:
+            dropped = len(entries) - room
+            logger.error(f"Audit queue full: dropping {dropped} unsent records")
+            metrics.incr('audit_records_dropped_total', dropped)
+            entries = entries[dropped:]
+        if spool:
+            self._spool_write(entries)
+        self._queue = entries + self._queue
+
+    # ----- Spool segments -----
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.spool_dir, SPOOL_PATTERN.format(segment))
+
+    def _segments(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.spool_dir, "audit-*.spool")))
+
+    def _open_segment(self, segment: int):
+        if self._spool:
+            os.fsync(self._spool.fileno())
+            self._spool.close()
+        self._segment = segment
+        self._spool = open(self._segment_path(segment), 'a', encoding='utf-8')
+
+    def _try_lock(self, slot_dir: str):
+        """Exclusive non-blocking lock on a slot; None if another worker holds it"""
+        os.makedirs(slot_dir, exist_ok=True)
+        handle = open(os.path.join(slot_dir, '.lock'), 'w')
+        if fcntl is None:
+            return handle
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return handle
+        except OSError:
+            handle.close()
+            return None
+
+    def _claim_slot(self):
+        """Take the lowest free slot and adopt segments of abandoned slots"""
+        for slot in range(MAX_SLOTS):
+            slot_dir = os.path.join(self.root_dir, f"slot-{slot}")
+            handle = self._try_lock(slot_dir)
+            if handle:
+                self.spool_dir, self._slot_lock = slot_dir, handle
+                break
+        else:
+            raise RuntimeError(f"No free audit spool slot under {self.root_dir}")
+
+        if fcntl is None:
+            return
+        for slot_dir in glob.glob(os.path.join(self.root_dir, "slot-*")):
+            if slot_dir == self.spool_dir:
+                continue
+            handle = self._try_lock(slot_dir)
+            if not handle:
+                continue    # live worker
+            for path in sorted(glob.glob(os.path.join(slot_dir, "audit-*.spool"))):
+                adopted = f"audit-{0:012d}-{os.path.basename(slot_dir)}-{os.path.basename(path)}"
+                os.replace(path, os.path.join(self.spool_dir, adopted))
+            handle.close()
+
+    def _replay(self) -> int:
+        """Load records left in spool segments by a previous process"""
+        replayed = 0
+        for path in self._segments():
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        self._queue.append(json.loads(line))
+                        replayed += 1
+                    except ValueError:
+                        # Torn last line from a crash mid-write
+                        logger.warning(f"Skipping corrupt audit spool line in {path}")
+        return replayed
+
+    # ----- Flushing -----
+
+    async def flush(self) -> int:
+        """Write queued records to EnrollmentHistory; returns records stored"""
+        async with self._flush_lock:
+            if not self._queue:
+                return 0
+
+            batch, self._queue = self._queue, []
+            sealed = self._segments()
+            if self._spool:
+                self._open_segment(self._segment + 1)
+
+            writer = ParallelBatchWriter(Tables.ENROLLMENT_HISTORY, concurrency=4)
+            try:
+                async with writer:
+                    for entry in batch:
+                        await writer.put(entry)
+            except Exception:
+                # Nothing is known to be stored: keep the sealed segments
+                self._requeue(batch, spool=False)
+                metrics.gauge('audit_queue_depth', len(self._queue))
+                raise
+
+            # Failed records go back on the queue (and into the new segment)
+            self._requeue(writer.failed, spool=True)
+            for path in sealed:
+                if self._spool and path == self._spool.name:
+                    continue
+                os.remove(path)
+
+            metrics.incr('audit_records_written_total', writer.written)
+            if writer.failed:
+                metrics.incr('audit_records_failed_total', len(writer.failed))
+            metrics.gauge('audit_queue_depth', len(self._queue))
+            return writer.written
+
+    async def _run(self):
+        """Background loop: flush on batch size or interval"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), settings.AUDIT_FLUSH_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Audit flush error: {e}")
+
+    async def start(self):
+        """Replay leftover spool segments and start the flush loop"""
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._claim_slot()
+
+        replayed = self._replay()
+        if replayed:
+            logger.info(f"Replaying {replayed} spooled audit records")
+        segments = self._segments()
+        last = int(os.path.basename(segments[-1])[6:18]) if segments else 0
+        self._open_segment(last + 1)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the loop and flush what is queued (spool keeps anything unsent)"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Final audit flush failed, records kept in spool: {e}")
+        if self._spool:
+            self._spool.close()
+            self._spool = None
+        if self._slot_lock:
+            self._slot_lock.close()
+            self._slot_lock = None
+
+
+# Global audit trail
+audit_trail = AuditTrail()
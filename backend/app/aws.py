@@ -118,6 +118,16 @@ class S3Client:
             logger.error(f"S3 upload error: {e}")
             return None
     
+    async def download_file(self, object_name: str, file_path: str) -> bool:
+        """Download file from S3"""
+        try:
+            self.client.download_file(self.bucket_name, object_name, file_path)
+            logger.info(f"File downloaded from S3: {object_name}")
+            return True
+        except ClientError as e:
+            logger.error(f"S3 download error: {e}")
+            return False
+    
     async def get_presigned_url(self, object_name: str, expiration: int = 3600) -> str:
         """Generate presigned URL for temporary access"""
         try:
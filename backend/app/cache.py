@@ -3,15 +3,116 @@ Redis cache management
 Handles caching strategy for high-traffic operations
 """
 import redis.asyncio as redis
-from typing import Optional, Any, Callable
+from typing import Optional, Any, Awaitable, Callable, Dict, Iterable, List, Set, Tuple
+import asyncio
 import json
 import logging
 import hashlib
+import math
+import random
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from functools import wraps
+from app.cache_codec import decode, encode, json_default
 from app.config import settings
+from app.local_cache import LocalCache
+from app.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+# Keys per MGET / pipeline / SCAN round trip
+BULK_CHUNK_SIZE = 500
+
+# @cached stampede protection: recompute lock TTL and how long other callers
+# wait for the lock holder's value
+RECOMPUTE_LOCK_TTL = 30
+RECOMPUTE_WAIT_SECONDS = 2.0
+RECOMPUTE_POLL_SECONDS = 0.05
+
+# Negative entry ("looked up, doesn't exist") stored in place of a value
+TOMBSTONE = {'__missing__': True}
+
+
+class _Missing:
+    """Sentinel returned by get(..., negative=True) for a negative entry"""
+    
+    def __bool__(self):
+        return False
+    
+    def __repr__(self):
+        return 'MISSING'
+
+
+MISSING = _Missing()
+
+# Distributed lock: acquire retries back off between these bounds (seconds)
+LOCK_BACKOFF_MIN_SECONDS = 0.005
+LOCK_BACKOFF_MAX_SECONDS = 0.1
+# Fence counters outlive any lease by far (but don't pile up for dead locks)
+FENCE_TTL_FACTOR = 100
+FENCE_TTL_MIN_SECONDS = 86400
+
+# KEYS: lock, fence counter  ARGV: token, ttl ms, fence ttl ms -> fence number, or 0 if held
+# release/renew act only while the lock still holds our token
+LOCK_SCRIPTS = {
+    'acquire': """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    local fence = redis.call('INCR', KEYS[2])
+    redis.call('PEXPIRE', KEYS[2], ARGV[3])
+    return fence
+end
+return 0
+""",
+    'release': """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+""",
+    'renew': """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+""",
+}
+
+
+@dataclass(frozen=True)
+class LockToken:
+    """A held lock: owner token for release/renew, fence to reject stale holders downstream"""
+    key: str
+    token: str
+    fence: int
+    ttl: int
+
+
+class LockNotAcquired(Exception):
+    """cache.lock() wait budget ran out"""
+
+
+# Tag sets outlive their members; refreshed on every tagged write
+TAG_TTL = 86400
+
+# Deletes every key listed in the tag sets (KEYS) and the sets themselves,
+# atomically; returns the deleted member keys (for L1 eviction)
+INVALIDATE_TAGS_SCRIPT = """
+local deleted = {}
+for _, tag in ipairs(KEYS) do
+    local members = redis.call('SMEMBERS', tag)
+    for i = 1, #members, 500 do
+        redis.call('DEL', unpack(members, i, math.min(i + 499, #members)))
+    end
+    for _, member in ipairs(members) do
+        deleted[#deleted + 1] = member
+    end
+    redis.call('DEL', tag)
+end
+return deleted
+"""
+
 
 class CacheTTL:
     """Cache TTL constants (seconds)"""
@@ -49,6 +150,13 @@ class RedisCache:
     def __init__(self):
         self.redis_client: Optional[redis.Redis] = None
         self.pool: Optional[redis.ConnectionPool] = None
+        self.instance_id = uuid.uuid4().hex
+        self.l1: Optional[LocalCache] = None
+        self._l1_listener: Optional[asyncio.Task] = None
+        self._invalidate_script = None
+        self._lock_scripts = None
+        self._refreshing: Set[str] = set()
+        self._refresh_tasks: Set[asyncio.Task] = set()
     
     async def connect(self):
         """Connect to Redis with connection pool"""
@@ -57,7 +165,7 @@ class RedisCache:
                 settings.REDIS_URL,
                 password=settings.REDIS_PASSWORD if settings.REDIS_PASSWORD else None,
                 max_connections=settings.REDIS_MAX_CONNECTIONS,
-                decode_responses=True,
+                decode_responses=False,     # values are binary (app/cache_codec.py)
                 socket_keepalive=True,
                 socket_connect_timeout=5,
             )
@@ -66,6 +174,14 @@ class RedisCache:
             # Test connection
             await self.redis_client.ping()
             logger.info("Redis connected successfully")
+            
+            if settings.L1_CACHE_ENABLED:
+                self.l1 = LocalCache(
+                    settings.L1_CACHE_MAX_ENTRIES,
+                    settings.L1_CACHE_MAX_BYTES,
+                    settings.L1_CACHE_TTLS
+                )
+                self._l1_listener = asyncio.create_task(self._listen_invalidations())
         except Exception as e:
             # Do not block app startup in development if Redis is unavailable
             logger.warning(f"Redis connection unavailable, continuing without cache: {e}")
@@ -74,6 +190,16 @@ class RedisCache:
     
     async def disconnect(self):
         """Close Redis connections"""
+        if self._l1_listener:
+            self._l1_listener.cancel()
+            try:
+                await self._l1_listener
+            except asyncio.CancelledError:
+                pass
+            self._l1_listener = None
+        self.l1 = None
+        for task in list(self._refresh_tasks):
+            task.cancel()
         if self.redis_client:
             await self.redis_client.close()
         if self.pool:
@@ -119,15 +245,29 @@ class RedisCache:
             return 0
     
     async def delete_pattern(self, pattern: str) -> int:
-        """Delete all keys matching pattern (e.g., 'courses:*')"""
+        """
+        Delete all keys matching pattern (e.g., 'courses:*')
+        Legacy fallback for untagged keys - walks the keyspace with SCAN (no
+        KEYS, so Redis isn't blocked). Prefer invalidate_tag.
+        """
+        if self.l1:
+            self.l1.evict(patterns=[pattern])
         if not self.redis_client:
             return 0
         
         try:
-            keys = await self.redis_client.keys(pattern)
-            if keys:
-                return await self.redis_client.delete(*keys)
-            return 0
+            if self.l1:
+                await self._broadcast_invalidation(patterns=[pattern])
+            deleted = 0
+            batch = []
+            async for key in self.redis_client.scan_iter(match=pattern, count=BULK_CHUNK_SIZE):
+                batch.append(key)
+                if len(batch) >= BULK_CHUNK_SIZE:
+                    deleted += await self.redis_client.delete(*batch)
+                    batch = []
+            if batch:
+                deleted += await self.redis_client.delete(*batch)
+            return deleted
         except Exception as e:
             logger.warning(f"Cache DELETE_PATTERN error for {pattern}: {e}")
             return 0
@@ -146,36 +286,286 @@ class RedisCache:
             logger.warning(f"Cache INCREMENT error for {key}: {e}")
             return 0
     
-    async def get(self, key: str) -> Optional[Any]:
-        """Get value from cache"""
-        try:
-            value = await self.redis_client.get(key)
-            if value:
-                return json.loads(value)
+    @staticmethod
+    def _unwrap(value: Any, negative: bool) -> Any:
+        if value == TOMBSTONE:
+            return MISSING if negative else None
+        return value
+    
+    async def get(self, key: str, negative: bool = False) -> Optional[Any]:
+        """
+        Get value from cache (L1 first when enabled)
+        Negative entries (set_missing) read as None, or as MISSING when
+        negative=True so callers can skip the database lookup.
+        """
+        if self.l1:
+            value = self.l1.get(key)
+            if value is not None:
+                return self._unwrap(value, negative)
+        
+        if not self.redis_client:
             return None
+        
+        try:
+            raw = await self.redis_client.get(key)
+            if not raw:
+                return None
+            value = decode(raw)
+            if self.l1:
+                # Remaining Redis TTL unknown here; the family TTL bounds staleness
+                self.l1.put(key, value, len(raw))
+            return self._unwrap(value, negative)
         except Exception as e:
             logger.error(f"Redis GET error for key {key}: {e}")
             return None
     
-    async def set(self, key: str, value: Any, ttl: int = 300) -> bool:
-        """Set value in cache with TTL (seconds)"""
+    async def set(self, key: str, value: Any, ttl: int = 300, tags: Iterable[str] = ()) -> bool:
+        """
+        Set value in cache with TTL (seconds); evicts the key from every L1.
+        Tags (see CacheTags) record the key for invalidate_tag.
+        """
+        if not self.redis_client:
+            return False
+        
         try:
-            serialized = json.dumps(value)
-            await self.redis_client.setex(key, ttl, serialized)
+            serialized = encode(value)
+            if tags:
+                async with self.redis_client.pipeline(transaction=True) as pipe:
+                    pipe.setex(key, ttl, serialized)
+                    self._tag(pipe, [key], tags, ttl)
+                    await pipe.execute()
+            else:
+                await self.redis_client.setex(key, ttl, serialized)
+            if self.l1:
+                self.l1.put(key, decode(serialized), len(serialized), ttl)
+                await self._broadcast_invalidation(keys=[key])
             return True
         except Exception as e:
             logger.error(f"Redis SET error for key {key}: {e}")
             return False
     
     async def delete(self, *keys: str) -> bool:
-        """Delete one or more keys"""
+        """Delete one or more keys (Redis and every instance's L1)"""
+        if self.l1:
+            self.l1.evict(keys)
+        if not self.redis_client or not keys:
+            return False
+        
         try:
             await self.redis_client.delete(*keys)
+            if self.l1:
+                await self._broadcast_invalidation(keys=list(keys))
             return True
         except Exception as e:
             logger.error(f"Redis DELETE error: {e}")
             return False
     
+    async def set_missing(self, key: str, ttl: int = None) -> bool:
+        """Record that key's entity doesn't exist (short-TTL tombstone; any set/delete clears it)"""
+        return await self.set(key, TOMBSTONE, ttl or CacheTTL.NEGATIVE)
+    
+    async def get_many(self, keys: List[str], negative: bool = False) -> Dict[str, Any]:
+        """
+        {key: value} for the keys that are cached - one MGET per chunk.
+        Negative entries are left out, or included as MISSING when negative=True.
+        """
+        found = await self._get_many(keys)
+        return {
+            key: self._unwrap(value, negative)
+            for key, value in found.items()
+            if negative or value != TOMBSTONE
+        }
+    
+    async def _get_many(self, keys: List[str]) -> Dict[str, Any]:
+        found: Dict[str, Any] = {}
+        if self.l1:
+            for key in keys:
+                value = self.l1.get(key)
+                if value is not None:
+                    found[key] = value
+        missing = [k for k in dict.fromkeys(keys) if k not in found]
+        if not missing or not self.redis_client:
+            return found
+        
+        try:
+            for start in range(0, len(missing), BULK_CHUNK_SIZE):
+                chunk = missing[start:start + BULK_CHUNK_SIZE]
+                for key, raw in zip(chunk, await self.redis_client.mget(chunk)):
+                    if not raw:
+                        continue
+                    found[key] = decode(raw)
+                    if self.l1:
+                        self.l1.put(key, found[key], len(raw))
+        except Exception as e:
+            logger.error(f"Redis MGET error for {len(missing)} keys: {e}")
+        return found
+    
+    async def set_many(
+        self,
+        entries: Dict[str, Tuple[Any, int]],
+        tags: Iterable[str] = (),
+        encoded: bool = False
+    ) -> int:
+        """
+        Set {key: (value, ttl)} with pipelined SETEX (all under tags); returns keys written.
+        encoded: values are already serialized bytes (codec output or plain JSON) and
+        are stored as-is, without a decode into L1.
+        """
+        if not self.redis_client or not entries:
+            return 0
+        
+        written = 0
+        items = list(entries.items())
+        try:
+            for start in range(0, len(items), BULK_CHUNK_SIZE):
+                chunk = items[start:start + BULK_CHUNK_SIZE]
+                serialized = [(key, value if encoded else encode(value), ttl) for key, (value, ttl) in chunk]
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    for key, raw, ttl in serialized:
+                        pipe.setex(key, ttl, raw)
+                    if tags:
+                        self._tag(pipe, [key for key, _, _ in serialized], tags, max(t for _, _, t in serialized))
+                    results = await pipe.execute()
+                written += sum(1 for r in results[:len(serialized)] if r)
+                if self.l1:
+                    for key, raw, ttl in serialized:
+                        if encoded:
+                            self.l1.evict([key])
+                        else:
+                            self.l1.put(key, decode(raw), len(raw), ttl)
+                    await self._broadcast_invalidation(keys=[key for key, _, _ in serialized])
+        except Exception as e:
+            logger.error(f"Redis pipelined SET error ({written}/{len(items)} written): {e}")
+        return written
+    
+    # ----- Soft-expiry entries (used by @cached) -----
+    
+    async def get_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Entry written by set_entry: {'v': value, 'delta': compute_seconds,
+        'exp': soft expiry (epoch)}; None if missing or not an entry
+        """
+        return self.as_entry(await self.get(key))
+    
+    @staticmethod
+    def as_entry(value: Any) -> Optional[Dict[str, Any]]:
+        """value if it is a set_entry entry (e.g. one read with get_many), else None"""
+        if isinstance(value, dict) and 'v' in value and 'exp' in value:
+            return value
+        return None
+    
+    async def set_entry(
+        self,
+        key: str,
+        value: Any,
+        ttl: int,
+        stale_ttl: int = 0,
+        delta: float = 0.0,
+        tags: Iterable[str] = ()
+    ) -> bool:
+        """Store value fresh for ttl seconds and servable stale for stale_ttl more"""
+        return await self.set(key, self.entry(value, ttl, delta), ttl + stale_ttl, tags)
+    
+    @staticmethod
+    def entry(value: Any, ttl: int, delta: float = 0.0) -> Dict[str, Any]:
+        """Entry as set_entry stores it, for bulk writers (set_many)"""
+        return {'v': value, 'delta': delta, 'exp': time.time() + ttl}
+    
+    def refresh_in_background(self, key: str, refresh: Callable[[], Awaitable[Any]]) -> bool:
+        """
+        Run refresh() for key in a background task, at most once at a time per
+        key: locally via the in-flight set, across instances via the recompute
+        lock. Returns False if a refresh was already in flight here.
+        """
+        if key in self._refreshing:
+            return False
+        self._refreshing.add(key)
+        
+        async def run():
+            try:
+                lock = await self.acquire_lock(CacheKeys.recompute_lock(key), RECOMPUTE_LOCK_TTL)
+                if not lock:
+                    return    # another instance is refreshing it
+                started = time.monotonic()
+                try:
+                    await refresh()
+                    metrics.incr('cache_refresh_total', result='ok')
+                except Exception as e:
+                    metrics.incr('cache_refresh_total', result='error')
+                    logger.warning(f"Background refresh failed for {key}: {e}")
+                finally:
+                    metrics.observe('cache_refresh_seconds', time.monotonic() - started)
+                    await self.release_lock(lock)
+            finally:
+                self._refreshing.discard(key)
+        
+        task = asyncio.create_task(run())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+        return True
+    
+    # ----- Tag-based invalidation -----
+    
+    @staticmethod
+    def _tag(pipe, keys: List[str], tags: Iterable[str], ttl: int):
+        """Queue SADD of keys into each tag set (on a pipeline)"""
+        for tag in tags:
+            pipe.sadd(tag, *keys)
+            pipe.expire(tag, max(ttl, TAG_TTL))
+    
+    async def invalidate_tag(self, *tags: str) -> int:
+        """Delete exactly the keys recorded under the tags (one atomic script); returns keys deleted"""
+        if not self.redis_client or not tags:
+            return 0
+        
+        try:
+            if self._invalidate_script is None:
+                self._invalidate_script = self.redis_client.register_script(INVALIDATE_TAGS_SCRIPT)
+            deleted = await self._invalidate_script(keys=list(tags))
+            keys = [k.decode() if isinstance(k, bytes) else k for k in deleted]
+            if self.l1 and keys:
+                self.l1.evict(keys)
+                await self._broadcast_invalidation(keys=keys)
+            return len(set(keys))
+        except Exception as e:
+            logger.warning(f"Cache INVALIDATE_TAG error for {tags}: {e}")
+            return 0
+    
+    # ----- L1 invalidation over pub/sub -----
+    
+    async def _broadcast_invalidation(self, keys=(), patterns=()):
+        """Tell other instances to evict keys/patterns from their L1"""
+        try:
+            message = json.dumps({'origin': self.instance_id, 'keys': list(keys), 'patterns': list(patterns)})
+            await self.redis_client.publish(settings.L1_CACHE_CHANNEL, message)
+        except Exception as e:
+            logger.warning(f"L1 invalidation publish failed: {e}")
+    
+    async def _listen_invalidations(self):
+        """Evict keys announced by other instances; clear L1 whenever the feed drops"""
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(settings.L1_CACHE_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get('type') != 'message':
+                        continue
+                    payload = json.loads(message['data'])
+                    if payload.get('origin') != self.instance_id:
+                        self.l1.evict(payload.get('keys', []), payload.get('patterns', []))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"L1 invalidation feed lost, clearing L1: {e}")
+            finally:
+                # Missed messages can't be replayed - start from empty
+                self.l1.clear()
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+            await asyncio.sleep(1)
+    
     async def increment(self, key: str) -> int:
         """Increment counter"""
         try:
@@ -200,21 +590,113 @@ class RedisCache:
             logger.error(f"Redis EXISTS error for key {key}: {e}")
             return False
     
-    async def acquire_lock(self, lock_key: str, ttl: int = 5) -> bool:
+    # ----- Fenced distributed lock -----
+    
+    async def acquire_lock(
+        self,
+        lock_key: str,
+        ttl: int = 5,
+        wait: float = 0,
+        raise_errors: bool = False
+    ) -> Optional[LockToken]:
         """
-        Acquire distributed lock using Redis
-        Returns True if lock acquired, False otherwise
+        Acquire distributed lock using Redis (SET NX PX with an owner token)
+        Retries with jittered exponential backoff for up to `wait` seconds.
+        Returns a LockToken (owner token + monotonically increasing fence
+        number) or None if the lock is held elsewhere / Redis is down.
+        raise_errors: Redis errors propagate instead of reading as None, so
+        callers can tell "held elsewhere" from "Redis unavailable".
         """
+        if not self.redis_client:
+            return None
+        
+        token = uuid.uuid4().hex
+        fence_ttl = max(ttl * FENCE_TTL_FACTOR, FENCE_TTL_MIN_SECONDS)
+        started = time.monotonic()
+        deadline = started + wait
+        delay = LOCK_BACKOFF_MIN_SECONDS
+        attempts = 0
         try:
-            # SET NX EX - Set if Not eXists with EXpiration
-            return await self.redis_client.set(lock_key, "1", nx=True, ex=ttl)
+            if self._lock_scripts is None:
+                self._lock_scripts = {name: self.redis_client.register_script(src) for name, src in LOCK_SCRIPTS.items()}
+            while True:
+                attempts += 1
+                fence = await self._lock_scripts['acquire'](
+                    keys=[lock_key, f"{lock_key}:fence"], args=[token, int(ttl * 1000), int(fence_ttl * 1000)]
+                )
+                if fence:
+                    waited = time.monotonic() - started
+                    metrics.incr('cache_lock_acquire_total', result='acquired' if attempts == 1 else 'acquired_after_wait')
+                    if attempts > 1:
+                        metrics.observe('cache_lock_wait_seconds', waited)
+                    return LockToken(lock_key, token, int(fence), ttl)
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    metrics.incr('cache_lock_acquire_total', result='timeout' if wait else 'contended')
+                    if wait:
+                        metrics.observe('cache_lock_wait_seconds', time.monotonic() - started)
+                    return None
+                await asyncio.sleep(min(remaining, random.uniform(delay / 2, delay)))
+                delay = min(delay * 2, LOCK_BACKOFF_MAX_SECONDS)
         except Exception as e:
             logger.error(f"Redis LOCK error for key {lock_key}: {e}")
+            metrics.incr('cache_lock_acquire_total', result='error')
+            if raise_errors:
+                raise
+            return None
+    
+    async def renew_lock(self, lock: LockToken, ttl: int = None) -> bool:
+        """Extend the lease if we still own the lock; False if it was lost"""
+        try:
+            renewed = await self._lock_scripts['renew'](
+                keys=[lock.key], args=[lock.token, int((ttl or lock.ttl) * 1000)]
+            )
+            if not renewed:
+                metrics.incr('cache_lock_lost_total', stage='renew')
+            return bool(renewed)
+        except Exception as e:
+            logger.error(f"Redis LOCK renew error for key {lock.key}: {e}")
             return False
     
-    async def release_lock(self, lock_key: str) -> bool:
-        """Release distributed lock"""
-        return await self.delete(lock_key)
+    async def release_lock(self, lock: Optional[LockToken]) -> bool:
+        """Release distributed lock - only if we still own it (compare-and-delete)"""
+        if lock is None or not self.redis_client:
+            return False
+        try:
+            released = await self._lock_scripts['release'](keys=[lock.key], args=[lock.token])
+            if not released:
+                # Lease expired and someone else may hold it now - leave theirs alone
+                metrics.incr('cache_lock_lost_total', stage='release')
+                logger.warning(f"Lock {lock.key} expired before release (fence {lock.fence})")
+            return bool(released)
+        except Exception as e:
+            logger.error(f"Redis UNLOCK error for key {lock.key}: {e}")
+            return False
+    
+    @asynccontextmanager
+    async def lock(self, lock_key: str, ttl: int = 5, wait: float = 0, renew: bool = False):
+        """
+        async with cache.lock(key, ttl=10, wait=0.5, renew=True) as lock: ...
+        Raises LockNotAcquired if the wait budget runs out. With renew, the
+        lease is extended every ttl/3 seconds until the block exits.
+        """
+        lock = await self.acquire_lock(lock_key, ttl, wait)
+        if lock is None:
+            raise LockNotAcquired(lock_key)
+        
+        renewer = None
+        if renew:
+            async def keep_alive():
+                while await self.renew_lock(lock):
+                    await asyncio.sleep(ttl / 3)
+            renewer = asyncio.create_task(keep_alive())
+        try:
+            yield lock
+        finally:
+            if renewer:
+                renewer.cancel()
+            await self.release_lock(lock)
 
 
 # Cache key patterns (from SYSTEM_DESIGN.md)
@@ -225,14 +707,32 @@ class CacheKeys:
     def course_list(semester_id: int) -> str:
         return f"courses:semester:{semester_id}"
     
+    @staticmethod
+    def course_list_all() -> str:
+        return "courses:all"
+    
     @staticmethod
     def course_detail(course_id: int) -> str:
+        """@cached entry for load_course (negatives via negative_ttl)"""
         return f"course:{course_id}"
     
+    @staticmethod
+    def course_detail_raw(course_id: int) -> str:
+        """Plain course dict or TOMBSTONE, for the routers that use get/set_missing"""
+        return f"course:raw:{course_id}"
+    
     @staticmethod
     def section_slots(section_id: int) -> str:
         return f"section:slots:{section_id}"
     
+    @staticmethod
+    def catalog_seats(semester: str = None) -> str:
+        return f"seats:semester:{semester}" if semester else "seats:all"
+    
+    @staticmethod
+    def course_seats(course_id: str) -> str:
+        return f"seats:course:{course_id}"
+    
     @staticmethod
     def student_enrollments(student_id: int) -> str:
         return f"student:enrollments:{student_id}"
@@ -244,6 +744,22 @@ class CacheKeys:
     @staticmethod
     def enrollment_lock(section_id: int) -> str:
         return f"lock:section:{section_id}"
+    
+    @staticmethod
+    def recompute_lock(cache_key: str) -> str:
+        return f"lock:recompute:{cache_key}"
+
+
+class CacheTags:
+    """Tag sets for invalidate_tag (each holds the keys written under it)"""
+    
+    @staticmethod
+    def semester(semester_id) -> str:
+        return f"tag:semester:{semester_id}"
+    
+    @staticmethod
+    def course(course_id: str) -> str:
+        return f"tag:course:{course_id}"
 
 
 # TTL Strategy (from SYSTEM_DESIGN.md)
@@ -254,11 +770,38 @@ class CacheTTL:
     SECTION_SLOTS = 30          # 30 seconds - frequently changes
     STUDENT_ENROLLMENTS = 60    # 1 minute - moderate changes
     SESSION_DATA = 1800         # 30 minutes - session timeout
+    NEGATIVE = 30               # 30 seconds - "doesn't exist" tombstones
+    STALE = 300                 # 5 minutes - served stale while a background refresh runs
 
 
-def cached(key_func: Callable, ttl: int = 300):
+def cached(
+    key_func: Callable,
+    ttl: int = 300,
+    beta: float = 1.0,
+    wait: float = RECOMPUTE_WAIT_SECONDS,
+    stale_ttl: int = 0,
+    negative_ttl: int = 0,
+    tags: Optional[Callable] = None
+):
     """
-    Decorator for automatic caching
+    Decorator for automatic caching, with stampede protection:
+    - one caller per key recomputes a miss (Redis lock); the others poll the
+      cache for up to `wait` seconds before computing themselves
+    - XFetch early refresh: a hit recomputes ahead of expiry with a
+      probability that grows as expiry nears, scaled by how long the value
+      took to compute (beta > 1 refreshes earlier); other callers keep
+      getting the current value meanwhile
+    - stale-while-revalidate (stale_ttl > 0): for stale_ttl seconds past
+      ttl the old value is returned immediately while one background
+      refresh (per key, across instances) replaces it
+    - negative caching (negative_ttl > 0): a None result is cached for
+      negative_ttl seconds instead of recomputing on every call
+    - without Redis (or when the lock can't be taken because Redis errors)
+      the value is computed directly; nobody could publish one to wait for
+    
+    Values are stored as RedisCache entries (see set_entry), tagged with
+    tags(*args, **kwargs) when given. func.from_entry(entry, *args) serves
+    an entry the caller already fetched (e.g. with get_many).
     
     Usage:
         @cached(lambda course_id: CacheKeys.course_detail(course_id), ttl=600)
@@ -267,26 +810,80 @@ def cached(key_func: Callable, ttl: int = 300):
             return result
     """
     def decorator(func: Callable):
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
-            # Generate cache key
-            cache_key = key_func(*args, **kwargs)
-            
-            # Try cache first
-            cached_value = await cache.get(cache_key)
-            if cached_value is not None:
+        async def recompute(cache_key: str, args, kwargs):
+            started = time.monotonic()
+            result = await func(*args, **kwargs)
+            key_tags = tags(*args, **kwargs) if tags else ()
+            if result is not None:
+                await cache.set_entry(cache_key, result, ttl, stale_ttl, time.monotonic() - started, key_tags)
+            elif negative_ttl:
+                await cache.set_entry(cache_key, None, negative_ttl, tags=key_tags)
+            return result
+        
+        async def locked_recompute(cache_key: str, args, kwargs, reason: str):
+            """Recompute if we get the lock (or Redis is unavailable); None (and False) if someone else is"""
+            if not cache.redis_client:
+                return await recompute(cache_key, args, kwargs), True
+            try:
+                lock = await cache.acquire_lock(
+                    CacheKeys.recompute_lock(cache_key), RECOMPUTE_LOCK_TTL, raise_errors=True
+                )
+            except Exception:
+                metrics.incr('cache_recompute_total', reason='lock_error')
+                return await recompute(cache_key, args, kwargs), True
+            if not lock:
+                return None, False
+            try:
+                metrics.incr('cache_recompute_total', reason=reason)
+                return await recompute(cache_key, args, kwargs), True
+            finally:
+                await cache.release_lock(lock)
+        
+        async def serve(cache_key: str, entry: Optional[Dict[str, Any]], args, kwargs):
+            if entry is not None:
+                now = time.time()
+                if now >= entry['exp']:
+                    # Past soft expiry but inside the stale window
+                    metrics.incr('cache_stale_served_total')
+                    cache.refresh_in_background(cache_key, lambda: recompute(cache_key, args, kwargs))
+                    return entry['v']
+                
+                # XFetch: now - delta * beta * ln(rand) >= expiry
+                early = now - entry.get('delta', 0) * beta * math.log(random.random() or 1e-12)
+                if early >= entry['exp']:
+                    result, ran = await locked_recompute(cache_key, args, kwargs, 'early')
+                    if ran:
+                        return result
                 logger.debug(f"Cache HIT: {cache_key}")
-                return cached_value
+                return entry['v']
             
-            # Cache miss - execute function
+            # Cache miss - one caller recomputes, the rest wait for its value
             logger.debug(f"Cache MISS: {cache_key}")
-            result = await func(*args, **kwargs)
+            result, ran = await locked_recompute(cache_key, args, kwargs, 'miss')
+            if ran:
+                return result
             
-            # Store in cache
-            if result is not None:
-                await cache.set(cache_key, result, ttl)
+            deadline = time.monotonic() + wait
+            while time.monotonic() < deadline:
+                await asyncio.sleep(RECOMPUTE_POLL_SECONDS)
+                entry = await cache.get_entry(cache_key)
+                if entry is not None:
+                    metrics.incr('cache_recompute_waits_total', result='served')
+                    return entry['v']
             
-            return result
+            # Lock holder is slow or died - compute rather than fail
+            metrics.incr('cache_recompute_waits_total', result='timeout')
+            return await recompute(cache_key, args, kwargs)
+        
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            cache_key = key_func(*args, **kwargs)
+            return await serve(cache_key, await cache.get_entry(cache_key), args, kwargs)
+        
+        async def from_entry(entry: Optional[Dict[str, Any]], *args, **kwargs):
+            return await serve(key_func(*args, **kwargs), entry, args, kwargs)
+        
+        wrapper.from_entry = from_entry
         return wrapper
     return decorator
 
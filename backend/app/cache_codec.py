@@ -0,0 +1,94 @@
+"""
+Redis value codec
+Values are serialized to JSON (orjson when installed, else the stdlib) with
+native handling of DynamoDB Decimals, datetimes and Pydantic models, and
+optionally compressed above CACHE_COMPRESSION_MIN_BYTES. Encoded values
+carry a 3-byte header (marker, format version, compression codec id) so the
+format can evolve; values without the header are read as plain JSON
+(written before the codec existed).
+
+Benchmark: python scripts/benchmark_cache_codec.py
+"""
+import json
+import logging
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any
+
+from app.attribute_codecs import CODECS_BY_ID, get_codec
+from app.config import settings
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+CACHE_MARKER = 0xCA
+FORMAT_VERSION = 1
+NO_COMPRESSION = 0
+
+
+class CacheCodecError(ValueError):
+    """Value can't be decoded (unknown format version or codec)"""
+
+
+def json_default(value: Any) -> Any:
+    """JSON fallback for DynamoDB Decimals (boto3 returns numbers as Decimal), datetimes and Pydantic models"""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if hasattr(value, 'model_dump'):
+        return value.model_dump()
+    if hasattr(value, 'dict') and hasattr(value, '__fields__'):     # Pydantic v1
+        return value.dict()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> bytes:
+    """Value -> JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(value, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=json_default, separators=(',', ':')).encode('utf-8')
+
+
+def loads(data: bytes) -> Any:
+    """JSON bytes -> value"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def encode(value: Any, min_bytes: int = None, codec_name: str = None) -> bytes:
+    """Value -> header + (possibly compressed) JSON"""
+    data = dumps(value)
+    min_bytes = settings.CACHE_COMPRESSION_MIN_BYTES if min_bytes is None else min_bytes
+    codec_id = NO_COMPRESSION
+    if min_bytes and len(data) >= min_bytes:
+        codec = get_codec(codec_name or settings.CACHE_COMPRESSION_CODEC)
+        compressed = codec.compress(data)
+        if len(compressed) < len(data):
+            data, codec_id = compressed, codec.codec_id
+    return bytes([CACHE_MARKER, FORMAT_VERSION, codec_id]) + data
+
+
+def decode(raw: Any) -> Any:
+    """Inverse of encode; headerless values are read as legacy JSON"""
+    if isinstance(raw, str):
+        raw = raw.encode('utf-8')
+    if not raw or raw[0] != CACHE_MARKER:
+        return loads(raw)
+
+    if len(raw) < 3 or raw[1] > FORMAT_VERSION:
+        raise CacheCodecError(f"Unsupported cache format version {raw[1] if len(raw) > 1 else None}")
+    data = raw[3:]
+    if raw[2] != NO_COMPRESSION:
+        codec = CODECS_BY_ID.get(raw[2])
+        if codec is None:
+            raise CacheCodecError(f"Unknown cache compression codec id {raw[2]}")
+        data = codec.decompress(data)
+    return loads(data)
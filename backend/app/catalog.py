@@ -0,0 +1,252 @@
+"""
+Materialized course catalog
+One precomputed document per semester plus an "all active" document,
+stored zlib-compressed and chunked in the Catalogs table
+(catalog_id HASH, chunk RANGE). Reading a catalog is a single Query.
+
+Writers patch the document incrementally (read, replace one course, write)
+with optimistic versioning: tail chunks are written first, then the head
+chunk under a version condition. Every write stamps its chunks with a
+unique token; readers ignore documents whose chunks carry mixed tokens or
+versions, or don't decode, and fall back to the GSI (a rebuild then
+overwrites them). The catalog only speeds reads up: failing to write it
+never fails a read.
+
+Courses carry section summaries; seat counters in them are only as fresh
+as the last patch, so routes overlay live counts (see courses_simple).
+"""
+import json
+import logging
+import uuid
+import zlib
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from boto3.dynamodb.conditions import Key, Attr
+from botocore.exceptions import ClientError
+
+from app.cache import cache, CacheKeys, json_default
+from app.concurrency import CapacityExceeded
+from app.course_repository import section_summary
+from app.dynamodb import db, execute, is_condition_failure, query_pages, scan_pages, Tables
+
+logger = logging.getLogger(__name__)
+
+ALL_ACTIVE = "all-active"
+CHUNK_BYTES = 350 * 1024    # DynamoDB item limit is 400 KB
+MAX_WRITE_ATTEMPTS = 3
+
+
+def _as_bytes(value: Any) -> bytes:
+    return bytes(getattr(value, 'value', value))
+
+
+class CatalogStore:
+    """Read/patch/rebuild materialized catalog documents"""
+
+    @staticmethod
+    def catalog_id(semester: Optional[str] = None) -> str:
+        return f"semester#{semester}" if semester else ALL_ACTIVE
+
+    # ----- Read -----
+
+    async def _read(self, catalog_id: str) -> Tuple[Optional[int], int, Optional[List[Dict]]]:
+        """(version, chunk_count, courses); courses is None if missing or torn"""
+        chunks = []
+        try:
+            async for page in query_pages(Tables.CATALOGS, Key('catalog_id').eq(catalog_id), decode=False):
+                chunks.extend(page)
+        except CapacityExceeded:
+            raise
+        except Exception as e:
+            logger.error(f"Catalog {catalog_id} read failed: {e}")
+            return None, 0, None
+        if not chunks:
+            return None, 0, None
+
+        chunks.sort(key=lambda c: int(c['chunk']))
+        head = chunks[0]
+        if int(head['chunk']) != 0:
+            return None, 0, None
+
+        version = int(head['version'])
+        count = int(head['chunk_count'])
+        body = chunks[:count]
+        if len(body) < count or any(
+            int(c['version']) != version or c.get('token') != head.get('token') for c in body
+        ):
+            logger.warning(f"Catalog {catalog_id} is torn (v{version}), ignoring")
+            return version, count, None
+
+        try:
+            payload = b"".join(_as_bytes(c['data']) for c in body)
+            return version, count, json.loads(zlib.decompress(payload))
+        except (zlib.error, ValueError) as e:
+            logger.warning(f"Catalog {catalog_id} doesn't decode (v{version}), ignoring: {e}")
+            return version, count, None
+
+    async def read(self, semester: Optional[str] = None) -> Optional[List[Dict]]:
+        """Catalog for a semester (or all active courses); None if not materialized"""
+        _, _, courses = await self._read(self.catalog_id(semester))
+        return courses
+
+    # ----- Write -----
+
+    async def _write(
+        self,
+        catalog_id: str,
+        courses: List[Dict],
+        expected_version: Optional[int],
+        previous_count: int = 0
+    ) -> bool:
+        """Write document; False if another writer won the version race"""
+        payload = zlib.compress(
+            json.dumps(courses, default=json_default, separators=(',', ':')).encode('utf-8')
+        )
+        chunks = [payload[i:i + CHUNK_BYTES] for i in range(0, len(payload), CHUNK_BYTES)]
+        version = (expected_version or 0) + 1
+        # Concurrent writers share the version number; the token tells their chunks apart
+        token = uuid.uuid4().hex
+        now = datetime.utcnow().isoformat()
+        table = db.get_table(Tables.CATALOGS)
+
+        def chunk_item(n: int) -> Dict:
+            return {
+                'catalog_id': catalog_id,
+                'chunk': n,
+                'version': version,
+                'token': token,
+                'chunk_count': len(chunks),
+                'data': chunks[n],
+                'updated_at': now
+            }
+
+        for n in range(1, len(chunks)):
+            item = chunk_item(n)
+            await execute(Tables.CATALOGS, 'put_item', lambda: table.put_item(Item=item))
+
+        head = chunk_item(0)
+        head['course_count'] = len(courses)
+        if expected_version is None:
+            condition = {'ConditionExpression': Attr('catalog_id').not_exists()}
+        else:
+            condition = {'ConditionExpression': Attr('version').eq(expected_version)}
+
+        try:
+            await execute(Tables.CATALOGS, 'put_item', lambda: table.put_item(Item=head, **condition))
+        except ClientError as e:
+            if is_condition_failure(e):
+                return False
+            raise
+
+        for n in range(len(chunks), previous_count):
+            key = {'catalog_id': catalog_id, 'chunk': n}
+            await execute(Tables.CATALOGS, 'delete_item', lambda: table.delete_item(Key=key))
+
+        return True
+
+    async def _load_source(self, catalog_id: str) -> List[Dict]:
+        """Active courses (with section summaries) for a catalog from the source tables"""
+        courses = []
+        if catalog_id == ALL_ACTIVE:
+            async for page in scan_pages(Tables.COURSES):
+                courses.extend(c for c in page if c.get('is_active', True))
+            section_filter = None
+        else:
+            semester = catalog_id.split('#', 1)[1]
+            async for page in query_pages(
+                Tables.COURSES,
+                Key('semester').eq(semester),
+                Attr('is_active').eq(True),
+                index_name='semester-index'
+            ):
+                courses.extend(page)
+            section_filter = Attr('semester_id').eq(semester)
+
+        sections: Dict[str, List[Dict]] = defaultdict(list)
+        try:
+            async for page in scan_pages(Tables.COURSE_SECTIONS, section_filter):
+                for section in page:
+                    if section.get('is_active', True):
+                        sections[section['course_id']].append(section_summary(section))
+        except CapacityExceeded:
+            raise
+        except Exception as e:
+            # Missing table (deployments without sections) or failed scan: no sections
+            logger.warning(f"Catalog {catalog_id}: sections unavailable, building without them: {e}")
+            sections.clear()
+        for course in courses:
+            course['sections'] = sections.get(course['course_id'], [])
+        return courses
+
+    async def rebuild(self, semester: Optional[str] = None) -> List[Dict]:
+        """Full rebuild from Courses; returns the courses loaded (even if storing them failed)"""
+        catalog_id = self.catalog_id(semester)
+        courses = await self._load_source(catalog_id)
+        try:
+            for _ in range(MAX_WRITE_ATTEMPTS):
+                version, count, _ = await self._read(catalog_id)
+                if await self._write(catalog_id, courses, version, count):
+                    break
+        except CapacityExceeded:
+            raise
+        except Exception as e:
+            # Missing Catalogs table or a failed put: serve the source, skip materializing
+            logger.error(f"Catalog {catalog_id} write failed: {e}")
+        return courses
+
+    async def rebuild_after_bulk(self, semesters: Iterable[str]):
+        """Rebuild the touched semester documents and all-active once after a bulk write"""
+        for semester in sorted(set(s for s in semesters if s)):
+            await self.rebuild(semester)
+        await self.rebuild()
+        await cache.delete(CacheKeys.course_list_all(), *[CacheKeys.course_list(s) for s in set(semesters) if s])
+
+    async def _patch(self, catalog_id: str, course: Dict, remove: bool) -> bool:
+        for _ in range(MAX_WRITE_ATTEMPTS):
+            version, count, courses = await self._read(catalog_id)
+
+            if courses is None:
+                # Missing or torn - source already reflects this write
+                courses = await self._load_source(catalog_id)
+            else:
+                course_id = course['course_id']
+                position = next((i for i, c in enumerate(courses) if c['course_id'] == course_id), None)
+                if remove:
+                    if position is None:
+                        return True
+                    courses.pop(position)
+                elif position is None:
+                    courses.append({'sections': [], **course})
+                else:
+                    # Course writes don't carry sections - keep the catalog's
+                    courses[position] = {'sections': courses[position].get('sections', []), **course}
+
+            if await self._write(catalog_id, courses, version, count):
+                return True
+
+        logger.warning(f"Catalog {catalog_id}: gave up after {MAX_WRITE_ATTEMPTS} conflicting writes")
+        return False
+
+    async def apply(self, course: Dict, previous_semester: Optional[str] = None):
+        """
+        Incrementally patch a created/updated/deleted course into its
+        semester document and the all-active document
+        """
+        try:
+            removed = not course.get('is_active', True)
+            semester = course.get('semester')
+
+            if previous_semester and previous_semester != semester:
+                await self._patch(self.catalog_id(previous_semester), course, remove=True)
+            if semester:
+                await self._patch(self.catalog_id(semester), course, remove=removed)
+            await self._patch(ALL_ACTIVE, course, remove=removed)
+        except Exception as e:
+            # Catalog is derived data - readers fall back to the GSI
+            logger.error(f"Catalog update failed for course {course.get('course_id')}: {e}")
+
+
+# Global catalog store
+catalog = CatalogStore()
@@ -0,0 +1,168 @@
+"""
+Adaptive concurrency limiting for outbound DynamoDB calls
+AIMD limiter per table: learns the sustainable number of in-flight calls
+from latency and throttling, queues briefly beyond it, then fails fast
+"""
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, Optional
+
+from botocore.exceptions import ClientError
+
+from app.config import settings
+from app.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_ERROR_CODES = {
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded',
+}
+
+
+def is_throttle_error(error: Exception) -> bool:
+    """True if boto3 error is a DynamoDB capacity/throttling error"""
+    if isinstance(error, ClientError):
+        return error.response.get('Error', {}).get('Code') in THROTTLE_ERROR_CODES
+    return False
+
+
+class CapacityExceeded(Exception):
+    """Raised when a table's limiter cannot admit a call within its wait budget"""
+
+    def __init__(self, table_name: str):
+        self.table_name = table_name
+        super().__init__(f"DynamoDB concurrency limit reached for {table_name}")
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for one table
+    - Additive increase (+1 per limit's worth of fast calls) while saturated
+    - Multiplicative decrease on throttling or latency above tolerance x baseline
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        queue_size: int,
+        queue_timeout: float,
+        latency_tolerance: float = 2.0,
+        backoff: float = 0.9,
+        throttle_backoff: float = 0.5
+    ):
+        self.name = name
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+        self.throttle_backoff = throttle_backoff
+
+        self.in_flight = 0
+        self._baseline: Optional[float] = None
+        self._waiters: deque = deque()
+
+    def has_headroom(self) -> bool:
+        """True if a call would be admitted immediately"""
+        return not self._waiters and self.in_flight < int(self.limit)
+
+    async def acquire(self):
+        """Take a slot, queueing up to queue_timeout; raises CapacityExceeded"""
+        if self.has_headroom():
+            self.in_flight += 1
+            return
+
+        if len(self._waiters) >= self.queue_size:
+            self._reject()
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was handed over as the timeout fired - keep it
+                return
+            waiter.cancel()
+            self._remove_waiter(waiter)
+            self._reject()
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()
+            else:
+                waiter.cancel()
+                self._remove_waiter(waiter)
+            raise
+
+    def release(self, latency: float, throttled: bool = False):
+        """Return slot and adapt the limit from the call outcome"""
+        self._adapt(latency, throttled)
+        self._release_slot()
+
+    def _adapt(self, latency: float, throttled: bool):
+        if self._baseline is None or latency < self._baseline:
+            self._baseline = latency
+        else:
+            # Drift baseline slowly upwards so one lucky sample doesn't pin it
+            self._baseline += (latency - self._baseline) * 0.01
+
+        if throttled:
+            self.limit = max(self.min_limit, self.limit * self.throttle_backoff)
+            metrics.incr('dynamodb_throttled_total', table=self.name)
+        elif latency > self._baseline * self.latency_tolerance:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+        elif self.in_flight >= int(self.limit):
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+        metrics.gauge('dynamodb_concurrency_limit', self.limit, table=self.name)
+
+    def _release_slot(self):
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _remove_waiter(self, waiter: asyncio.Future):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _reject(self):
+        metrics.incr('dynamodb_limiter_rejected_total', table=self.name)
+        raise CapacityExceeded(self.name)
+
+
+class LimiterRegistry:
+    """One AdaptiveLimiter per table, created on first use"""
+
+    def __init__(self):
+        self._limiters: Dict[str, AdaptiveLimiter] = {}
+
+    def get(self, table_name: str) -> AdaptiveLimiter:
+        limiter = self._limiters.get(table_name)
+        if limiter is None:
+            limiter = AdaptiveLimiter(
+                name=table_name,
+                initial_limit=settings.DYNAMODB_LIMITER_INITIAL,
+                min_limit=settings.DYNAMODB_LIMITER_MIN,
+                max_limit=settings.DYNAMODB_MAX_CONCURRENCY,
+                queue_size=settings.DYNAMODB_LIMITER_QUEUE_SIZE,
+                queue_timeout=settings.DYNAMODB_LIMITER_QUEUE_TIMEOUT_MS / 1000
+            )
+            self._limiters[table_name] = limiter
+        return limiter
+
+
+# Global limiter registry
+limiters = LimiterRegistry()
@@ -3,7 +3,7 @@ Application Configuration
 Loads from environment variables and .env file
 """
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 import os
 
 
@@ -26,6 +26,60 @@ class Settings(BaseSettings):
     DYNAMODB_ENDPOINT_URL: str = ""  # Empty for AWS, set for local DynamoDB
     DYNAMODB_TABLE_PREFIX: str = "CourseReg"
     
+    # DynamoDB adaptive concurrency limiter (per table)
+    DYNAMODB_MAX_CONCURRENCY: int = 64   # Limiter ceiling, thread pool and HTTP pool size
+    DYNAMODB_LIMITER_INITIAL: int = 16
+    DYNAMODB_LIMITER_MIN: int = 2
+    DYNAMODB_LIMITER_QUEUE_SIZE: int = 100
+    DYNAMODB_LIMITER_QUEUE_TIMEOUT_MS: int = 200
+    DYNAMODB_MAX_ATTEMPTS: int = 2  # boto3 attempts incl. first; keep low under throttling
+    
+    # DynamoDB hedged reads (opt-in, idempotent reads only)
+    DYNAMODB_HEDGING_ENABLED: bool = False
+    DYNAMODB_HEDGE_PERCENTILE: float = 95.0
+    DYNAMODB_HEDGE_BUDGET_PERCENT: float = 5.0  # Max extra read load
+    DYNAMODB_HEDGE_MIN_DELAY_MS: int = 5
+    
+    # Redis value codec: compress values at least this large (0 = never;
+    # trades CPU for memory/bandwidth - see scripts/benchmark_cache_codec.py)
+    CACHE_COMPRESSION_MIN_BYTES: int = 0
+    CACHE_COMPRESSION_CODEC: str = "zlib"  # zlib | zstd (needs zstandard)
+    
+    # Distributed locks: how long a contended acquire keeps retrying
+    LOCK_WAIT_SECONDS: float = 0.5
+    
+    # In-process L1 cache in front of Redis (per key family TTLs, seconds)
+    L1_CACHE_ENABLED: bool = False
+    L1_CACHE_MAX_ENTRIES: int = 2000
+    L1_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    L1_CACHE_TTLS: Dict[str, int] = {"courses": 10, "course": 30, "seats": 2}
+    L1_CACHE_CHANNEL: str = "cache:invalidate"
+    
+    # Redis seat-reservation engine (Lua admission, async persistence)
+    SEAT_ENGINE_ENABLED: bool = False
+    # Must be set too: REDIS_URL is one Redis shared by every instance (not a per-host container)
+    SEAT_ENGINE_SHARED_REDIS: bool = False
+    SEAT_ENGINE_BATCH_SIZE: int = 100
+    SEAT_ENGINE_FLUSH_INTERVAL_SECONDS: float = 0.2
+    SEAT_ENGINE_RECONCILE_SECONDS: int = 60
+    
+    # Enrollment audit trail (write-behind into EnrollmentHistory)
+    AUDIT_ENABLED: bool = False
+    AUDIT_SPOOL_DIR: str = "/tmp/course-reg-audit"
+    AUDIT_BATCH_SIZE: int = 25
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 2.0
+    AUDIT_MAX_QUEUE_SIZE: int = 10000
+    
+    # Prerequisite graph reload interval
+    PREREQUISITE_GRAPH_TTL_SECONDS: int = 300
+    
+    # Course storage layout: "multi_table" or "single_table" (CourseCollections)
+    COURSE_LAYOUT: str = "multi_table"
+    
+    # Attribute compression (codecs declared per table in app/dynamodb.py)
+    ATTRIBUTE_COMPRESSION_ENABLED: bool = False  # Reads always decode; enable after rollout
+    ATTRIBUTE_COMPRESSION_MIN_BYTES: int = 512
+    
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_PASSWORD: str = ""
@@ -49,6 +103,12 @@ class Settings(BaseSettings):
     # S3
     S3_BUCKET_NAME: str = ""
     
+    # Warm-cache snapshot (restored into Redis on boot)
+    WARM_CACHE_ENABLED: bool = False
+    WARM_CACHE_PATH: str = "/tmp/course-reg-warm-cache.snap"
+    WARM_CACHE_S3_KEY: str = ""  # Empty = local disk only
+    WARM_CACHE_INTERVAL_SECONDS: int = 300
+    
     # CloudWatch
     CLOUDWATCH_NAMESPACE: str = "CourseRegistration"
     CLOUDWATCH_LOG_GROUP: str = "/aws/course-registration"
@@ -0,0 +1,205 @@
+"""
+Streaming course import (CSV or NDJSON)
+The request body is consumed chunk by chunk and split into rows without
+buffering the whole upload. Rows are validated in chunks and valid courses
+go straight to a parallel batch writer, so an import is bounded by table
+write capacity rather than by one HTTP request + PutItem per course.
+"""
+import codecs
+import csv
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.catalog import catalog
+from app.course_repository import course_repository, course_item
+from app.dynamodb import ParallelBatchWriter, Tables
+
+logger = logging.getLogger(__name__)
+
+VALIDATE_CHUNK_ROWS = 500
+WRITE_CONCURRENCY = 8
+MAX_REPORTED_ERRORS = 1000
+
+REQUIRED_FIELDS = ('course_code', 'course_name')
+INT_FIELDS = {'credits': 3, 'max_students': 30}
+TEXT_FIELDS = {'department': None, 'description': '', 'semester': 'Fall 2025', 'teacher_id': None}
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    imported: int = 0
+    failed: int = 0
+    bytes_read: int = 0
+    seconds: float = 0.0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    def error(self, row: int, message: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row, 'error': message})
+
+    def to_dict(self) -> Dict:
+        return {
+            'rows': self.rows,
+            'imported': self.imported,
+            'failed': self.failed,
+            'bytes_read': self.bytes_read,
+            'seconds': round(self.seconds, 2),
+            'rows_per_second': round(self.rows / self.seconds, 1) if self.seconds else None,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors)
+        }
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], result: ImportResult) -> AsyncIterator[str]:
+    """Split a byte stream into text lines (incremental UTF-8 decoding)"""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    pending = ''
+    async for chunk in chunks:
+        result.bytes_read += len(chunk)
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split('\n')
+        for line in lines:
+            yield line.rstrip('\r')
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending.rstrip('\r')
+
+
+async def iter_csv_rows(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Optional[Dict]]]:
+    """(row_number, record) from CSV lines; header row first, quoted newlines supported"""
+    header = None
+    buffer = ''
+    row_number = 0
+    async for line in lines:
+        buffer = f"{buffer}\n{line}" if buffer else line
+        if buffer.count('"') % 2:
+            continue    # newline inside a quoted field
+        logical, buffer = buffer, ''
+        if not logical.strip():
+            continue
+        values = next(csv.reader([logical]))
+        if header is None:
+            header = [h.strip() for h in values]
+            continue
+        row_number += 1
+        if len(values) > len(header):
+            yield row_number, None
+            continue
+        yield row_number, dict(zip(header, values))
+
+
+async def iter_ndjson_rows(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Optional[Dict]]]:
+    """(row_number, record) from NDJSON lines; None for unparseable lines"""
+    row_number = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            record = json.loads(line)
+            yield row_number, record if isinstance(record, dict) else None
+        except ValueError:
+            yield row_number, None
+
+
+def validate_row(record: Optional[Dict], now: str) -> Tuple[Optional[Dict], Optional[str]]:
+    """Course item for a raw record, or an error message"""
+    if record is None:
+        return None, "Malformed row"
+
+    missing = [f for f in REQUIRED_FIELDS if not str(record.get(f) or '').strip()]
+    if missing:
+        return None, f"Missing required field(s): {', '.join(missing)}"
+
+    course = {
+        'course_id': str(uuid.uuid4()),
+        'course_code': str(record['course_code']).strip(),
+        'course_name': str(record['course_name']).strip(),
+    }
+    for name, default in INT_FIELDS.items():
+        value = record.get(name)
+        if value in (None, ''):
+            course[name] = default
+            continue
+        try:
+            course[name] = int(value)
+        except (TypeError, ValueError):
+            return None, f"{name} must be an integer"
+        if course[name] <= 0:
+            return None, f"{name} must be positive"
+    for name, default in TEXT_FIELDS.items():
+        value = record.get(name)
+        course[name] = str(value).strip() if value not in (None, '') else default
+
+    course.update({
+        'enrolled_count': 0,
+        'is_active': True,
+        'created_at': now,
+        'updated_at': now
+    })
+    return course, None
+
+
+async def import_courses(chunks: AsyncIterator[bytes], fmt: str) -> ImportResult:
+    """Stream, validate and batch-write courses; catalogs are rebuilt once at the end"""
+    started = time.perf_counter()
+    result = ImportResult()
+    now = datetime.utcnow().isoformat()
+    lines = iter_lines(chunks, result)
+    rows = iter_ndjson_rows(lines) if fmt == 'ndjson' else iter_csv_rows(lines)
+
+    single_table = course_repository.single_table
+    row_of: Dict[str, int] = {}
+    semesters = set()
+
+    writer = ParallelBatchWriter(Tables.COURSES, WRITE_CONCURRENCY)
+    collection_writer = ParallelBatchWriter(Tables.COURSE_COLLECTIONS, WRITE_CONCURRENCY)
+
+    async def write_chunk(chunk: List[Tuple[int, Optional[Dict]]]):
+        for row_number, record in chunk:
+            course, error = validate_row(record, now)
+            if error:
+                result.error(row_number, error)
+                continue
+            row_of[course['course_id']] = row_number
+            semesters.add(course['semester'])
+            await writer.put(course)
+            if single_table:
+                await collection_writer.put(course_item(course))
+
+    async with writer, collection_writer:
+        chunk = []
+        async for row in rows:
+            result.rows += 1
+            chunk.append(row)
+            if len(chunk) >= VALIDATE_CHUNK_ROWS:
+                await write_chunk(chunk)
+                chunk = []
+        if chunk:
+            await write_chunk(chunk)
+
+    for course in writer.failed:
+        result.error(row_of.get(course.get('course_id'), 0), "Write to DynamoDB failed")
+    # Stored in Courses but missing from the single-table copy: reported, not counted as imported
+    failed_ids = {course.get('course_id') for course in writer.failed}
+    collection_only = [
+        item for item in collection_writer.failed if item.get('course_id') not in failed_ids
+    ]
+    for item in collection_only:
+        result.error(row_of.get(item.get('course_id'), 0), "Write to CourseCollections failed")
+    result.imported = writer.written - len(collection_only)
+
+    if writer.written:
+        await catalog.rebuild_after_bulk(semesters)
+
+    result.seconds = time.perf_counter() - started
+    summary = {k: v for k, v in result.to_dict().items() if k != 'errors'}
+    logger.info(f"Course import: {summary}")
+    return result
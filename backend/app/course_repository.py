@@ -0,0 +1,297 @@
+"""
+Course data access (course + sections + schedules)
+Hides the storage layout from the routers:
+- multi_table:  Courses, CourseSections (course_id GSI), CourseSchedules (section_id GSI)
+- single_table: one item collection per course in CourseCollections, read with one Query
+    pk = COURSE#<course_id>
+    sk = COURSE | SECTION#<section_id> | SECTION#<section_id>#SCHEDULE#<schedule_id>
+
+The per-entity tables stay canonical (catalog, enrollments and GSIs read
+them); in single_table mode the collection is maintained alongside them.
+Seat counters are only written to Courses/CourseSections, so bundles read
+from the collection get the live counters overlaid.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from boto3.dynamodb.conditions import Key
+
+from app.config import settings
+from app.dynamodb import batch_get_items, get_item, put_item, query_items, update_item, Tables
+from app.expressions import UpdateBuilder
+
+logger = logging.getLogger(__name__)
+
+COURSE_SK = "COURSE"
+KEY_ATTRIBUTES = ('pk', 'sk', 'entity')
+
+# Section fields carried in course listings (catalog documents)
+SECTION_SUMMARY_FIELDS = ('section_id', 'section_code', 'teacher_id', 'max_students', 'enrolled_count')
+
+
+def course_pk(course_id: str) -> str:
+    return f"COURSE#{course_id}"
+
+
+def section_sk(section_id: str) -> str:
+    return f"SECTION#{section_id}"
+
+
+def schedule_sk(section_id: str, schedule_id: str) -> str:
+    return f"SECTION#{section_id}#SCHEDULE#{schedule_id}"
+
+
+def course_item(course: Dict) -> Dict:
+    return {'pk': course_pk(course['course_id']), 'sk': COURSE_SK, 'entity': 'course', **course}
+
+
+def section_item(section: Dict) -> Dict:
+    return {
+        'pk': course_pk(section['course_id']),
+        'sk': section_sk(section['section_id']),
+        'entity': 'section',
+        **section
+    }
+
+
+def schedule_item(schedule: Dict, course_id: str) -> Dict:
+    return {
+        'pk': course_pk(course_id),
+        'sk': schedule_sk(schedule['section_id'], schedule['schedule_id']),
+        'entity': 'schedule',
+        **schedule
+    }
+
+
+def section_summary(section: Dict) -> Dict:
+    return {f: section.get(f) for f in SECTION_SUMMARY_FIELDS}
+
+
+def with_availability(section: Dict) -> Dict:
+    """Section dict with available_slots derived from its counters"""
+    max_students = int(section.get('max_students') or 0)
+    enrolled = int(section.get('enrolled_count') or 0)
+    return {**section, 'available_slots': max(max_students - enrolled, 0)}
+
+
+def _strip_keys(item: Dict) -> Dict:
+    return {k: v for k, v in item.items() if k not in KEY_ATTRIBUTES}
+
+
+def assemble_bundle(items: List[Dict]) -> Optional[Dict]:
+    """Build course -> sections -> schedules from an item collection"""
+    course = None
+    sections: Dict[str, Dict] = {}
+    schedules: List[Dict] = []
+
+    for item in sorted(items, key=lambda i: i['sk']):
+        entity = item.get('entity')
+        if entity == 'course':
+            course = _strip_keys(item)
+        elif entity == 'section':
+            sections[item['section_id']] = {**_strip_keys(item), 'schedules': []}
+        elif entity == 'schedule':
+            schedules.append(_strip_keys(item))
+
+    if course is None:
+        return None
+
+    for schedule in schedules:
+        section = sections.get(schedule.get('section_id'))
+        if section is not None:
+            section['schedules'].append(schedule)
+
+    course['sections'] = list(sections.values())
+    return course
+
+
+class CourseRepository:
+    """Layout-aware reads and writes for course bundles"""
+
+    @property
+    def single_table(self) -> bool:
+        return settings.COURSE_LAYOUT == "single_table"
+
+    # ----- Reads -----
+
+    async def get_course(self, course_id: str) -> Optional[Dict]:
+        """Course with its sections (each with schedules); None if not found"""
+        if self.single_table:
+            items = await query_items(Tables.COURSE_COLLECTIONS, Key('pk').eq(course_pk(course_id)))
+            bundle = assemble_bundle(items)
+            if bundle is not None:
+                return await self._with_live_counters(bundle)
+            # Not backfilled yet - fall through to the per-entity tables
+
+        course = await get_item(Tables.COURSES, {'course_id': course_id})
+        if not course:
+            return None
+
+        sections = await query_items(
+            Tables.COURSE_SECTIONS,
+            Key('course_id').eq(course_id),
+            index_name='course_id-semester_id-index'
+        )
+        schedules = await asyncio.gather(*[
+            query_items(
+                Tables.COURSE_SCHEDULES,
+                Key('section_id').eq(section['section_id']),
+                index_name='section_id-index'
+            )
+            for section in sections
+        ])
+        course['sections'] = [
+            {**section, 'schedules': section_schedules}
+            for section, section_schedules in zip(sections, schedules)
+        ]
+        return course
+
+    async def _with_live_counters(self, bundle: Dict) -> Dict:
+        """Overlay enrolled_count/max_students from the canonical tables (two batch reads)"""
+        course_rows, seats = await asyncio.gather(
+            batch_get_items(
+                Tables.COURSES,
+                [{'course_id': bundle['course_id']}],
+                projection='course_id, enrolled_count, max_students'
+            ),
+            self.section_seats([s['section_id'] for s in bundle['sections']])
+        )
+        if course_rows:
+            bundle.update(course_rows[0])
+        bundle['sections'] = [{**s, **seats.get(s['section_id'], {})} for s in bundle['sections']]
+        return bundle
+
+    async def get_section(self, section_id: str) -> Optional[Dict]:
+        return await get_item(Tables.COURSE_SECTIONS, {'section_id': section_id})
+
+    async def section_seats(self, section_ids: List[str]) -> Dict[str, Dict]:
+        """section_id -> live {enrolled_count, max_students} (one batch read)"""
+        if not section_ids:
+            return {}
+        items = await batch_get_items(
+            Tables.COURSE_SECTIONS,
+            [{'section_id': section_id} for section_id in set(section_ids)],
+            projection='section_id, enrolled_count, max_students'
+        )
+        return {item['section_id']: item for item in items}
+
+    # ----- Seat counters -----
+    # Sectioned enrollments count on the section item, so a popular course
+    # spreads its writes over its sections; unsectioned ones use the course
+
+    def _seat_target(self, course_id: str, section_id: Optional[str]) -> Tuple[str, Dict]:
+        if section_id:
+            return Tables.COURSE_SECTIONS, {'section_id': section_id}
+        return Tables.COURSES, {'course_id': course_id}
+
+    async def reserve_seat(
+        self,
+        course_id: str,
+        section_id: Optional[str] = None,
+        raise_errors: bool = False
+    ) -> bool:
+        """
+        Atomically take a seat; False if full or missing.
+        raise_errors: backend errors are raised instead of reported as False
+        """
+        table_name, key = self._seat_target(course_id, section_id)
+        result = await update_item(
+            table_name,
+            key,
+            UpdateBuilder()
+                .add('enrolled_count', 1)
+                .set('updated_at', datetime.utcnow().isoformat())
+                .where_attribute('enrolled_count', '<', 'max_students'),
+            return_values='UPDATED_NEW' if raise_errors else None
+        )
+        return result is not None if raise_errors else result
+
+    async def release_seat(self, course_id: str, section_id: Optional[str] = None) -> bool:
+        """Atomically give a seat back (never below zero)"""
+        table_name, key = self._seat_target(course_id, section_id)
+        return await update_item(
+            table_name,
+            key,
+            UpdateBuilder()
+                .add('enrolled_count', -1)
+                .set('updated_at', datetime.utcnow().isoformat())
+                .where('enrolled_count', '>', 0)
+        )
+
+    # ----- Writes -----
+
+    async def create_course(self, course: Dict) -> bool:
+        if not await put_item(Tables.COURSES, course):
+            return False
+        if self.single_table:
+            await put_item(Tables.COURSE_COLLECTIONS, course_item(course))
+        return True
+
+    async def update_course(
+        self,
+        course_id: str,
+        updates: Dict[str, Any]
+    ) -> Optional[Tuple[Dict, Dict]]:
+        """
+        Update an existing course in one round trip.
+        Returns (previous, updated) or None if the course does not exist;
+        backend errors are raised
+        """
+        previous = await update_item(
+            Tables.COURSES,
+            {'course_id': course_id},
+            UpdateBuilder().set_all(updates).exists('course_id'),
+            return_values='ALL_OLD'
+        )
+        if not previous:
+            return None
+
+        # SET-only update: the new image is the old one plus the updates
+        updated = {**previous, **updates}
+        if self.single_table:
+            await put_item(Tables.COURSE_COLLECTIONS, course_item(updated))
+        return previous, updated
+
+    async def save_section(self, section: Dict) -> bool:
+        if not await put_item(Tables.COURSE_SECTIONS, section):
+            return False
+        if self.single_table:
+            await put_item(Tables.COURSE_COLLECTIONS, section_item(section))
+        return True
+
+    async def update_section(
+        self,
+        section_id: str,
+        updates: Dict[str, Any]
+    ) -> Optional[Tuple[Dict, Dict]]:
+        """
+        Update an existing section in one round trip.
+        Returns (previous, updated) or None if the section does not exist;
+        backend errors are raised
+        """
+        previous = await update_item(
+            Tables.COURSE_SECTIONS,
+            {'section_id': section_id},
+            UpdateBuilder().set_all(updates).exists('section_id'),
+            return_values='ALL_OLD'
+        )
+        if not previous:
+            return None
+
+        updated = {**previous, **updates}
+        if self.single_table:
+            await put_item(Tables.COURSE_COLLECTIONS, section_item(updated))
+        return previous, updated
+
+    async def save_schedule(self, schedule: Dict, course_id: str) -> bool:
+        if not await put_item(Tables.COURSE_SCHEDULES, schedule):
+            return False
+        if self.single_table:
+            await put_item(Tables.COURSE_COLLECTIONS, schedule_item(schedule, course_id))
+        return True
+
+
+# Global repository
+course_repository = CourseRepository()
@@ -4,9 +4,18 @@ Replaces database.py for NoSQL AWS DynamoDB
 """
 import boto3
 from boto3.dynamodb.conditions import Key, Attr
-from typing import Optional, Dict, Any, List
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Callable, AsyncIterator, Union
+import asyncio
 import logging
+import time
 from app.config import settings
+from app.concurrency import limiters, is_throttle_error, CapacityExceeded
+from app.hedging import hedger
+from app.attribute_codecs import encode_attributes, decode_attributes
+from app.expressions import UpdateBuilder
 
 logger = logging.getLogger(__name__)
 
@@ -29,21 +38,30 @@ class DynamoDBClient:
                 aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY if settings.AWS_SECRET_ACCESS_KEY else None
             )
             
+            # Pool sized for the limiter's ceiling; few SDK retries so throttling
+            # reaches the adaptive limiter instead of piling up inside boto3
+            config = Config(
+                retries={'max_attempts': settings.DYNAMODB_MAX_ATTEMPTS, 'mode': 'standard'},
+                max_pool_connections=settings.DYNAMODB_MAX_CONCURRENCY
+            )
+            
             # DynamoDB resource (high-level)
             if settings.DYNAMODB_ENDPOINT_URL:
                 # Local DynamoDB
                 self.resource = session.resource(
                     'dynamodb',
-                    endpoint_url=settings.DYNAMODB_ENDPOINT_URL
+                    endpoint_url=settings.DYNAMODB_ENDPOINT_URL,
+                    config=config
                 )
                 self.client = session.client(
                     'dynamodb',
-                    endpoint_url=settings.DYNAMODB_ENDPOINT_URL
+                    endpoint_url=settings.DYNAMODB_ENDPOINT_URL,
+                    config=config
                 )
             else:
                 # AWS DynamoDB
-                self.resource = session.resource('dynamodb')
-                self.client = session.client('dynamodb')
+                self.resource = session.resource('dynamodb', config=config)
+                self.client = session.client('dynamodb', config=config)
             
             logger.info("DynamoDB connected successfully")
             return True
@@ -51,10 +69,13 @@ class DynamoDBClient:
             logger.error(f"DynamoDB connection error: {e}")
             return False
     
+    def table_name(self, table_name: str) -> str:
+        """Physical (prefixed) table name"""
+        return f"{settings.DYNAMODB_TABLE_PREFIX}_{table_name}"
+    
     def get_table(self, table_name: str):
         """Get DynamoDB table object"""
-        full_name = f"{settings.DYNAMODB_TABLE_PREFIX}_{table_name}"
-        return self.resource.Table(full_name)
+        return self.resource.Table(self.table_name(table_name))
     
     def disconnect(self):
         """Close DynamoDB connections"""
@@ -82,6 +103,17 @@ class Tables:
     ENROLLMENTS = "Enrollments"
     ENROLLMENT_STATUS = "EnrollmentStatus"
     ENROLLMENT_HISTORY = "EnrollmentHistory"
+    CATALOGS = "Catalogs"
+    COURSE_COLLECTIONS = "CourseCollections"
+
+
+# Per-table attribute codecs: large free-text attributes stored compressed
+# (see app/attribute_codecs.py). Reads always decode; writes compress only
+# when ATTRIBUTE_COMPRESSION_ENABLED is set.
+ATTRIBUTE_CODECS: Dict[str, Dict[str, str]] = {
+    Tables.COURSES: {'description': 'zlib'},
+    Tables.COURSE_COLLECTIONS: {'description': 'zlib'},
+}
 
 
 # Global DynamoDB client
@@ -189,16 +221,138 @@ def init_tables():
         )
         
         logger.info("DynamoDB tables created successfully")
-        return True
+        return create_auxiliary_tables()
         
     except client.exceptions.ResourceInUseException:
         logger.info("Tables already exist")
-        return True
+        return create_auxiliary_tables()
     except Exception as e:
         logger.error(f"Error creating tables: {e}")
         return False
 
 
+# Tables added after the initial schema. Created one by one so existing
+# deployments pick them up on the next init_tables() run.
+AUXILIARY_TABLES = [
+    {
+        # Materialized course catalogs (app/catalog.py)
+        'TableName': Tables.CATALOGS,
+        'KeySchema': [
+            {'AttributeName': 'catalog_id', 'KeyType': 'HASH'},
+            {'AttributeName': 'chunk', 'KeyType': 'RANGE'}
+        ],
+        'AttributeDefinitions': [
+            {'AttributeName': 'catalog_id', 'AttributeType': 'S'},
+            {'AttributeName': 'chunk', 'AttributeType': 'N'}
+        ],
+        'ProvisionedThroughput': {'ReadCapacityUnits': 10, 'WriteCapacityUnits': 5}
+    },
+    {
+        # Single-table course item collections (app/course_repository.py)
+        'TableName': Tables.COURSE_COLLECTIONS,
+        'KeySchema': [
+            {'AttributeName': 'pk', 'KeyType': 'HASH'},
+            {'AttributeName': 'sk', 'KeyType': 'RANGE'}
+        ],
+        'AttributeDefinitions': [
+            {'AttributeName': 'pk', 'AttributeType': 'S'},
+            {'AttributeName': 'sk', 'AttributeType': 'S'}
+        ],
+        'ProvisionedThroughput': {'ReadCapacityUnits': 10, 'WriteCapacityUnits': 10}
+    },
+    {
+        # Sections with their own seat counters (app/course_repository.py)
+        'TableName': Tables.COURSE_SECTIONS,
+        'KeySchema': [{'AttributeName': 'section_id', 'KeyType': 'HASH'}],
+        'AttributeDefinitions': [
+            {'AttributeName': 'section_id', 'AttributeType': 'S'},
+            {'AttributeName': 'course_id', 'AttributeType': 'S'},
+            {'AttributeName': 'semester_id', 'AttributeType': 'S'}
+        ],
+        'GlobalSecondaryIndexes': [
+            {
+                'IndexName': 'course_id-semester_id-index',
+                'KeySchema': [
+                    {'AttributeName': 'course_id', 'KeyType': 'HASH'},
+                    {'AttributeName': 'semester_id', 'KeyType': 'RANGE'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'},
+                'ProvisionedThroughput': {'ReadCapacityUnits': 10, 'WriteCapacityUnits': 5}
+            }
+        ],
+        'ProvisionedThroughput': {'ReadCapacityUnits': 10, 'WriteCapacityUnits': 10}
+    },
+    {
+        # Section meeting times (app/course_repository.py)
+        'TableName': Tables.COURSE_SCHEDULES,
+        'KeySchema': [{'AttributeName': 'schedule_id', 'KeyType': 'HASH'}],
+        'AttributeDefinitions': [
+            {'AttributeName': 'schedule_id', 'AttributeType': 'S'},
+            {'AttributeName': 'section_id', 'AttributeType': 'S'}
+        ],
+        'GlobalSecondaryIndexes': [
+            {
+                'IndexName': 'section_id-index',
+                'KeySchema': [{'AttributeName': 'section_id', 'KeyType': 'HASH'}],
+                'Projection': {'ProjectionType': 'ALL'},
+                'ProvisionedThroughput': {'ReadCapacityUnits': 10, 'WriteCapacityUnits': 5}
+            }
+        ],
+        'ProvisionedThroughput': {'ReadCapacityUnits': 10, 'WriteCapacityUnits': 5}
+    },
+    {
+        # Prerequisite edges (app/prerequisites.py)
+        'TableName': Tables.PREREQUISITES,
+        'KeySchema': [
+            {'AttributeName': 'course_id', 'KeyType': 'HASH'},
+            {'AttributeName': 'prerequisite_course_id', 'KeyType': 'RANGE'}
+        ],
+        'AttributeDefinitions': [
+            {'AttributeName': 'course_id', 'AttributeType': 'S'},
+            {'AttributeName': 'prerequisite_course_id', 'AttributeType': 'S'}
+        ],
+        'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
+    },
+    {
+        # Write-behind enrollment audit trail (app/audit.py)
+        'TableName': Tables.ENROLLMENT_HISTORY,
+        'KeySchema': [{'AttributeName': 'history_id', 'KeyType': 'HASH'}],
+        'AttributeDefinitions': [
+            {'AttributeName': 'history_id', 'AttributeType': 'S'},
+            {'AttributeName': 'enrollment_id', 'AttributeType': 'S'},
+            {'AttributeName': 'timestamp', 'AttributeType': 'N'}
+        ],
+        'GlobalSecondaryIndexes': [
+            {
+                'IndexName': 'enrollment_id-timestamp-index',
+                'KeySchema': [
+                    {'AttributeName': 'enrollment_id', 'KeyType': 'HASH'},
+                    {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'},
+                'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 10}
+            }
+        ],
+        'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 10}
+    },
+]
+
+
+def create_auxiliary_tables() -> bool:
+    """Create AUXILIARY_TABLES that don't exist yet"""
+    client = db.client
+    for spec in AUXILIARY_TABLES:
+        try:
+            client.create_table(**{**spec, 'TableName': db.table_name(spec['TableName'])})
+            logger.info(f"Created table {spec['TableName']}")
+        except client.exceptions.ResourceInUseException:
+            pass
+        except Exception as e:
+            logger.error(f"Error creating table {spec['TableName']}: {e}")
+            return False
+    return True
+
+
 def get_db():
     """
     Dependency for FastAPI routes
@@ -209,92 +363,408 @@ def get_db():
     return db
 
 
+# Blocking boto3 calls run here so the event loop keeps serving requests
+_executor = ThreadPoolExecutor(
+    max_workers=settings.DYNAMODB_MAX_CONCURRENCY,
+    thread_name_prefix="dynamodb"
+)
+
+
+async def execute(table_name: str, operation: str, call: Callable[[], Any], hedge: bool = False) -> Any:
+    """
+    Run a boto3 call through the table's adaptive concurrency limiter
+    hedge=True only for idempotent reads
+    Raises CapacityExceeded when the limiter sheds load
+    """
+    limiter = limiters.get(table_name)
+    await limiter.acquire()
+    
+    start = time.monotonic()
+    throttled = False
+    try:
+        if hedge:
+            return await hedger.run(
+                f"{table_name}.{operation}",
+                call,
+                executor=_executor,
+                can_hedge=limiter.has_headroom
+            )
+        return await asyncio.get_running_loop().run_in_executor(_executor, call)
+    except Exception as e:
+        throttled = is_throttle_error(e)
+        raise
+    finally:
+        limiter.release(time.monotonic() - start, throttled)
+
+
+def decode_item(table_name: str, item: Optional[Dict], only: Optional[List[str]] = None) -> Optional[Dict]:
+    """Decode compressed attributes of an item read with decode=False"""
+    return decode_attributes(ATTRIBUTE_CODECS.get(table_name), item, only)
+
+
 # Helper functions for DynamoDB operations
 async def get_item(table_name: str, key: Dict[str, Any]) -> Optional[Dict]:
     """Get single item from DynamoDB"""
     try:
         table = db.get_table(table_name)
-        response = table.get_item(Key=key)
-        return response.get('Item')
+        response = await execute(
+            table_name, 'get_item',
+            lambda: table.get_item(Key=key),
+            hedge=True
+        )
+        return decode_attributes(ATTRIBUTE_CODECS.get(table_name), response.get('Item'))
+    except CapacityExceeded:
+        raise
     except Exception as e:
         logger.error(f"Error getting item from {table_name}: {e}")
         return None
 
 
+BATCH_GET_LIMIT = 100
+
+
+async def batch_get_items(
+    table_name: str,
+    keys: List[Dict[str, Any]],
+    projection: Optional[str] = None
+) -> List[Dict]:
+    """
+    Get many items by key (BatchGetItem, 100 keys per call, chunks issued
+    concurrently; unprocessed keys are retried). Missing items are omitted.
+    """
+    physical_name = db.table_name(table_name)
+
+    async def fetch(chunk: List[Dict]) -> List[Dict]:
+        items = []
+        request = {'Keys': chunk}
+        if projection:
+            request['ProjectionExpression'] = projection
+        pending = {physical_name: request}
+        while pending:
+            response = await execute(
+                table_name, 'batch_get_item',
+                lambda: db.resource.batch_get_item(RequestItems=pending)
+            )
+            items.extend(response.get('Responses', {}).get(physical_name, []))
+            pending = response.get('UnprocessedKeys') or {}
+            if pending:
+                await asyncio.sleep(0.05)
+        return items
+
+    try:
+        chunks = [keys[i:i + BATCH_GET_LIMIT] for i in range(0, len(keys), BATCH_GET_LIMIT)]
+        results = await asyncio.gather(*[fetch(chunk) for chunk in chunks])
+        return [decode_item(table_name, item) for chunk in results for item in chunk]
+    except CapacityExceeded:
+        raise
+    except Exception as e:
+        logger.error(f"Error batch getting items from {table_name}: {e}")
+        return []
+
+
 async def put_item(table_name: str, item: Dict[str, Any]) -> bool:
     """Put item into DynamoDB"""
     try:
         table = db.get_table(table_name)
-        table.put_item(Item=item)
+        stored = encode_attributes(ATTRIBUTE_CODECS.get(table_name), item)
+        await execute(table_name, 'put_item', lambda: table.put_item(Item=stored))
         return True
+    except CapacityExceeded:
+        raise
     except Exception as e:
         logger.error(f"Error putting item to {table_name}: {e}")
         return False
 
 
-async def query_items(table_name: str, key_condition, filter_condition=None) -> List[Dict]:
-    """Query items from DynamoDB"""
+BATCH_WRITE_LIMIT = 25
+BATCH_WRITE_ATTEMPTS = 5
+
+
+class ParallelBatchWriter:
+    """
+    Buffered BatchWriteItem puts with several batches in flight
+    put() applies backpressure once `concurrency` batches are pending.
+    Unprocessed items are retried with backoff; a batch that errors is
+    retried item by item so failures can be reported per item.
+
+        async with ParallelBatchWriter(Tables.COURSES) as writer:
+            for item in items:
+                await writer.put(item)
+        writer.written, writer.failed
+    """
+
+    def __init__(self, table_name: str, concurrency: int = 8):
+        self.table_name = table_name
+        self.physical_name = db.table_name(table_name)
+        self.codecs = ATTRIBUTE_CODECS.get(table_name)
+        self.written = 0
+        self.failed: List[Dict[str, Any]] = []
+        self._buffer: List[Dict[str, Any]] = []
+        self._slots = asyncio.Semaphore(concurrency)
+        self._tasks: List[asyncio.Task] = []
+
+    async def __aenter__(self) -> "ParallelBatchWriter":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def put(self, item: Dict[str, Any]):
+        self._buffer.append(item)
+        if len(self._buffer) >= BATCH_WRITE_LIMIT:
+            await self._dispatch()
+
+    async def close(self):
+        """Flush the buffer and wait for every batch in flight"""
+        if self._buffer:
+            await self._dispatch()
+        tasks, self._tasks = self._tasks, []
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # A batch raised: don't leave the others running unobserved
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _dispatch(self):
+        batch, self._buffer = self._buffer, []
+        await self._slots.acquire()
+        self._tasks.append(asyncio.create_task(self._write(batch)))
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        requests = [
+            {'PutRequest': {'Item': encode_attributes(self.codecs, item)}}
+            for item in batch
+        ]
+        try:
+            for attempt in range(BATCH_WRITE_ATTEMPTS):
+                pending = {self.physical_name: requests}
+                try:
+                    response = await execute(
+                        self.table_name, 'batch_write_item',
+                        lambda: db.resource.batch_write_item(RequestItems=pending)
+                    )
+                except CapacityExceeded:
+                    await asyncio.sleep(0.05 * 2 ** attempt)
+                    continue
+                unprocessed = (response.get('UnprocessedItems') or {}).get(self.physical_name, [])
+                self.written += len(requests) - len(unprocessed)
+                requests = unprocessed
+                if not requests:
+                    return
+                await asyncio.sleep(0.05 * 2 ** attempt)
+        except Exception as e:
+            logger.error(f"Batch write to {self.table_name} failed, retrying items one by one: {e}")
+        finally:
+            self._slots.release()
+
+        # Still unprocessed after backoff, or the batch errored: per-item puts
+        await self._write_individually([
+            decode_item(self.table_name, r['PutRequest']['Item']) for r in requests
+        ])
+
+    async def _write_individually(self, items: List[Dict[str, Any]]):
+        for item in items:
+            try:
+                written = await put_item(self.table_name, item)
+            except Exception as e:    # CapacityExceeded or anything else: report the item
+                logger.error(f"Put to {self.table_name} failed: {e}")
+                written = False
+            if written:
+                self.written += 1
+            else:
+                self.failed.append(item)
+
+
+async def query_items(
+    table_name: str,
+    key_condition,
+    filter_condition=None,
+    index_name: Optional[str] = None,
+    decode: bool = True
+) -> List[Dict]:
+    """
+    Query items from DynamoDB (optionally on a GSI)
+    decode=False leaves compressed attributes for decode_item() on demand
+    """
     try:
         table = db.get_table(table_name)
         
+        query_kwargs = {'KeyConditionExpression': key_condition}
         if filter_condition:
-            response = table.query(
-                KeyConditionExpression=key_condition,
-                FilterExpression=filter_condition
-            )
-        else:
-            response = table.query(KeyConditionExpression=key_condition)
+            query_kwargs['FilterExpression'] = filter_condition
+        if index_name:
+            query_kwargs['IndexName'] = index_name
         
-        return response.get('Items', [])
+        response = await execute(
+            table_name, 'query',
+            lambda: table.query(**query_kwargs),
+            hedge=True
+        )
+        
+        items = response.get('Items', [])
+        return [decode_item(table_name, i) for i in items] if decode else items
+    except CapacityExceeded:
+        raise
     except Exception as e:
         logger.error(f"Error querying {table_name}: {e}")
         return []
 
 
+async def query_pages(
+    table_name: str,
+    key_condition,
+    filter_condition=None,
+    index_name: Optional[str] = None,
+    decode: bool = True,
+    **query_kwargs
+) -> AsyncIterator[List[Dict]]:
+    """
+    Stream all pages of a query
+    Errors propagate - use where a partial result must not be mistaken for a full one
+    """
+    table = db.get_table(table_name)
+    query_kwargs['KeyConditionExpression'] = key_condition
+    if filter_condition:
+        query_kwargs['FilterExpression'] = filter_condition
+    if index_name:
+        query_kwargs['IndexName'] = index_name
+    
+    while True:
+        page_kwargs = dict(query_kwargs)
+        response = await execute(table_name, 'query', lambda: table.query(**page_kwargs), hedge=True)
+        page = response.get('Items', [])
+        yield [decode_item(table_name, i) for i in page] if decode else page
+        if 'LastEvaluatedKey' not in response:
+            return
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
 async def scan_items(table_name: str, filter_condition=None) -> List[Dict]:
     """Scan table (use sparingly, prefer query)"""
     try:
         table = db.get_table(table_name)
         
+        scan_kwargs = {}
         if filter_condition:
-            response = table.scan(FilterExpression=filter_condition)
-        else:
-            response = table.scan()
+            scan_kwargs['FilterExpression'] = filter_condition
+        
+        response = await execute(table_name, 'scan', lambda: table.scan(**scan_kwargs))
         
-        return response.get('Items', [])
+        return [decode_item(table_name, i) for i in response.get('Items', [])]
+    except CapacityExceeded:
+        raise
+    except Exception as e:
+        logger.error(f"Error scanning {table_name}: {e}")
+        return []
+
+
+async def scan_pages(
+    table_name: str,
+    filter_condition=None,
+    segment: Optional[int] = None,
+    total_segments: Optional[int] = None,
+    decode: bool = True,
+    **scan_kwargs
+) -> AsyncIterator[List[Dict]]:
+    """
+    Stream a table page by page (optionally one parallel-scan segment)
+    Errors propagate - intended for background jobs and tools
+    """
+    table = db.get_table(table_name)
+    if filter_condition:
+        scan_kwargs['FilterExpression'] = filter_condition
+    if total_segments:
+        scan_kwargs['Segment'] = segment
+        scan_kwargs['TotalSegments'] = total_segments
+    
+    while True:
+        page_kwargs = dict(scan_kwargs)
+        response = await execute(table_name, 'scan', lambda: table.scan(**page_kwargs))
+        page = response.get('Items', [])
+        yield [decode_item(table_name, i) for i in page] if decode else page
+        if 'LastEvaluatedKey' not in response:
+            return
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+async def scan_all_items(table_name: str, filter_condition=None, decode: bool = True) -> List[Dict]:
+    """Scan whole table following LastEvaluatedKey (background jobs only)"""
+    try:
+        items = []
+        async for page in scan_pages(table_name, filter_condition, decode=decode):
+            items.extend(page)
+        return items
     except Exception as e:
         logger.error(f"Error scanning {table_name}: {e}")
         return []
 
 
-async def update_item(table_name: str, key: Dict[str, Any], updates: Dict[str, Any]) -> bool:
-    """Update item in DynamoDB"""
+def is_condition_failure(error: Exception) -> bool:
+    """True if a conditional write was rejected by its ConditionExpression"""
+    return (
+        isinstance(error, ClientError)
+        and error.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException'
+    )
+
+
+async def update_item(
+    table_name: str,
+    key: Dict[str, Any],
+    updates: Union[Dict[str, Any], UpdateBuilder],
+    condition=None,
+    return_values: Optional[str] = None
+) -> Union[bool, Optional[Dict]]:
+    """
+    Update item in DynamoDB
+    updates: attribute -> value (SET), or an UpdateBuilder for ADD/REMOVE
+    and conditions. condition: optional boto3 condition, e.g.
+    Attr('course_id').exists(). With return_values ('ALL_NEW', 'ALL_OLD', ...)
+    the returned attributes are given back in the same round trip, or None if
+    the condition failed; other errors are raised so callers don't mistake
+    them for a failed condition. Otherwise returns a bool.
+    """
     try:
         table = db.get_table(table_name)
+        codecs = ATTRIBUTE_CODECS.get(table_name)
+        if isinstance(updates, UpdateBuilder):
+            builder = updates.set_all(encode_attributes(codecs, updates.set_values))
+        else:
+            builder = UpdateBuilder().set_all(encode_attributes(codecs, updates))
         
-        # Build update expression
-        update_expr = "SET " + ", ".join([f"#{k} = :{k}" for k in updates.keys()])
-        expr_attr_names = {f"#{k}": k for k in updates.keys()}
-        expr_attr_values = {f":{k}": v for k, v in updates.items()}
+        params = {'Key': key, **builder.build()}
+        if condition is not None:
+            if builder.has_condition:
+                raise ValueError("Pass conditions either on the builder or as condition, not both")
+            params['ConditionExpression'] = condition
+        if return_values:
+            params['ReturnValues'] = return_values
         
-        table.update_item(
-            Key=key,
-            UpdateExpression=update_expr,
-            ExpressionAttributeNames=expr_attr_names,
-            ExpressionAttributeValues=expr_attr_values
-        )
+        response = await execute(table_name, 'update_item', lambda: table.update_item(**params))
+        if return_values:
+            return decode_item(table_name, response.get('Attributes', {}))
         return True
+    except CapacityExceeded:
+        raise
     except Exception as e:
-        logger.error(f"Error updating item in {table_name}: {e}")
-        return False
+        if is_condition_failure(e):
+            logger.debug(f"Conditional update rejected in {table_name}: {key}")
+        else:
+            logger.error(f"Error updating item in {table_name}: {e}")
+            if return_values:
+                raise
+        return None if return_values else False
 
 
 async def delete_item(table_name: str, key: Dict[str, Any]) -> bool:
     """Delete item from DynamoDB"""
     try:
         table = db.get_table(table_name)
-        table.delete_item(Key=key)
+        await execute(table_name, 'delete_item', lambda: table.delete_item(Key=key))
         return True
+    except CapacityExceeded:
+        raise
     except Exception as e:
         logger.error(f"Error deleting item from {table_name}: {e}")
         return False
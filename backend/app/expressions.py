@@ -0,0 +1,176 @@
+"""
+DynamoDB update/condition expression builder
+Fluent SET / ADD / REMOVE clauses plus conditions, compiled into
+UpdateExpression, ConditionExpression and placeholder maps.
+
+Expression strings depend only on the shape of an update (which attributes,
+which clauses, which comparison operators), so compiled templates are cached
+by shape and hot write paths only bind values per call.
+
+    params = (UpdateBuilder()
+              .add('enrolled_count', 1)
+              .set('updated_at', now)
+              .where_attribute('enrolled_count', '<', 'max_students')
+              .build())
+    table.update_item(Key=key, **params)
+"""
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+# Placeholder prefixes; boto3 uses #n/:v for Condition objects, so avoid them
+NAME_PREFIX = "#a"
+VALUE_PREFIX = ":a"
+
+COMPARISON_OPERATORS = frozenset(['=', '<>', '<', '<=', '>', '>='])
+CONDITION_FUNCTIONS = {
+    'exists': 'attribute_exists',
+    'not_exists': 'attribute_not_exists',
+}
+
+
+class ExpressionTemplate(NamedTuple):
+    """Compiled expression strings for one update shape"""
+    update_expression: str
+    condition_expression: Optional[str]
+    names: Dict[str, str]           # placeholder -> attribute name
+    value_placeholders: Tuple[str, ...]  # in binding order
+
+
+@lru_cache(maxsize=512)
+def compile_template(shape: Tuple) -> ExpressionTemplate:
+    """Compile an update shape (see UpdateBuilder.shape) into a template"""
+    set_names, add_names, remove_names, conditions = shape
+    names: Dict[str, str] = {}
+    placeholders: Dict[str, str] = {}
+    values: List[str] = []
+
+    def name(path: str) -> str:
+        parts = []
+        for segment in path.split('.'):
+            if segment not in placeholders:
+                placeholders[segment] = f"{NAME_PREFIX}{len(placeholders)}"
+                names[placeholders[segment]] = segment
+            parts.append(placeholders[segment])
+        return '.'.join(parts)
+
+    def value() -> str:
+        placeholder = f"{VALUE_PREFIX}{len(values)}"
+        values.append(placeholder)
+        return placeholder
+
+    clauses = []
+    if set_names:
+        clauses.append("SET " + ", ".join(f"{name(n)} = {value()}" for n in set_names))
+    if add_names:
+        clauses.append("ADD " + ", ".join(f"{name(n)} {value()}" for n in add_names))
+    if remove_names:
+        clauses.append("REMOVE " + ", ".join(name(n) for n in remove_names))
+    if not clauses:
+        raise ValueError("Update expression needs at least one SET, ADD or REMOVE")
+
+    terms = []
+    for kind, attribute, operator, other in conditions:
+        if kind == 'function':
+            terms.append(f"{CONDITION_FUNCTIONS[operator]}({name(attribute)})")
+        elif kind == 'attribute':
+            terms.append(f"{name(attribute)} {operator} {name(other)}")
+        else:
+            terms.append(f"{name(attribute)} {operator} {value()}")
+
+    return ExpressionTemplate(
+        update_expression=" ".join(clauses),
+        condition_expression=" AND ".join(terms) if terms else None,
+        names=names,
+        value_placeholders=tuple(values)
+    )
+
+
+class UpdateBuilder:
+    """Fluent builder for UpdateItem parameters"""
+
+    def __init__(self):
+        self._set: Dict[str, Any] = {}
+        self._add: Dict[str, Any] = {}
+        self._remove: List[str] = []
+        self._conditions: List[Tuple] = []
+        self._condition_values: List[Any] = []
+
+    # ----- Update clauses -----
+
+    def set(self, attribute: str, value: Any) -> "UpdateBuilder":
+        self._set[attribute] = value
+        return self
+
+    def set_all(self, values: Dict[str, Any]) -> "UpdateBuilder":
+        self._set.update(values)
+        return self
+
+    def add(self, attribute: str, value: Any) -> "UpdateBuilder":
+        """Atomic numeric increment (or set union)"""
+        self._add[attribute] = value
+        return self
+
+    def remove(self, *attributes: str) -> "UpdateBuilder":
+        self._remove.extend(a for a in attributes if a not in self._remove)
+        return self
+
+    @property
+    def set_values(self) -> Dict[str, Any]:
+        return dict(self._set)
+
+    @property
+    def has_condition(self) -> bool:
+        return bool(self._conditions)
+
+    # ----- Conditions (ANDed together) -----
+
+    def where(self, attribute: str, operator: str, value: Any) -> "UpdateBuilder":
+        """Condition comparing an attribute with a value"""
+        self._check_operator(operator)
+        self._conditions.append(('value', attribute, operator, None))
+        self._condition_values.append(value)
+        return self
+
+    def where_attribute(self, attribute: str, operator: str, other: str) -> "UpdateBuilder":
+        """Condition comparing two attributes of the stored item"""
+        self._check_operator(operator)
+        self._conditions.append(('attribute', attribute, operator, other))
+        return self
+
+    def exists(self, attribute: str) -> "UpdateBuilder":
+        self._conditions.append(('function', attribute, 'exists', None))
+        return self
+
+    def not_exists(self, attribute: str) -> "UpdateBuilder":
+        self._conditions.append(('function', attribute, 'not_exists', None))
+        return self
+
+    @staticmethod
+    def _check_operator(operator: str):
+        if operator not in COMPARISON_OPERATORS:
+            raise ValueError(f"Unsupported comparison operator: {operator}")
+
+    # ----- Compile -----
+
+    def shape(self) -> Tuple:
+        return (
+            tuple(self._set),
+            tuple(self._add),
+            tuple(self._remove),
+            tuple(self._conditions)
+        )
+
+    def build(self) -> Dict[str, Any]:
+        """UpdateItem keyword arguments (expressions and placeholder maps)"""
+        template = compile_template(self.shape())
+        bound = list(self._set.values()) + list(self._add.values()) + self._condition_values
+
+        params = {
+            'UpdateExpression': template.update_expression,
+            'ExpressionAttributeNames': dict(template.names),
+        }
+        if bound:
+            params['ExpressionAttributeValues'] = dict(zip(template.value_placeholders, bound))
+        if template.condition_expression:
+            params['ConditionExpression'] = template.condition_expression
+        return params
@@ -0,0 +1,136 @@
+"""
+Hedged reads for DynamoDB
+If an idempotent read is slower than the tracked latency percentile, a
+duplicate request is sent and the first response wins. A token budget caps
+the extra load at DYNAMODB_HEDGE_BUDGET_PERCENT of primary requests.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Optional
+
+from app.config import settings
+from app.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyTracker:
+    """Rolling window of recent latencies for one operation"""
+
+    MIN_SAMPLES = 20
+    RECOMPUTE_EVERY = 32
+
+    def __init__(self, window: int = 512):
+        self._samples = deque(maxlen=window)
+        self._since_recompute = 0
+        self._cached: Dict[float, float] = {}
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+        self._since_recompute += 1
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Latency at pct (0-100); None until enough samples are collected"""
+        if len(self._samples) < self.MIN_SAMPLES:
+            return None
+        if pct not in self._cached or self._since_recompute >= self.RECOMPUTE_EVERY:
+            ordered = sorted(self._samples)
+            index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+            self._cached[pct] = ordered[index]
+            self._since_recompute = 0
+        return self._cached[pct]
+
+
+class HedgeBudget:
+    """Token bucket: each primary earns budget_percent/100 tokens, a hedge costs 1"""
+
+    def __init__(self, budget_percent: float, max_tokens: float = 10.0):
+        self.ratio = budget_percent / 100
+        self.max_tokens = max_tokens
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+def _consume_result(future: asyncio.Future):
+    """Retrieve result of an abandoned attempt so asyncio doesn't log it"""
+    if not future.cancelled():
+        future.exception()
+
+
+class HedgingPolicy:
+    """Runs blocking boto3 reads in the executor, hedging slow ones"""
+
+    def __init__(self):
+        self.enabled = settings.DYNAMODB_HEDGING_ENABLED
+        self.percentile = settings.DYNAMODB_HEDGE_PERCENTILE
+        self.min_delay = settings.DYNAMODB_HEDGE_MIN_DELAY_MS / 1000
+        self.budget = HedgeBudget(settings.DYNAMODB_HEDGE_BUDGET_PERCENT)
+        self._trackers: Dict[str, LatencyTracker] = defaultdict(LatencyTracker)
+
+    async def run(
+        self,
+        operation: str,
+        call: Callable[[], Any],
+        executor: Optional[Executor] = None,
+        can_hedge: Callable[[], bool] = lambda: True
+    ) -> Any:
+        """
+        Execute call() in executor; send a duplicate if it outlives the hedge delay
+        can_hedge lets the caller veto the duplicate (e.g. limiter saturated)
+        """
+        loop = asyncio.get_running_loop()
+        if not self.enabled:
+            return await loop.run_in_executor(executor, call)
+
+        tracker = self._trackers[operation]
+        self.budget.deposit()
+
+        # Track the primary's own latency so hedging doesn't bias the percentile
+        start = time.monotonic()
+        primary = loop.run_in_executor(executor, call)
+        primary.add_done_callback(lambda f: tracker.record(time.monotonic() - start))
+
+        delay = tracker.percentile(self.percentile)
+        if delay is None:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=max(delay, self.min_delay))
+        if done or not can_hedge() or not self.budget.withdraw():
+            return await primary
+
+        metrics.incr('dynamodb_hedged_requests_total', operation=operation)
+        hedge = loop.run_in_executor(executor, call)
+
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        metrics.incr('dynamodb_hedge_wins_total', operation=operation)
+                    for loser in pending:
+                        loser.add_done_callback(_consume_result)
+                    return future.result()
+                error = future.exception()
+
+        raise error
+
+
+# Global hedging policy
+hedger = HedgingPolicy()
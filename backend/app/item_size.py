@@ -0,0 +1,57 @@
+"""
+DynamoDB item size and capacity-unit estimation
+Follows the published sizing rules: attribute names count, strings are
+UTF-8 bytes, numbers ~1 byte per 2 significant digits + 1, containers add
+3 bytes plus 1 byte per element
+"""
+import math
+from decimal import Decimal
+from typing import Any, Dict
+
+READ_UNIT_BYTES = 4096
+WRITE_UNIT_BYTES = 1024
+
+
+def _number_size(value) -> int:
+    digits = Decimal(str(value)).normalize().as_tuple().digits
+    return math.ceil(len(digits) / 2) + 1
+
+
+def attribute_size(value: Any) -> int:
+    """Approximate stored size of one attribute value in bytes"""
+    if value is None or isinstance(value, bool):
+        return 1
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, (int, float, Decimal)):
+        return _number_size(value)
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if hasattr(value, 'value') and isinstance(value.value, (bytes, bytearray)):
+        # boto3.dynamodb.types.Binary
+        return len(value.value)
+    if isinstance(value, dict):
+        return 3 + sum(
+            len(k.encode('utf-8')) + attribute_size(v) + 1 for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return 3 + sum(attribute_size(v) + 1 for v in value)
+    if isinstance(value, (set, frozenset)):
+        return sum(attribute_size(v) for v in value)
+    return len(str(value).encode('utf-8'))
+
+
+def item_size(item: Dict[str, Any]) -> int:
+    """Approximate stored size of an item (names + values) in bytes"""
+    return sum(len(name.encode('utf-8')) + attribute_size(value) for name, value in item.items())
+
+
+def read_units(size: int, consistent: bool = False) -> float:
+    """RCUs to read one item of size bytes (eventually consistent = half)"""
+    units = max(1, math.ceil(size / READ_UNIT_BYTES))
+    return units if consistent else units / 2
+
+
+def write_units(size: int) -> int:
+    """WCUs to write one item of size bytes"""
+    return max(1, math.ceil(size / WRITE_UNIT_BYTES))
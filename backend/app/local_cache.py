@@ -0,0 +1,89 @@
+"""
+In-process L1 cache in front of Redis
+Bounded LRU (entry count and approximate bytes) holding decoded values, so
+hot reads skip the Redis round trip and JSON decode. Only key families
+listed in L1_CACHE_TTLS are held, each with its own short TTL. Writes on any
+instance are broadcast over Redis pub/sub and evict the key everywhere
+(see RedisCache).
+
+Values are shared between callers - treat them as read-only.
+"""
+import fnmatch
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from app.metrics import metrics
+
+
+def key_family(key: str) -> str:
+    """'courses:semester:Fall 2025' -> 'courses'"""
+    return key.split(':', 1)[0]
+
+
+class LocalCache:
+    """LRU bounded by entries and bytes, with per-entry expiry"""
+
+    def __init__(self, max_entries: int, max_bytes: int, family_ttls: Dict[str, int]):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.family_ttls = family_ttls
+        self.bytes = 0
+        self._entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+
+    def ttl_for(self, key: str, ttl: Optional[int] = None) -> int:
+        """L1 TTL for a key: its family's TTL, capped by the Redis TTL (0 = not cached)"""
+        family_ttl = self.family_ttls.get(key_family(key), 0)
+        return min(family_ttl, ttl) if ttl else family_ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            metrics.incr('cache_l1_requests_total', result='miss')
+            return None
+
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self._drop(key)
+            metrics.incr('cache_l1_requests_total', result='expired')
+            return None
+
+        self._entries.move_to_end(key)
+        metrics.incr('cache_l1_requests_total', result='hit')
+        return value
+
+    def put(self, key: str, value: Any, size: int, ttl: Optional[int] = None):
+        """Hold a decoded value; size is its serialized length in bytes"""
+        l1_ttl = self.ttl_for(key, ttl)
+        if l1_ttl <= 0 or size > self.max_bytes:
+            return
+
+        self._drop(key)
+        self._entries[key] = (value, time.monotonic() + l1_ttl, size)
+        self.bytes += size
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            metrics.incr('cache_l1_evictions_total')
+        metrics.gauge('cache_l1_bytes', self.bytes)
+
+    def evict(self, keys: Iterable[str] = (), patterns: Iterable[str] = ()) -> int:
+        """Remove keys and glob patterns (Redis-style, e.g. 'courses:*')"""
+        removed = 0
+        for key in keys:
+            removed += self._drop(key)
+        for pattern in patterns:
+            for key in [k for k in self._entries if fnmatch.fnmatchcase(k, pattern)]:
+                removed += self._drop(key)
+        return removed
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def _drop(self, key: str) -> int:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return 0
+        self.bytes -= entry[2]
+        return 1
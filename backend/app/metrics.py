@@ -0,0 +1,59 @@
+"""
+In-process metrics registry
+Lightweight counters and timings exported via the /metrics endpoint
+"""
+import threading
+from collections import defaultdict
+from typing import Dict
+
+
+def _series(name: str, labels: Dict[str, str]) -> str:
+    """Render Prometheus-style series name: name{k="v",...}"""
+    if not labels:
+        return name
+    rendered = ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+    return f"{name}{{{rendered}}}"
+
+
+class MetricsRegistry:
+    """Thread-safe counters, gauges and timing summaries (count/sum/max)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._gauges: Dict[str, float] = {}
+        self._timings: Dict[str, Dict[str, float]] = {}
+
+    def incr(self, name: str, value: float = 1, **labels):
+        """Increment a counter"""
+        key = _series(name, labels)
+        with self._lock:
+            self._counters[key] += value
+
+    def gauge(self, name: str, value: float, **labels):
+        """Set a gauge to its current value"""
+        key = _series(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name: str, seconds: float, **labels):
+        """Record a duration sample"""
+        key = _series(name, labels)
+        with self._lock:
+            timing = self._timings.setdefault(key, {'count': 0, 'sum': 0.0, 'max': 0.0})
+            timing['count'] += 1
+            timing['sum'] += seconds
+            timing['max'] = max(timing['max'], seconds)
+
+    def snapshot(self) -> Dict:
+        """Copy of all series for export"""
+        with self._lock:
+            return {
+                'counters': dict(self._counters),
+                'gauges': dict(self._gauges),
+                'timings': {k: dict(v) for k, v in self._timings.items()}
+            }
+
+
+# Global metrics registry
+metrics = MetricsRegistry()
@@ -0,0 +1,213 @@
+"""
+Prerequisite graph
+All prerequisite edges are loaded once into an in-memory DAG with
+precomputed transitive closures, so an enrollment check is a single pass
+over the course's requirement set against the student's completed courses
+instead of one query per prerequisite.
+
+The graph is reloaded after PREREQUISITE_GRAPH_TTL_SECONDS or when
+invalidate() is called after prerequisites change (save_prerequisites does
+this on the instance that made the change; others catch up within the
+TTL). A failed reload keeps the previous graph. Cycles are detected at
+load time and logged; courses on a cycle are reported in `graph.cycles`,
+and edits that would close one are rejected with PrerequisiteCycleError.
+"""
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Letter grades that count as completing a course
+PASSING_GRADES = frozenset(['A', 'B+', 'B', 'C+', 'C'])
+
+# (course_id, required_course_id, min_grade)
+Edge = Tuple[Any, Any, Optional[float]]
+
+
+class PrerequisiteCycleError(ValueError):
+    """A prerequisite edit would make a course (transitively) require itself"""
+
+
+class PrerequisiteGraph:
+    """Immutable prerequisite DAG with transitive closures"""
+
+    def __init__(self, edges: Iterable[Edge]):
+        self.requirements: Dict[Any, Dict[Any, Optional[float]]] = defaultdict(dict)
+        for course_id, required_id, min_grade in edges:
+            self.requirements[course_id][required_id] = min_grade
+
+        self.cycles: Set[Any] = set()
+        self._closure: Dict[Any, FrozenSet] = {}
+        self._build_closures()
+
+    def _build_closures(self):
+        """Kahn's algorithm: close each course over its already-closed requirements"""
+        nodes = set(self.requirements)
+        for required in self.requirements.values():
+            nodes.update(required)
+
+        pending = {node: len(self.requirements.get(node, ())) for node in nodes}
+        dependents = defaultdict(list)
+        for course_id, required in self.requirements.items():
+            for required_id in required:
+                dependents[required_id].append(course_id)
+
+        ready = deque(node for node, count in pending.items() if count == 0)
+        while ready:
+            node = ready.popleft()
+            closure = set()
+            for required_id in self.requirements.get(node, ()):
+                closure.add(required_id)
+                closure.update(self._closure[required_id])
+            self._closure[node] = frozenset(closure)
+
+            for dependent in dependents[node]:
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    ready.append(dependent)
+
+        self.cycles = {node for node in nodes if node not in self._closure}
+        if self.cycles:
+            logger.error(f"Prerequisite cycle detected among courses: {sorted(map(str, self.cycles))}")
+            for node in self.cycles:
+                self._closure[node] = frozenset(self._reachable(node))
+
+    def _reachable(self, start) -> Set:
+        seen: Set = set()
+        stack = list(self.requirements.get(start, ()))
+        while stack:
+            node = stack.pop()
+            if node not in seen:
+                seen.add(node)
+                stack.extend(self.requirements.get(node, ()))
+        return seen
+
+    def closure(self, course_id) -> FrozenSet:
+        """Every course required directly or transitively"""
+        return self._closure.get(course_id, frozenset())
+
+    def would_create_cycle(self, course_id, required_course_id) -> bool:
+        """True if adding course_id -> required_course_id closes a cycle"""
+        return course_id == required_course_id or course_id in self.closure(required_course_id)
+
+    def check(
+        self,
+        course_id,
+        completed: Mapping[Any, Optional[float]]
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Check completed courses ({course_id: final_grade}) against the
+        course's direct requirements. Returns (is_met, error_message)
+        """
+        for required_id, min_grade in self.requirements.get(course_id, {}).items():
+            if required_id not in completed:
+                return False, f"Missing prerequisite: Course ID {required_id}"
+            grade = completed[required_id]
+            if min_grade and (grade is None or grade < min_grade):
+                return False, "Grade too low for prerequisite"
+        return True, None
+
+
+EdgeLoader = Callable[[], Awaitable[List[Edge]]]
+
+
+class PrerequisiteGraphCache:
+    """Process-wide graph, reloaded on TTL expiry or invalidate()"""
+
+    def __init__(self):
+        self._graph: Optional[PrerequisiteGraph] = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self):
+        """Force a reload on next access (call after prerequisites change)"""
+        self._loaded_at = 0.0
+
+    def _fresh(self) -> bool:
+        return (
+            self._graph is not None
+            and time.monotonic() - self._loaded_at < settings.PREREQUISITE_GRAPH_TTL_SECONDS
+        )
+
+    async def get(self, loader: EdgeLoader) -> PrerequisiteGraph:
+        if self._fresh():
+            return self._graph
+
+        async with self._lock:
+            if self._fresh():
+                return self._graph
+            try:
+                edges = await loader()
+                self._graph = PrerequisiteGraph(edges)
+                logger.info(f"Loaded prerequisite graph: {len(edges)} edges")
+            except Exception as e:
+                logger.error(f"Prerequisite graph load failed: {e}")
+                if self._graph is None:
+                    raise
+            self._loaded_at = time.monotonic()
+            return self._graph
+
+
+async def load_dynamodb_edges() -> List[Edge]:
+    """All edges from the Prerequisites table (course_id, prerequisite_course_id)"""
+    from app.dynamodb import scan_pages, Tables
+
+    # scan_pages raises on errors, so a failed reload keeps the previous graph
+    # instead of replacing it with an empty one
+    return [
+        (item['course_id'], item['prerequisite_course_id'], item.get('min_grade'))
+        async for page in scan_pages(Tables.PREREQUISITES)
+        for item in page
+    ]
+
+
+def parse_prerequisites(raw: Iterable) -> Dict[Any, Optional[float]]:
+    """Request value -> {required_course_id: min_grade}; items are ids or {course_id, min_grade}"""
+    requirements: Dict[Any, Optional[float]] = {}
+    for item in raw or ():
+        if isinstance(item, dict):
+            requirements[item['course_id']] = item.get('min_grade')
+        else:
+            requirements[item] = None
+    return requirements
+
+
+async def validate_prerequisites(course_id, requirements: Mapping[Any, Optional[float]]):
+    """Raise PrerequisiteCycleError if giving course_id these requirements closes a cycle"""
+    graph = await prerequisite_graph.get(load_dynamodb_edges)
+    cyclic = [r for r in requirements if graph.would_create_cycle(course_id, r)]
+    if cyclic:
+        raise PrerequisiteCycleError(f"Prerequisites would create a cycle: {sorted(map(str, cyclic))}")
+
+
+async def save_prerequisites(course_id, requirements: Mapping[Any, Optional[float]]):
+    """Replace a course's edges in the Prerequisites table and reload the graph here"""
+    from boto3.dynamodb.conditions import Key
+    from app.dynamodb import delete_item, put_item, query_items, Tables
+
+    existing = await query_items(Tables.PREREQUISITES, Key('course_id').eq(course_id))
+    await asyncio.gather(*[
+        delete_item(Tables.PREREQUISITES, {
+            'course_id': course_id,
+            'prerequisite_course_id': item['prerequisite_course_id']
+        })
+        for item in existing if item['prerequisite_course_id'] not in requirements
+    ])
+    await asyncio.gather(*[
+        put_item(Tables.PREREQUISITES, {
+            'course_id': course_id,
+            'prerequisite_course_id': required_id,
+            **({'min_grade': min_grade} if min_grade is not None else {})
+        })
+        for required_id, min_grade in requirements.items()
+    ])
+    prerequisite_graph.invalidate()
+
+
+# Global graph cache
+prerequisite_graph = PrerequisiteGraphCache()
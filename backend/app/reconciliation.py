@@ -0,0 +1,220 @@
+"""
+Seat-count reconciliation
+Recomputes seat counters from the Enrollments table and repairs drift left
+by failed or racing requests. Sectioned enrollments count against their
+section's enrolled_count, the rest against the course's.
+
+1. Parallel-scan Courses and CourseSections for the recorded counts
+2. Parallel-scan Enrollments and count active enrollments per counter
+3. Repair each drifted counter with a conditional update
+   (only if enrolled_count still equals the value seen in step 1, so a
+   course that changed during the run is reported and left for next time)
+
+Counters written shortly before or during the run are skipped: their
+enrollment may not have been written yet when step 2 scanned past it, so
+the drift can't be told apart from an in-flight request.
+"""
+import asyncio
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from boto3.dynamodb.conditions import Attr
+
+from app.dynamodb import scan_pages, update_item, Tables
+from app.expressions import UpdateBuilder
+from app.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUS = 'enrolled'
+DEFAULT_SEGMENTS = 8
+REPAIR_CONCURRENCY = 16
+# Counters updated this long before the run started are left for the next run
+RECENT_WRITE_SECONDS = 60
+
+
+@dataclass
+class CourseDrift:
+    course_id: str
+    recorded: int
+    actual: int
+    section_id: Optional[str] = None    # set for section counters
+    status: str = 'pending'             # repaired | conflict | error | recent | dry_run
+
+    @property
+    def delta(self) -> int:
+        return self.actual - self.recorded
+
+
+@dataclass
+class DriftReport:
+    courses_scanned: int = 0
+    enrollments_counted: int = 0
+    drifted: List[CourseDrift] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def summary(self) -> Dict:
+        statuses = Counter(d.status for d in self.drifted)
+        return {
+            'courses_scanned': self.courses_scanned,
+            'enrollments_counted': self.enrollments_counted,
+            'drifted': len(self.drifted),
+            'seats_drift': sum(abs(d.delta) for d in self.drifted),
+            **{f'status_{k}': v for k, v in statuses.items()},
+            'seconds': round(self.seconds, 2)
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            'summary': self.summary(),
+            'drifted': [{**asdict(d), 'delta': d.delta} for d in self.drifted]
+        }
+
+
+async def _parallel_scan(table_name: str, segments: int, consume, **scan_kwargs):
+    """Run every segment of a parallel scan concurrently, feeding pages to consume()"""
+    async def run_segment(segment: int):
+        async for page in scan_pages(
+            table_name,
+            segment=segment,
+            total_segments=segments,
+            decode=False,
+            **scan_kwargs
+        ):
+            consume(page)
+
+    await asyncio.gather(*[run_segment(s) for s in range(segments)])
+
+
+CounterKey = Tuple[str, Optional[str]]     # (course_id, section_id or None)
+
+
+async def recorded_counts(
+    segments: int = DEFAULT_SEGMENTS
+) -> Tuple[Dict[CounterKey, int], Dict[CounterKey, str]]:
+    """Counter -> enrolled_count and counter -> updated_at, as stored on Courses / CourseSections"""
+    counts: Dict[CounterKey, int] = {}
+    updated_at: Dict[CounterKey, str] = {}
+
+    def record(key: CounterKey, item: Dict):
+        counts[key] = int(item.get('enrolled_count', 0))
+        updated_at[key] = item.get('updated_at') or ''
+
+    def consume_courses(page):
+        for item in page:
+            record((item['course_id'], None), item)
+
+    def consume_sections(page):
+        for item in page:
+            record((item['course_id'], item['section_id']), item)
+
+    await asyncio.gather(
+        _parallel_scan(
+            Tables.COURSES,
+            segments,
+            consume_courses,
+            ProjectionExpression='course_id, enrolled_count, updated_at'
+        ),
+        _parallel_scan(
+            Tables.COURSE_SECTIONS,
+            segments,
+            consume_sections,
+            ProjectionExpression='course_id, section_id, enrolled_count, updated_at'
+        )
+    )
+    return counts, updated_at
+
+
+async def actual_counts(segments: int = DEFAULT_SEGMENTS) -> Counter:
+    """Counter -> number of active enrollments"""
+    counts: Counter = Counter()
+
+    def consume(page):
+        counts.update(
+            (item['course_id'], item.get('section_id'))
+            for item in page if item.get('course_id')
+        )
+
+    await _parallel_scan(
+        Tables.ENROLLMENTS,
+        segments,
+        consume,
+        filter_condition=Attr('status').eq(ACTIVE_STATUS),
+        ProjectionExpression='course_id, section_id'
+    )
+    return counts
+
+
+async def _repair(drift: CourseDrift, semaphore: asyncio.Semaphore):
+    if drift.section_id:
+        table_name, key = Tables.COURSE_SECTIONS, {'section_id': drift.section_id}
+    else:
+        table_name, key = Tables.COURSES, {'course_id': drift.course_id}
+
+    async with semaphore:
+        try:
+            updated = await update_item(
+                table_name,
+                key,
+                UpdateBuilder()
+                    .set('enrolled_count', drift.actual)
+                    .where('enrolled_count', '=', drift.recorded),
+                return_values='UPDATED_NEW'
+            )
+        except Exception as e:
+            logger.error(f"Seat counter repair failed for {key}: {e}")
+            drift.status = 'error'
+            return
+    # None: condition failed (course changed since the scan)
+    drift.status = 'repaired' if updated is not None else 'conflict'
+
+
+async def reconcile_seat_counts(
+    segments: int = DEFAULT_SEGMENTS,
+    dry_run: bool = False
+) -> DriftReport:
+    """Diff enrolled_count against Enrollments and repair drifted courses"""
+    started = time.perf_counter()
+    report = DriftReport()
+    # Same format as the updated_at the seat counter writes set
+    recent_since = (datetime.utcnow() - timedelta(seconds=RECENT_WRITE_SECONDS)).isoformat()
+
+    # Courses first: a count that moves after this point fails the repair condition
+    recorded, updated_at = await recorded_counts(segments)
+    actual = await actual_counts(segments)
+
+    report.courses_scanned = sum(1 for _, section_id in recorded if section_id is None)
+    report.enrollments_counted = sum(actual.values())
+    report.drifted = [
+        CourseDrift(course_id, count, actual.get((course_id, section_id), 0), section_id)
+        for (course_id, section_id), count in recorded.items()
+        if actual.get((course_id, section_id), 0) != count
+    ]
+
+    orphaned = set(actual) - set(recorded)
+    if orphaned:
+        logger.warning(f"{len(orphaned)} courses/sections have enrollments but no seat counter item")
+
+    repairable = []
+    for drift in report.drifted:
+        if updated_at.get((drift.course_id, drift.section_id), '') >= recent_since:
+            drift.status = 'recent'
+        elif dry_run:
+            drift.status = 'dry_run'
+        else:
+            repairable.append(drift)
+
+    semaphore = asyncio.Semaphore(REPAIR_CONCURRENCY)
+    await asyncio.gather(*[_repair(d, semaphore) for d in repairable])
+
+    report.seconds = time.perf_counter() - started
+    summary = report.summary()
+    metrics.gauge('seat_reconciliation_drifted_courses', summary['drifted'])
+    metrics.gauge('seat_reconciliation_seats_drift', summary['seats_drift'])
+    metrics.incr('seat_reconciliation_runs_total')
+    logger.info(f"Seat reconciliation: {summary}")
+    return report
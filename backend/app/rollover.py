@@ -0,0 +1,129 @@
+"""
+Semester rollover
+Clones a semester's active courses (and their sections) into a new
+semester in one pass: source pages are streamed, transformed and handed to
+parallel batch writers as they arrive, and the catalogs are rebuilt once at
+the end instead of once per course. Sections are copied after the courses;
+if they can't be read (missing table, failed scan) the courses are kept
+and the result reports why sections were skipped.
+"""
+import logging
+import time
+import uuid
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Dict, Optional
+
+from boto3.dynamodb.conditions import Key, Attr
+
+from app.catalog import catalog
+from app.course_repository import course_repository, course_item, section_item
+from app.dynamodb import ParallelBatchWriter, query_items, query_pages, scan_pages, Tables
+
+logger = logging.getLogger(__name__)
+
+WRITE_CONCURRENCY = 8
+
+# Per-offering fields that start fresh in the new semester
+RESET_FIELDS = {'enrolled_count': 0, 'is_active': True}
+
+
+class RolloverError(Exception):
+    """Rollover refused (e.g. target semester already has courses)"""
+
+
+@dataclass
+class RolloverResult:
+    source_semester: str
+    target_semester: str
+    courses: int = 0
+    sections: int = 0
+    sections_skipped: Optional[str] = None     # why sections weren't (fully) copied
+    failed: int = 0
+    seconds: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def clone_course(course: Dict, target_semester: str, now: str) -> Dict:
+    return {
+        **course,
+        **RESET_FIELDS,
+        'course_id': str(uuid.uuid4()),
+        'semester': target_semester,
+        'cloned_from': course['course_id'],
+        'created_at': now,
+        'updated_at': now
+    }
+
+
+def clone_section(section: Dict, course_id: str, target_semester: str, now: str) -> Dict:
+    return {
+        **section,
+        **RESET_FIELDS,
+        'section_id': str(uuid.uuid4()),
+        'course_id': course_id,
+        'semester_id': target_semester,
+        'cloned_from': section['section_id'],
+        'created_at': now,
+        'updated_at': now
+    }
+
+
+async def rollover_semester(source_semester: str, target_semester: str, force: bool = False) -> RolloverResult:
+    """Clone source_semester's active courses and sections into target_semester"""
+    if source_semester == target_semester:
+        raise RolloverError("Source and target semester are the same")
+    if not force and await query_items(Tables.COURSES, Key('semester').eq(target_semester), index_name='semester-index'):
+        raise RolloverError(f"Semester {target_semester} already has courses (use force to add anyway)")
+
+    started = time.perf_counter()
+    result = RolloverResult(source_semester, target_semester)
+    now = datetime.utcnow().isoformat()
+    single_table = course_repository.single_table
+    new_course_ids: Dict[str, str] = {}
+
+    course_writer = ParallelBatchWriter(Tables.COURSES, WRITE_CONCURRENCY)
+    section_writer = ParallelBatchWriter(Tables.COURSE_SECTIONS, WRITE_CONCURRENCY)
+    collection_writer = ParallelBatchWriter(Tables.COURSE_COLLECTIONS, WRITE_CONCURRENCY)
+
+    async with course_writer, section_writer, collection_writer:
+        async for page in query_pages(
+            Tables.COURSES,
+            Key('semester').eq(source_semester),
+            Attr('is_active').eq(True),
+            index_name='semester-index'
+        ):
+            for course in page:
+                clone = clone_course(course, target_semester, now)
+                new_course_ids[course['course_id']] = clone['course_id']
+                await course_writer.put(clone)
+                if single_table:
+                    await collection_writer.put(course_item(clone))
+
+        try:
+            async for page in scan_pages(Tables.COURSE_SECTIONS, Attr('semester_id').eq(source_semester)):
+                for section in page:
+                    course_id = new_course_ids.get(section.get('course_id'))
+                    if course_id is None or not section.get('is_active', True):
+                        continue
+                    clone = clone_section(section, course_id, target_semester, now)
+                    await section_writer.put(clone)
+                    if single_table:
+                        await collection_writer.put(section_item(clone))
+        except Exception as e:
+            # Courses are already written - finish the rollover without (the rest of) the sections
+            logger.error(f"Rollover {source_semester} -> {target_semester}: section copy stopped: {e}")
+            result.sections_skipped = str(e) or type(e).__name__
+
+    result.courses = course_writer.written
+    result.sections = section_writer.written
+    result.failed = len(course_writer.failed) + len(section_writer.failed) + len(collection_writer.failed)
+
+    # One catalog rebuild per document, not one patch per course
+    await catalog.rebuild_after_bulk([target_semester])
+
+    result.seconds = round(time.perf_counter() - started, 2)
+    logger.info(f"Semester rollover: {result.to_dict()}")
+    return result
@@ -0,0 +1,490 @@
+"""
+Redis seat-reservation engine
+Admission for hot sections happens in one Lua script call: check remaining
+seats, reject a student already holding one, take the seat and queue the
+enrollment - atomically, in one round trip, without locks. A background
+persister drains the queue into DynamoDB (Enrollments + enrolled_count), so
+the request path never waits on a conditional write to a hot item.
+
+Per seat counter (a section, or a course without sections):
+  seats:{target}:state    hash {capacity, remaining}, loaded lazily from
+                          DynamoDB on first use and kept until resized
+  seats:{target}:holders  set of student_ids holding a seat
+Queues:
+  seats:pending           reservations waiting to be persisted
+  seats:processing:{id}   reservations a worker is persisting (moved back to
+                          pending if the worker's heartbeat lapses)
+
+Delivery is at-least-once: an enrollment is written only if it doesn't
+exist yet, and only that write takes the seat in DynamoDB - with the same
+enrolled_count < max_students condition as the direct path, so Redis is
+never trusted to admit past capacity. If the condition fails (the DynamoDB
+path or another engine filled the counter) the enrollment is kept with
+status 'rejected', the student's hold is dropped and the Redis counter is
+marked full; the student sees it in their enrollments, after having been
+told the seat was reserved. If taking the seat errors, the enrollment is
+deleted again and the reservation retried; a crash in between leaves
+enrolled_count one low until seat-count reconciliation
+(app/reconciliation.py) repairs it. reconcile() realigns Redis state with
+DynamoDB while no reservation is in flight. When Redis is unavailable,
+enrollments fall back to the conditional DynamoDB update, which does not
+see reservations still queued.
+
+Every instance must share one Redis: with a Redis per instance (as the EC2
+user-data runs it) each would admit up to capacity on its own. The engine
+stays off unless SEAT_ENGINE_SHARED_REDIS confirms REDIS_URL is shared.
+Assumes a single (non-cluster) Redis with an eviction policy that never
+evicts these keys (noeviction / volatile-*; they carry no TTL).
+"""
+import asyncio
+import json
+import logging
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.cache import cache, json_default
+from app.concurrency import CapacityExceeded
+from app.config import settings
+from app.course_repository import course_repository
+from app.dynamodb import batch_get_items, delete_item, get_item, update_item, Tables
+from app.expressions import UpdateBuilder
+from app.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = "seats:pending"
+PROCESSING_PREFIX = "seats:processing:"
+WORKER_PREFIX = "seats:worker:"
+RECONCILE_LOCK = "lock:seats:reconcile"
+HEARTBEAT_TTL = 30
+PERSIST_CONCURRENCY = 16
+
+# Outcomes of reserve()
+RESERVED = 'reserved'
+FULL = 'full'
+DUPLICATE = 'duplicate'
+UNAVAILABLE = 'unavailable'     # engine off / Redis error: use the DynamoDB path
+
+# Enrollment status for a reservation DynamoDB turned down at persist time
+REJECTED_STATUS = 'rejected'
+
+# KEYS: state, holders, pending  ARGV: student_id, reservation
+# 1 reserved, 0 full, -1 already holds a seat, -2 state not loaded
+RESERVE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return -2 end
+if redis.call('SISMEMBER', KEYS[2], ARGV[1]) == 1 then return -1 end
+if tonumber(redis.call('HGET', KEYS[1], 'remaining')) <= 0 then return 0 end
+redis.call('HINCRBY', KEYS[1], 'remaining', -1)
+redis.call('SADD', KEYS[2], ARGV[1])
+redis.call('RPUSH', KEYS[3], ARGV[2])
+return 1
+"""
+
+# KEYS: state  ARGV: capacity, enrolled - no-op if another caller loaded it first
+LOAD_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then return 0 end
+local remaining = math.max(tonumber(ARGV[1]) - tonumber(ARGV[2]), 0)
+redis.call('HSET', KEYS[1], 'capacity', ARGV[1], 'remaining', remaining)
+return 1
+"""
+
+# KEYS: state, holders  ARGV: student_id - seat back, never above capacity
+RELEASE_SCRIPT = """
+redis.call('SREM', KEYS[2], ARGV[1])
+if redis.call('EXISTS', KEYS[1]) == 0 then return 0 end
+local state = redis.call('HMGET', KEYS[1], 'capacity', 'remaining')
+local remaining = math.min(tonumber(state[2]) + 1, tonumber(state[1]))
+redis.call('HSET', KEYS[1], 'remaining', remaining)
+return 1
+"""
+
+# KEYS: state, holders  ARGV: student_id - DynamoDB says full: drop the hold, no seats left
+REJECT_SCRIPT = """
+redis.call('SREM', KEYS[2], ARGV[1])
+if redis.call('EXISTS', KEYS[1]) == 0 then return 0 end
+redis.call('HSET', KEYS[1], 'remaining', 0)
+return 1
+"""
+
+# KEYS: pending  ARGV: enrollment_id - withdraw a queued reservation; returns it, or false
+# if it isn't pending (already persisted, or a worker is persisting it)
+CANCEL_SCRIPT = """
+for _, raw in ipairs(redis.call('LRANGE', KEYS[1], 0, -1)) do
+    if cjson.decode(raw)['enrollment_id'] == ARGV[1] then
+        redis.call('LREM', KEYS[1], 1, raw)
+        return raw
+    end
+end
+return false
+"""
+
+# KEYS: state  ARGV: new capacity - shifts remaining by the capacity change
+RESIZE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return 0 end
+local capacity = tonumber(redis.call('HGET', KEYS[1], 'capacity'))
+redis.call('HSET', KEYS[1], 'capacity', ARGV[1])
+redis.call('HINCRBY', KEYS[1], 'remaining', tonumber(ARGV[1]) - capacity)
+return 1
+"""
+
+# KEYS: state, pending, processing...  ARGV: capacity, enrolled, observed remaining
+# Realign with DynamoDB only if nothing is in flight and state hasn't moved
+RESYNC_SCRIPT = """
+for i = 2, #KEYS do
+    if redis.call('LLEN', KEYS[i]) > 0 then return 0 end
+end
+if redis.call('HGET', KEYS[1], 'remaining') ~= ARGV[3] then return 0 end
+local remaining = math.max(tonumber(ARGV[1]) - tonumber(ARGV[2]), 0)
+redis.call('HSET', KEYS[1], 'capacity', ARGV[1], 'remaining', remaining)
+return 1
+"""
+
+
+def seat_target(course_id: str, section_id: Optional[str] = None) -> str:
+    return f"section:{section_id}" if section_id else f"course:{course_id}"
+
+
+def state_key(target: str) -> str:
+    return f"seats:{{{target}}}:state"
+
+
+def holders_key(target: str) -> str:
+    return f"seats:{{{target}}}:holders"
+
+
+class SeatEngine:
+    """Lua admission + background persistence to DynamoDB"""
+
+    def __init__(self):
+        self.instance_id = uuid.uuid4().hex
+        self._scripts: Dict[str, object] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return (
+            settings.SEAT_ENGINE_ENABLED
+            and settings.SEAT_ENGINE_SHARED_REDIS
+            and cache.redis_client is not None
+        )
+
+    @property
+    def processing_key(self) -> str:
+        return f"{PROCESSING_PREFIX}{self.instance_id}"
+
+    def _script(self, name: str, source: str):
+        script = self._scripts.get(name)
+        if script is None:
+            script = self._scripts[name] = cache.redis_client.register_script(source)
+        return script
+
+    async def _run_script(self, name: str, source: str, keys: List[str], args: List) -> int:
+        return int(await self._script(name, source)(keys=keys, args=args))
+
+    # ----- Admission -----
+
+    async def reserve(self, enrollment: Dict) -> str:
+        """Take a seat for enrollment (course_id, optional section_id, student_id)"""
+        if not self.enabled:
+            return UNAVAILABLE
+
+        target = seat_target(enrollment['course_id'], enrollment.get('section_id'))
+        payload = json.dumps(enrollment, default=json_default)
+        keys = [state_key(target), holders_key(target), PENDING_KEY]
+        try:
+            for _ in range(2):
+                result = await self._run_script(
+                    'reserve', RESERVE_SCRIPT, keys, [enrollment['student_id'], payload]
+                )
+                if result == -2:
+                    if not await self._load(enrollment['course_id'], enrollment.get('section_id')):
+                        break
+                    continue
+                outcome = {1: RESERVED, 0: FULL, -1: DUPLICATE}[result]
+                metrics.incr('seat_engine_reservations_total', result=outcome)
+                return outcome
+        except CapacityExceeded:
+            raise
+        except Exception as e:
+            logger.error(f"Seat engine reserve failed for {target}: {e}")
+        metrics.incr('seat_engine_reservations_total', result=UNAVAILABLE)
+        return UNAVAILABLE
+
+    async def _load(self, course_id: str, section_id: Optional[str]) -> bool:
+        """Seed a counter's state from DynamoDB; False if the counter doesn't exist"""
+        if section_id:
+            counter = await course_repository.get_section(section_id)
+        else:
+            counter = await get_item(Tables.COURSES, {'course_id': course_id})
+        if not counter:
+            return False
+        await self._run_script('load', LOAD_SCRIPT, [state_key(seat_target(course_id, section_id))], [
+            int(counter.get('max_students', 30)),
+            int(counter.get('enrolled_count') or 0)
+        ])
+        return True
+
+    async def release(self, course_id: str, section_id: Optional[str], student_id: str) -> bool:
+        """Give a dropped seat back to the Redis counter"""
+        if not self.enabled:
+            return False
+        target = seat_target(course_id, section_id)
+        try:
+            return bool(await self._run_script(
+                'release', RELEASE_SCRIPT, [state_key(target), holders_key(target)], [student_id]
+            ))
+        except Exception as e:
+            logger.error(f"Seat engine release failed for {target}: {e}")
+            return False
+
+    async def find_queued(self, enrollment_id: str) -> Optional[Dict]:
+        """Reserved enrollment not persisted to DynamoDB yet (pending or being persisted)"""
+        if not self.enabled:
+            return None
+        try:
+            for key in [PENDING_KEY] + await self._processing_keys():
+                for raw in await cache.redis_client.lrange(key, 0, -1):
+                    enrollment = json.loads(raw)
+                    if enrollment.get('enrollment_id') == enrollment_id:
+                        return enrollment
+        except Exception as e:
+            logger.error(f"Seat engine lookup failed for enrollment {enrollment_id}: {e}")
+        return None
+
+    async def cancel(self, enrollment_id: str) -> bool:
+        """
+        Drop a reservation that is still pending and give its seat back.
+        False if it isn't pending any more (persisted, or being persisted)
+        """
+        if not self.enabled:
+            return False
+        try:
+            raw = await self._script('cancel', CANCEL_SCRIPT)(keys=[PENDING_KEY], args=[enrollment_id])
+        except Exception as e:
+            logger.error(f"Seat engine cancel failed for enrollment {enrollment_id}: {e}")
+            return False
+        if not raw:
+            return False
+        enrollment = json.loads(raw)
+        await self.release(enrollment['course_id'], enrollment.get('section_id'), enrollment['student_id'])
+        metrics.incr('seat_engine_cancelled_total')
+        return True
+
+    async def resize(self, course_id: str, section_id: Optional[str], capacity: int) -> bool:
+        """Apply a max_students change to a loaded counter"""
+        if not self.enabled:
+            return False
+        target = seat_target(course_id, section_id)
+        try:
+            return bool(await self._run_script('resize', RESIZE_SCRIPT, [state_key(target)], [int(capacity)]))
+        except Exception as e:
+            logger.error(f"Seat engine resize failed for {target}: {e}")
+            return False
+
+    # ----- Persistence -----
+
+    async def _persist(self, enrollment: Dict) -> bool:
+        """
+        Write one reservation; True once it is settled - stored or rejected,
+        now or by an earlier attempt
+        """
+        key = {'enrollment_id': enrollment['enrollment_id']}
+        created = await update_item(
+            Tables.ENROLLMENTS,
+            key,
+            UpdateBuilder()
+                .set_all({k: v for k, v in enrollment.items() if k != 'enrollment_id'})
+                .not_exists('enrollment_id')
+        )
+        if not created:
+            # Condition failed (already persisted) or write error (retry later)
+            return await get_item(Tables.ENROLLMENTS, key) is not None
+
+        course_id, section_id = enrollment['course_id'], enrollment.get('section_id')
+        try:
+            taken = await course_repository.reserve_seat(course_id, section_id, raise_errors=True)
+        except Exception:
+            # Undo the write so the retry takes the seat again
+            await delete_item(Tables.ENROLLMENTS, key)
+            raise
+        if taken:
+            return True
+
+        # Full (or gone) in DynamoDB: keep the enrollment, marked rejected
+        if not await update_item(Tables.ENROLLMENTS, key, {
+            'status': REJECTED_STATUS,
+            'updated_at': datetime.utcnow().isoformat()
+        }):
+            # Couldn't mark it: remove it so the retry decides again
+            await delete_item(Tables.ENROLLMENTS, key)
+            return False
+        await self._reject(course_id, section_id, enrollment['student_id'])
+        logger.warning(f"Seat reservation {key['enrollment_id']} rejected: seat count is full in DynamoDB")
+        metrics.incr('seat_engine_rejected_total')
+        return True
+
+    async def _reject(self, course_id: str, section_id: Optional[str], student_id: str) -> bool:
+        """Drop a rejected student's hold and mark the Redis counter full"""
+        target = seat_target(course_id, section_id)
+        try:
+            return bool(await self._run_script(
+                'reject', REJECT_SCRIPT, [state_key(target), holders_key(target)], [student_id]
+            ))
+        except Exception as e:
+            logger.error(f"Seat engine reject failed for {target}: {e}")
+            return False
+
+    async def persist_batch(self) -> int:
+        """Move up to SEAT_ENGINE_BATCH_SIZE reservations to processing and persist them"""
+        redis_client = cache.redis_client
+        raws = []
+        for _ in range(settings.SEAT_ENGINE_BATCH_SIZE):
+            raw = await redis_client.lmove(PENDING_KEY, self.processing_key, 'LEFT', 'RIGHT')
+            if raw is None:
+                break
+            raws.append(raw)
+        if not raws:
+            return 0
+
+        semaphore = asyncio.Semaphore(PERSIST_CONCURRENCY)
+
+        async def persist(raw) -> bool:
+            async with semaphore:
+                try:
+                    stored = await self._persist(json.loads(raw))
+                except Exception as e:
+                    logger.error(f"Seat reservation persist failed: {e}")
+                    stored = False
+            if stored:
+                await redis_client.lrem(self.processing_key, 1, raw)
+            return stored
+
+        results = await asyncio.gather(*[persist(raw) for raw in raws])
+        persisted = sum(results)
+        metrics.incr('seat_engine_persisted_total', persisted)
+        if persisted < len(raws):
+            metrics.incr('seat_engine_persist_failures_total', len(raws) - persisted)
+            await self._requeue(self.processing_key)
+        metrics.gauge('seat_engine_pending', await redis_client.llen(PENDING_KEY))
+        return persisted
+
+    async def _requeue(self, processing_key: str) -> int:
+        """Move everything in a processing list back to pending"""
+        moved = 0
+        while await cache.redis_client.lmove(processing_key, PENDING_KEY, 'LEFT', 'RIGHT') is not None:
+            moved += 1
+        return moved
+
+    async def _processing_keys(self) -> List[str]:
+        keys = []
+        async for key in cache.redis_client.scan_iter(match=f"{PROCESSING_PREFIX}*"):
+            keys.append(key.decode() if isinstance(key, bytes) else key)
+        return keys
+
+    async def recover(self) -> int:
+        """Requeue reservations left in processing lists of workers that died"""
+        recovered = 0
+        for key in await self._processing_keys():
+            worker = key[len(PROCESSING_PREFIX):]
+            if worker != self.instance_id and not await cache.redis_client.exists(f"{WORKER_PREFIX}{worker}"):
+                recovered += await self._requeue(key)
+        if recovered:
+            logger.warning(f"Requeued {recovered} seat reservations from dead workers")
+        return recovered
+
+    # ----- Reconciliation -----
+
+    async def reconcile(self) -> int:
+        """Realign loaded counters whose Redis state disagrees with DynamoDB; returns counters fixed"""
+        states: List[str] = []
+        async for key in cache.redis_client.scan_iter(match="seats:{*}:state"):
+            states.append(key.decode() if isinstance(key, bytes) else key)
+        if not states:
+            return 0
+
+        targets = {key[len("seats:{"):-len("}:state")]: key for key in states}
+        section_ids = [t.split(':', 1)[1] for t in targets if t.startswith('section:')]
+        course_ids = [t.split(':', 1)[1] for t in targets if t.startswith('course:')]
+        projection = 'max_students, enrolled_count, section_id, course_id'
+        counters = {}
+        for section in await batch_get_items(Tables.COURSE_SECTIONS, [{'section_id': s} for s in section_ids], projection):
+            counters[f"section:{section['section_id']}"] = section
+        for course in await batch_get_items(Tables.COURSES, [{'course_id': c} for c in course_ids], projection):
+            counters[f"course:{course['course_id']}"] = course
+
+        in_flight = [PENDING_KEY] + await self._processing_keys()
+        fixed = 0
+        for target, key in targets.items():
+            counter = counters.get(target)
+            if counter is None:
+                continue
+            capacity, remaining = await cache.redis_client.hmget(key, 'capacity', 'remaining')
+            if remaining is None:
+                continue
+            enrolled = int(counter.get('enrolled_count') or 0)
+            max_students = int(counter.get('max_students', 30))
+            if int(capacity) == max_students and int(remaining) == max(max_students - enrolled, 0):
+                continue
+            fixed += await self._run_script(
+                'resync', RESYNC_SCRIPT, [key] + in_flight, [max_students, enrolled, remaining]
+            )
+        if fixed:
+            logger.warning(f"Seat engine realigned {fixed} counters with DynamoDB")
+        metrics.incr('seat_engine_reconciled_total', fixed)
+        return fixed
+
+    # ----- Lifecycle -----
+
+    async def _run(self):
+        """Heartbeat, drain the queue, and periodically recover/reconcile"""
+        loop = asyncio.get_running_loop()
+        next_reconcile = loop.time()
+        while True:
+            try:
+                await cache.redis_client.set(f"{WORKER_PREFIX}{self.instance_id}", 1, ex=HEARTBEAT_TTL)
+                persisted = await self.persist_batch()
+                if loop.time() >= next_reconcile:
+                    next_reconcile = loop.time() + settings.SEAT_ENGINE_RECONCILE_SECONDS
+                    await self.recover()
+                    if await cache.acquire_lock(RECONCILE_LOCK, settings.SEAT_ENGINE_RECONCILE_SECONDS):
+                        await self.reconcile()
+                if persisted:
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Seat engine worker error: {e}")
+            await asyncio.sleep(settings.SEAT_ENGINE_FLUSH_INTERVAL_SECONDS)
+
+    async def start(self):
+        if settings.SEAT_ENGINE_ENABLED and not settings.SEAT_ENGINE_SHARED_REDIS:
+            logger.error(
+                "SEAT_ENGINE_ENABLED needs SEAT_ENGINE_SHARED_REDIS: with a Redis per instance "
+                "each would admit up to capacity; seat engine stays off"
+            )
+        if not self.enabled:
+            return
+        await self.recover()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the worker; persist what's queued, leaving the rest for other instances"""
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        try:
+            await self._requeue(self.processing_key)
+            while await self.persist_batch():
+                pass
+        except Exception as e:
+            logger.error(f"Final seat reservation flush failed (left queued in Redis): {e}")
+
+
+# Global seat engine
+seat_engine = SeatEngine()
@@ -17,7 +17,9 @@ from app.models import (
 )
 from app.schemas import EnrollmentCreate, EnrollmentResponse
 from app.cache import cache, CacheKeys, CacheTTL
+from app.config import settings
 from app.aws import sqs_client, cloudwatch_client
+from app.prerequisites import prerequisite_graph, PASSING_GRADES
 
 logger = logging.getLogger(__name__)
 
@@ -49,39 +51,35 @@ class EnrollmentService:
     ) -> Tuple[bool, Optional[str]]:
         """
         Check if student meets course prerequisites
+        Requirements come from the cached prerequisite graph; completed
+        courses are fetched in one query
         Returns (is_met, error_message)
         """
-        # Get prerequisites
-        result = await db.execute(
-            select(Prerequisite).where(Prerequisite.course_id == course_id)
-        )
-        prerequisites = result.scalars().all()
+        async def load_edges():
+            result = await db.execute(
+                select(Prerequisite.course_id, Prerequisite.required_course_id, Prerequisite.min_grade)
+            )
+            return [tuple(row) for row in result.all()]
         
-        if not prerequisites:
+        graph = await prerequisite_graph.get(load_edges)
+        if not graph.requirements.get(course_id):
             return True, None
         
-        # Check each prerequisite
-        for prereq in prerequisites:
-            # Check if student has completed the required course
-            result = await db.execute(
-                select(Enrollment)
-                .where(
-                    and_(
-                        Enrollment.student_id == student_id,
-                        Enrollment.course_id == prereq.required_course_id,
-                        Enrollment.grade_letter.in_(['A', 'B+', 'B', 'C+', 'C'])
-                    )
+        # Completed courses (best passing grade per course)
+        result = await db.execute(
+            select(CourseSection.course_id, func.max(Enrollment.final_grade))
+            .join(Enrollment, Enrollment.section_id == CourseSection.section_id)
+            .where(
+                and_(
+                    Enrollment.student_id == student_id,
+                    Enrollment.grade_letter.in_(PASSING_GRADES)
                 )
             )
-            completed = result.scalar_one_or_none()
-            
-            if not completed:
-                return False, f"Missing prerequisite: Course ID {prereq.required_course_id}"
-            
-            if prereq.min_grade and completed.final_grade < prereq.min_grade:
-                return False, f"Grade too low for prerequisite"
+            .group_by(CourseSection.course_id)
+        )
+        completed = {row[0]: row[1] for row in result.all()}
         
-        return True, None
+        return graph.check(course_id, completed)
     
     @staticmethod
     async def check_schedule_conflict(
@@ -232,11 +230,11 @@ class EnrollmentService:
                     detail="Registration period is closed"
                 )
             
-            # 3. Acquire distributed lock using Redis
+            # 3. Acquire distributed lock using Redis (waits out short contention)
             lock_key = CacheKeys.enrollment_lock(section_id)
-            lock_acquired = await cache.acquire_lock(lock_key, ttl=10)
+            lock = await cache.acquire_lock(lock_key, ttl=10, wait=settings.LOCK_WAIT_SECONDS)
             
-            if not lock_acquired:
+            if not lock:
                 # Add to queue for retry
                 await sqs_client.send_message({
                     "student_id": student_id,
@@ -385,8 +383,8 @@ class EnrollmentService:
                 return EnrollmentResponse.from_orm(enrollment)
                 
             finally:
-                # Release distributed lock
-                await cache.release_lock(lock_key)
+                # Release distributed lock (only if still ours)
+                await cache.release_lock(lock)
                 
         except HTTPException:
             raise
@@ -0,0 +1,244 @@
+"""
+Warm-cache snapshot
+Persists hot read data (semester catalogs, course details) to local disk /
+S3 so a freshly scaled-out instance starts with a warm Redis. Each instance
+runs its own Redis, so every instance refreshes its own copy.
+"""
+import asyncio
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from app.cache import cache, CacheKeys, CacheTTL, BULK_CHUNK_SIZE, json_default
+from app.catalog import catalog
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# File layout: MAGIC | uint64 header length | JSON header | JSON payload blobs
+# The header indexes every blob as [offset, length, ttl] relative to the payload
+SNAPSHOT_MAGIC = b"CRWARM1\n"
+HEADER_LENGTH = struct.Struct(">Q")
+
+
+def route_entry(value: Any, ttl: int) -> Tuple[Any, int]:
+    """
+    (entry, redis ttl) as the routes' @cached loaders write it. Entries
+    restored from an older snapshot are past their soft expiry, so they are
+    served stale while a background refresh replaces them.
+    """
+    return cache.entry(value, ttl), ttl + CacheTTL.STALE
+
+
+class WarmCacheSnapshot:
+    """Periodic hot-data snapshot, restored into Redis before serving traffic"""
+
+    def __init__(self, path: str = None):
+        self.path = path or settings.WARM_CACHE_PATH
+        self._entries: Dict[str, Tuple[Any, int]] = {}
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._index: Dict[str, list] = {}
+        self._payload_offset = 0
+        self._task: Optional[asyncio.Task] = None
+
+    # ----- Capture -----
+
+    async def capture(self) -> Dict[str, Tuple[Any, int]]:
+        """Build {cache_key: (value, ttl)} from DynamoDB"""
+        entries: Dict[str, Tuple[Any, int]] = {}
+
+        # Lists in the same shape the routes serve: catalog documents (with sections)
+        active = await catalog.read() or await catalog.rebuild()
+        entries[CacheKeys.course_list_all()] = route_entry(active, CacheTTL.COURSE_LIST)
+
+        for semester in sorted(set(c.get('semester') for c in active if c.get('semester'))):
+            semester_courses = await catalog.read(semester) or await catalog.rebuild(semester)
+            entries[CacheKeys.course_list(semester)] = route_entry(semester_courses, CacheTTL.COURSE_LIST)
+
+        # Details carry schedules per section - only courses without sections
+        # match the detail shape without extra reads
+        for course in active:
+            if not course.get('sections'):
+                entries[CacheKeys.course_detail(course['course_id'])] = route_entry(course, CacheTTL.COURSE_DETAIL)
+
+        return entries
+
+    async def publish(self, entries: Dict[str, Tuple[Any, int]]) -> int:
+        """Write entries into Redis (pipelined), returns number of keys set"""
+        return await cache.set_many(entries)
+
+    # ----- Disk format -----
+
+    def save(self, entries: Dict[str, Tuple[Any, int]]) -> bool:
+        """Atomically write snapshot file (temp file + rename)"""
+        try:
+            index = {}
+            blobs = []
+            offset = 0
+            for key, (value, ttl) in entries.items():
+                blob = json.dumps(value, default=json_default, separators=(',', ':')).encode('utf-8')
+                index[key] = [offset, len(blob), ttl]
+                blobs.append(blob)
+                offset += len(blob)
+
+            header = json.dumps({
+                'created_at': datetime.utcnow().isoformat(),
+                'index': index
+            }, separators=(',', ':')).encode('utf-8')
+
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(SNAPSHOT_MAGIC)
+                f.write(HEADER_LENGTH.pack(len(header)))
+                f.write(header)
+                for blob in blobs:
+                    f.write(blob)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+            logger.info(f"Warm-cache snapshot saved: {len(index)} keys, {offset} bytes")
+            return True
+        except Exception as e:
+            logger.error(f"Warm-cache snapshot save error: {e}")
+            return False
+
+    def open(self) -> bool:
+        """Memory-map snapshot file and parse its index"""
+        self.close()
+        try:
+            if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+                return False
+
+            self._file = open(self.path, 'rb')
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+            if self._mmap[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+                raise ValueError("bad snapshot magic")
+
+            start = len(SNAPSHOT_MAGIC)
+            (header_len,) = HEADER_LENGTH.unpack_from(self._mmap, start)
+            start += HEADER_LENGTH.size
+            header = json.loads(self._mmap[start:start + header_len])
+
+            self._index = header['index']
+            self._payload_offset = start + header_len
+            logger.info(f"Warm-cache snapshot opened: {len(self._index)} keys from {header['created_at']}")
+            return True
+        except Exception as e:
+            logger.warning(f"Warm-cache snapshot unreadable, ignoring: {e}")
+            self.close()
+            return False
+
+    def get_raw(self, key: str) -> Optional[bytes]:
+        """Serialized (JSON) entry, sliced from the mapped file without decoding"""
+        if not self._mmap or key not in self._index:
+            return None
+        offset, length, _ = self._index[key]
+        start = self._payload_offset + offset
+        return self._mmap[start:start + length]
+
+    def get(self, key: str) -> Optional[Any]:
+        """Decode a single entry lazily from the mapped file"""
+        raw = self.get_raw(key)
+        return json.loads(raw) if raw is not None else None
+
+    def close(self):
+        """Release memory map"""
+        if self._mmap:
+            self._mmap.close()
+        if self._file:
+            self._file.close()
+        self._mmap = None
+        self._file = None
+        self._index = {}
+
+    # ----- S3 -----
+
+    def _s3_enabled(self) -> bool:
+        return bool(settings.WARM_CACHE_S3_KEY and settings.S3_BUCKET_NAME)
+
+    async def _download(self) -> bool:
+        from app.aws import s3_client
+        return await s3_client.download_file(settings.WARM_CACHE_S3_KEY, self.path)
+
+    async def _upload(self) -> bool:
+        from app.aws import s3_client
+        return await s3_client.upload_file(self.path, settings.WARM_CACHE_S3_KEY) is not None
+
+    # ----- Lifecycle -----
+
+    async def restore(self) -> int:
+        """Load snapshot (local disk, else S3) into Redis. Call before serving traffic."""
+        if not os.path.exists(self.path) and self._s3_enabled():
+            await self._download()
+
+        if not self.open():
+            return 0
+
+        # Blobs go to Redis as stored (plain JSON reads back through the cache
+        # codec); nothing is decoded, and only one chunk is copied out at a time
+        restored = 0
+        try:
+            keys = list(self._index)
+            for start in range(0, len(keys), BULK_CHUNK_SIZE):
+                chunk = {key: (self.get_raw(key), self._index[key][2]) for key in keys[start:start + BULK_CHUNK_SIZE]}
+                restored += await cache.set_many(chunk, encoded=True)
+        finally:
+            self.close()
+
+        logger.info(f"Warm-cache restored {restored} keys into Redis")
+        return restored
+
+    async def refresh(self) -> int:
+        """Re-capture from DynamoDB, revalidate Redis and persist snapshot"""
+        entries = await self.capture()
+        if not entries:
+            return 0
+
+        self._entries = entries
+        written = await self.publish(entries)
+        if self.save(entries) and self._s3_enabled():
+            await self._upload()
+        return written
+
+    async def _run(self):
+        """Background loop: revalidate immediately, then snapshot periodically"""
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Warm-cache refresh error: {e}")
+            await asyncio.sleep(settings.WARM_CACHE_INTERVAL_SECONDS)
+
+    async def start(self):
+        """Restore snapshot, then start background revalidation"""
+        await self.restore()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop background loop and persist the last captured entries"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._entries and self.save(self._entries) and self._s3_enabled():
+            await self._upload()
+
+
+# Global snapshot instance
+warm_cache = WarmCacheSnapshot()
@@ -16,7 +16,12 @@ import requests
 
 from app.config import settings
 from app.dynamodb import db, init_tables
+from app.concurrency import CapacityExceeded
 from app.cache import cache
+from app.warm_cache import warm_cache
+from app.audit import audit_trail
+from app.seat_engine import seat_engine
+from app.metrics import metrics as app_metrics
 from app.api import auth
 from app.api import courses_simple as courses
 from app.api import enrollments_simple as enrollments
@@ -106,6 +111,17 @@ async def lifespan(app: FastAPI):
         await cache.connect()
         logger.info("Redis connected")
         
+        # Restore warm-cache snapshot before accepting traffic
+        if settings.WARM_CACHE_ENABLED:
+            await warm_cache.start()
+        
+        # Write-behind audit trail (replays spooled records from a previous run)
+        if settings.AUDIT_ENABLED:
+            await audit_trail.start()
+        
+        # Seat-reservation persister (recovers reservations of dead workers)
+        await seat_engine.start()
+        
         logger.info("Application started successfully")
         
         yield
@@ -113,6 +129,11 @@ async def lifespan(app: FastAPI):
     finally:
         # Shutdown
         logger.info("Shutting down...")
+        await seat_engine.stop()
+        if settings.AUDIT_ENABLED:
+            await audit_trail.stop()
+        if settings.WARM_CACHE_ENABLED:
+            await warm_cache.stop()
         await cache.disconnect()
         db.disconnect()
         logger.info("Application shutdown complete")
@@ -194,6 +215,18 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
+@app.exception_handler(CapacityExceeded)
+async def capacity_exceeded_handler(request: Request, exc: CapacityExceeded):
+    """Shed load predictably when DynamoDB is saturated"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "1"},
+        content={
+            "detail": "Service busy, please retry"
+        }
+    )
+
+
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle general exceptions"""
@@ -233,11 +266,11 @@ async def health_check():
     }
 
 
-# Metrics endpoint (for Prometheus) - Disabled
+# Metrics endpoint - in-process counters (Prometheus client disabled)
 @app.get("/metrics", tags=["Monitoring"])
 async def metrics():
-    """Prometheus metrics endpoint"""
-    return {"message": "Metrics disabled - use CloudWatch instead"}
+    """In-process metrics (hedged reads, etc.)"""
+    return app_metrics.snapshot()
 
 
 # Root endpoint
@@ -0,0 +1,354 @@
+"""
+Item size and access-cost audit for DynamoDB tables
+- Stream-scans every table in Tables (page by page, items are not retained)
+- Reports item size distribution per table and per GSI projection
+- Flags attributes/projections pushing items past 1 KB (WCU) / 4 KB (RCU)
+- Estimates RCU/WCU per API call from an access-pattern spec
+
+Usage:
+    python scripts/audit_item_sizes.py
+    python scripts/audit_item_sizes.py --tables Courses Users --spec patterns.json --json report.json
+
+Spec format (JSON): {"GET /api/courses/{id}": [{"table": "Courses", "op": "get"}], ...}
+  op:         get | query | scan | put | update | delete
+  index:      GSI name for query/scan (optional)
+  items:      number of items touched (default 1), "partition" for the average
+              partition size of table/index, or "Table:index" for another one
+  consistent: strongly consistent read (default false)
+"""
+import sys
+import os
+import math
+import json
+import asyncio
+import argparse
+from collections import Counter, defaultdict
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.dynamodb import db, scan_pages, Tables
+from app.item_size import (
+    item_size, attribute_size, read_units, write_units,
+    READ_UNIT_BYTES, WRITE_UNIT_BYTES
+)
+
+BOUNDARIES = (WRITE_UNIT_BYTES, READ_UNIT_BYTES)
+
+# Access patterns of the live routers (main.py mounts *_simple + auth)
+DEFAULT_ACCESS_PATTERNS = {
+    "POST /api/auth/login": [
+        {"table": Tables.USERS, "index": "username-index", "op": "query"},
+    ],
+    "GET /api/auth/me": [
+        {"table": Tables.USERS, "op": "get"},
+    ],
+    "GET /api/courses": [
+        {"table": Tables.COURSES, "op": "scan"},
+    ],
+    "GET /api/courses?semester=": [
+        {"table": Tables.COURSES, "index": "semester-index", "op": "query", "items": "partition"},
+    ],
+    "GET /api/courses/{id}": [
+        {"table": Tables.COURSES, "op": "get"},
+    ],
+    "POST /api/courses": [
+        {"table": Tables.COURSES, "op": "put"},
+    ],
+    "PUT /api/courses/{id}": [
+        {"table": Tables.COURSES, "op": "get"},
+        {"table": Tables.COURSES, "op": "update"},
+        {"table": Tables.COURSES, "op": "get"},
+    ],
+    "POST /api/enrollments": [
+        {"table": Tables.COURSES, "op": "get"},
+        {"table": Tables.ENROLLMENTS, "index": "student-semester-index", "op": "query", "items": "partition"},
+        {"table": Tables.ENROLLMENTS, "op": "put"},
+        {"table": Tables.COURSES, "op": "update"},
+    ],
+    "GET /api/enrollments/my-enrollments": [
+        {"table": Tables.ENROLLMENTS, "index": "student-semester-index", "op": "query", "items": "partition"},
+        {"table": Tables.COURSES, "op": "get", "items": "Enrollments:student-semester-index"},
+    ],
+    "DELETE /api/enrollments/{id}": [
+        {"table": Tables.ENROLLMENTS, "op": "get"},
+        {"table": Tables.ENROLLMENTS, "op": "delete"},
+        {"table": Tables.COURSES, "op": "get"},
+        {"table": Tables.COURSES, "op": "update"},
+    ],
+}
+
+
+class SizeStats:
+    """Size distribution plus per-item capacity units"""
+
+    def __init__(self):
+        self.sizes = []
+        self.rcu = 0.0
+        self.wcu = 0
+
+    def add(self, size: int):
+        self.sizes.append(size)
+        self.rcu += read_units(size)
+        self.wcu += write_units(size)
+
+    @property
+    def count(self) -> int:
+        return len(self.sizes)
+
+    @property
+    def total(self) -> int:
+        return sum(self.sizes)
+
+    @property
+    def avg(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self) -> dict:
+        if not self.sizes:
+            return {'count': 0}
+        ordered = sorted(self.sizes)
+
+        def pct(p):
+            return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+        return {
+            'count': self.count,
+            'total_bytes': self.total,
+            'avg': round(self.avg, 1),
+            'p50': pct(50),
+            'p95': pct(95),
+            'p99': pct(99),
+            'max': ordered[-1],
+            'over_1kb': sum(1 for s in ordered if s > WRITE_UNIT_BYTES),
+            'over_4kb': sum(1 for s in ordered if s > READ_UNIT_BYTES),
+            'avg_get_rcu': round(self.rcu / self.count, 3),
+            'avg_put_wcu': round(self.wcu / self.count, 3),
+        }
+
+
+class TableAudit:
+    """Accumulates size statistics for one table and its GSIs"""
+
+    def __init__(self, table_name: str, description: dict):
+        self.table_name = table_name
+        self.key_attrs = [k['AttributeName'] for k in description['KeySchema']]
+        self.indexes = {g['IndexName']: g for g in description.get('GlobalSecondaryIndexes', [])}
+
+        self.items = SizeStats()
+        self.index_stats = {name: SizeStats() for name in self.indexes}
+        self.partitions = {name: Counter() for name in self.indexes}
+        self.attribute_bytes = defaultdict(int)
+        self.attribute_max = defaultdict(int)
+        # boundary -> attribute -> number of items it alone pushes past the boundary
+        self.offenders = {b: Counter() for b in BOUNDARIES}
+        self.flagged_projections = {b: Counter() for b in BOUNDARIES}
+
+    def project(self, item: dict, index_name: str):
+        """Item as stored in the GSI (None if sparse index skips it)"""
+        gsi = self.indexes[index_name]
+        index_keys = [k['AttributeName'] for k in gsi['KeySchema']]
+        if any(k not in item for k in index_keys):
+            return None
+
+        projection = gsi.get('Projection', {})
+        projection_type = projection.get('ProjectionType', 'ALL')
+        if projection_type == 'ALL':
+            return item
+
+        names = set(self.key_attrs) | set(index_keys)
+        if projection_type == 'INCLUDE':
+            names |= set(projection.get('NonKeyAttributes', []))
+        return {k: v for k, v in item.items() if k in names}
+
+    def add(self, item: dict):
+        size = item_size(item)
+        self.items.add(size)
+
+        attr_sizes = {}
+        for name, value in item.items():
+            attr_sizes[name] = len(name.encode('utf-8')) + attribute_size(value)
+            self.attribute_bytes[name] += attr_sizes[name]
+            self.attribute_max[name] = max(self.attribute_max[name], attr_sizes[name])
+
+        for boundary in BOUNDARIES:
+            if size > boundary:
+                culprits = [n for n, s in attr_sizes.items() if size - s <= boundary]
+                self.offenders[boundary].update(culprits or [max(attr_sizes, key=attr_sizes.get)])
+
+        for index_name in self.indexes:
+            projected = self.project(item, index_name)
+            if projected is None:
+                continue
+            projected_size = item_size(projected)
+            self.index_stats[index_name].add(projected_size)
+            hash_key = self.indexes[index_name]['KeySchema'][0]['AttributeName']
+            self.partitions[index_name][str(projected[hash_key])] += 1
+            for boundary in BOUNDARIES:
+                if projected_size > boundary:
+                    self.flagged_projections[boundary][index_name] += 1
+
+    def avg_partition(self, index_name: str = None) -> float:
+        if index_name is None:
+            return 1.0
+        counter = self.partitions.get(index_name)
+        return sum(counter.values()) / len(counter) if counter else 0.0
+
+    def report(self) -> dict:
+        return {
+            'items': self.items.summary(),
+            'indexes': {
+                name: {
+                    'projection': self.indexes[name].get('Projection', {}).get('ProjectionType'),
+                    'avg_partition_items': round(self.avg_partition(name), 2),
+                    **self.index_stats[name].summary()
+                }
+                for name in self.indexes
+            },
+            'largest_attributes': sorted(
+                ({'name': n, 'total_bytes': b, 'max_bytes': self.attribute_max[n]}
+                 for n, b in self.attribute_bytes.items()),
+                key=lambda a: a['total_bytes'], reverse=True
+            )[:10],
+            'offenders': {
+                f">{b}B": dict(self.offenders[b].most_common()) for b in BOUNDARIES
+            },
+            'flagged_projections': {
+                f">{b}B": dict(self.flagged_projections[b]) for b in BOUNDARIES
+            },
+        }
+
+
+def resolve_items(op: dict, audits: dict) -> float:
+    """Number of items an operation touches"""
+    items = op.get('items', 1)
+    if items == 'partition':
+        return audits[op['table']].avg_partition(op.get('index'))
+    if isinstance(items, str):
+        table_name, _, index_name = items.partition(':')
+        audit = audits.get(table_name)
+        return audit.avg_partition(index_name or None) if audit else 0.0
+    return float(items)
+
+
+def estimate_cost(ops: list, audits: dict) -> dict:
+    """RCU/WCU estimate for one API call"""
+    rcu = 0.0
+    wcu = 0.0
+    missing = []
+
+    for op in ops:
+        audit = audits.get(op['table'])
+        if not audit or not audit.items.count:
+            missing.append(op['table'])
+            continue
+
+        stats = audit.index_stats[op['index']] if op.get('index') else audit.items
+        factor = 1.0 if op.get('consistent') else 0.5
+        n = resolve_items(op, audits)
+        kind = op['op']
+
+        if kind == 'get':
+            rcu += n * (stats.rcu / stats.count) * (2 if op.get('consistent') else 1)
+        elif kind == 'query':
+            rcu += max(1, math.ceil(n * stats.avg / READ_UNIT_BYTES)) * factor
+        elif kind == 'scan':
+            rcu += max(1, math.ceil(stats.total / READ_UNIT_BYTES)) * factor
+        elif kind in ('put', 'update', 'delete'):
+            per_item = audit.items.wcu / audit.items.count
+            # Every GSI holding the item is written too
+            for index_name, index_stats in audit.index_stats.items():
+                if index_stats.count:
+                    share = index_stats.count / audit.items.count
+                    per_item += share * index_stats.wcu / index_stats.count
+            wcu += n * per_item
+
+    return {'rcu': round(rcu, 2), 'wcu': round(wcu, 2), 'missing_tables': sorted(set(missing))}
+
+
+async def audit_table(table_name: str):
+    """Stream-scan one table; None if it doesn't exist"""
+    try:
+        description = db.client.describe_table(TableName=db.table_name(table_name))['Table']
+    except db.client.exceptions.ResourceNotFoundException:
+        return None
+
+    audit = TableAudit(table_name, description)
+    async for page in scan_pages(table_name, decode=False):
+        for item in page:
+            audit.add(item)
+    return audit
+
+
+def print_report(audits: dict, costs: dict):
+    for table_name, audit in audits.items():
+        report = audit.report()
+        items = report['items']
+        print(f"\n📦 {table_name}")
+        if not items['count']:
+            print("  (empty)")
+            continue
+        print(f"  items={items['count']} avg={items['avg']}B p50={items['p50']}B "
+              f"p95={items['p95']}B p99={items['p99']}B max={items['max']}B")
+        print(f"  >1KB: {items['over_1kb']}  >4KB: {items['over_4kb']}  "
+              f"GetItem RCU avg={items['avg_get_rcu']}  PutItem WCU avg={items['avg_put_wcu']}")
+
+        for name, idx in report['indexes'].items():
+            if idx.get('count'):
+                print(f"  🔎 {name} [{idx['projection']}] items={idx['count']} avg={idx['avg']}B "
+                      f"p95={idx['p95']}B partition≈{idx['avg_partition_items']} items")
+
+        for boundary, offenders in report['offenders'].items():
+            if offenders:
+                print(f"  ⚠️  Attributes pushing items {boundary}: {offenders}")
+        for boundary, flagged in report['flagged_projections'].items():
+            if flagged:
+                print(f"  ⚠️  Projections with items {boundary}: {flagged}")
+
+    print("\n💰 Estimated capacity per API call")
+    print(f"  {'call':42}{'RCU':>8}{'WCU':>8}")
+    for call, cost in costs.items():
+        note = f"  (missing: {', '.join(cost['missing_tables'])})" if cost['missing_tables'] else ""
+        print(f"  {call:42}{cost['rcu']:>8}{cost['wcu']:>8}{note}")
+
+
+async def main():
+    all_tables = [v for k, v in vars(Tables).items() if k.isupper()]
+
+    parser = argparse.ArgumentParser(description="DynamoDB item size and access-cost audit")
+    parser.add_argument('--tables', nargs='+', default=all_tables, help="tables to scan (default: all)")
+    parser.add_argument('--spec', help="access-pattern spec JSON (default: live routes)")
+    parser.add_argument('--json', dest='json_path', help="also write the report as JSON")
+    args = parser.parse_args()
+
+    patterns = DEFAULT_ACCESS_PATTERNS
+    if args.spec:
+        with open(args.spec) as f:
+            patterns = json.load(f)
+
+    db.connect()
+    try:
+        audits = {}
+        for table_name in args.tables:
+            audit = await audit_table(table_name)
+            if audit is None:
+                print(f"⏭️  {table_name}: table not found, skipped")
+                continue
+            audits[table_name] = audit
+
+        costs = {call: estimate_cost(ops, audits) for call, ops in patterns.items()}
+        print_report(audits, costs)
+
+        if args.json_path:
+            with open(args.json_path, 'w') as f:
+                json.dump({
+                    'tables': {name: audit.report() for name, audit in audits.items()},
+                    'api_costs': costs
+                }, f, indent=2)
+            print(f"\n✅ JSON report written to {args.json_path}")
+    finally:
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
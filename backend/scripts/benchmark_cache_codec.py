@@ -0,0 +1,105 @@
+"""
+Benchmark the Redis value codec against the previous json.dumps path
+Builds synthetic course lists shaped like the catalog (DynamoDB Decimals,
+sections, long descriptions) and reports encode/decode time and stored
+size per variant. No AWS or Redis access needed.
+
+Usage: python scripts/benchmark_cache_codec.py [--courses 50 500 2000] [--rounds 20]
+"""
+import sys
+import os
+import json
+import time
+import random
+import argparse
+from decimal import Decimal
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import cache_codec
+from app.attribute_codecs import zstandard
+from app.cache_codec import json_default
+
+
+def make_courses(count, seed=7):
+    """Catalog-shaped courses with Decimal numbers, as boto3 returns them"""
+    rng = random.Random(seed)
+    words = "data systems theory design networks security analysis applied advanced".split()
+    courses = []
+    for i in range(count):
+        sections = [{
+            'section_id': f"sec-{i}-{s}",
+            'section_code': f"{s + 1:02d}",
+            'max_students': Decimal(40),
+            'enrolled_count': Decimal(rng.randint(0, 40)),
+            'teacher_id': f"teacher-{rng.randint(1, 80)}",
+            'is_active': True
+        } for s in range(rng.randint(0, 3))]
+        courses.append({
+            'course_id': f"course-{i:05d}",
+            'course_code': f"CS{100 + i}",
+            'course_name': " ".join(rng.choice(words) for _ in range(3)).title(),
+            'description': " ".join(rng.choice(words) for _ in range(rng.randint(20, 120))),
+            'credits': Decimal(rng.choice([2, 3, 4])),
+            'max_students': Decimal(120),
+            'enrolled_count': Decimal(rng.randint(0, 120)),
+            'rating': Decimal(str(round(rng.uniform(1, 5), 2))),
+            'semester': "Fall 2025",
+            'department': rng.choice(words).title(),
+            'is_active': True,
+            'sections': sections
+        })
+    return courses
+
+
+def json_path(value):
+    """Previous RedisCache.set/get: stdlib json text"""
+    raw = json.dumps(value, default=json_default)
+    return raw, json.loads(raw)
+
+
+def codec_path(min_bytes, codec_name=None):
+    def run(value):
+        raw = cache_codec.encode(value, min_bytes=min_bytes, codec_name=codec_name)
+        return raw, cache_codec.decode(raw)
+    return run
+
+
+def measure(run, value, rounds):
+    """(encode+decode ms per round, stored bytes)"""
+    run(value)  # warm up
+    started = time.perf_counter()
+    for _ in range(rounds):
+        raw, _ = run(value)
+    elapsed = (time.perf_counter() - started) / rounds
+    return elapsed * 1000, len(raw)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Redis value codec benchmark")
+    parser.add_argument('--courses', type=int, nargs='+', default=[50, 500, 2000])
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    variants = [
+        ("json (previous)", json_path),
+        ("codec, no compression", codec_path(0)),
+        ("codec + zlib", codec_path(1, 'zlib')),
+    ]
+    if zstandard is not None:
+        variants.append(("codec + zstd", codec_path(1, 'zstd')))
+    print(f"🧪 JSON encoder: {'orjson' if cache_codec.orjson else 'stdlib json'}, {args.rounds} rounds")
+
+    for count in args.courses:
+        courses = make_courses(count)
+        print(f"\n📚 {count} courses")
+        baseline = None
+        for name, run in variants:
+            ms, size = measure(run, courses, args.rounds)
+            baseline = baseline or ms
+            print(f"  {name:24}{ms:>9.2f} ms{size / 1024:>10.1f} KB{baseline / ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Report RCU savings from attribute compression
+Scans every table with declared ATTRIBUTE_CODECS and compares item sizes
+and read cost uncompressed vs. compressed
+
+Usage: python scripts/compression_report.py [--min-bytes 512] [--codec zlib]
+"""
+import sys
+import os
+import math
+import asyncio
+import argparse
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.dynamodb import db, scan_all_items, decode_item, ATTRIBUTE_CODECS
+from app.attribute_codecs import encode_value
+from app.item_size import item_size, read_units, READ_UNIT_BYTES
+
+
+def summarize(table_name, items, codecs, min_bytes, codec_override):
+    """Size/RCU totals for one table, plain vs. compressed"""
+    plain_sizes = []
+    compressed_sizes = []
+
+    for stored in items:
+        plain = decode_item(table_name, dict(stored))
+        compressed = dict(plain)
+        for name, codec_name in codecs.items():
+            if name in compressed:
+                compressed[name] = encode_value(compressed[name], codec_override or codec_name, min_bytes)
+        plain_sizes.append(item_size(plain))
+        compressed_sizes.append(item_size(compressed))
+
+    def totals(sizes):
+        return {
+            'bytes': sum(sizes),
+            'avg': sum(sizes) / len(sizes) if sizes else 0,
+            'over_4kb': sum(1 for s in sizes if s > READ_UNIT_BYTES),
+            'get_rcu': sum(read_units(s) for s in sizes),
+            'scan_rcu': math.ceil(sum(sizes) / READ_UNIT_BYTES) / 2
+        }
+
+    return totals(plain_sizes), totals(compressed_sizes)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Attribute compression RCU report")
+    parser.add_argument('--min-bytes', type=int, default=512, help="compression threshold")
+    parser.add_argument('--codec', choices=['zlib', 'zstd'], help="override declared codec")
+    args = parser.parse_args()
+
+    db.connect()
+    try:
+        for table_name, codecs in ATTRIBUTE_CODECS.items():
+            items = await scan_all_items(table_name, decode=False)
+            print(f"\n📦 {table_name}: {len(items)} items, codecs {codecs}")
+            if not items:
+                continue
+
+            plain, compressed = summarize(table_name, items, codecs, args.min_bytes, args.codec)
+            print(f"  {'':28}{'plain':>14}{'compressed':>14}{'saving':>10}")
+            for label, key in [
+                ("Total bytes", 'bytes'),
+                ("Avg item bytes", 'avg'),
+                ("Items over 4 KB", 'over_4kb'),
+                ("RCU: GetItem every item", 'get_rcu'),
+                ("RCU: full Scan/Query", 'scan_rcu'),
+            ]:
+                before, after = plain[key], compressed[key]
+                saving = f"{(1 - after / before) * 100:.1f}%" if before else "-"
+                print(f"  {label:28}{before:>14.1f}{after:>14.1f}{saving:>10}")
+    finally:
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
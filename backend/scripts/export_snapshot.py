@@ -0,0 +1,253 @@
+"""
+Columnar snapshot export for offline analytics
+Parallel-scans Courses, Enrollments and Users once and writes them as
+compact columnar files, so analytics run against the snapshot instead of
+scanning the live tables.
+
+Formats:
+  npy      one .npy per column (numpy): numbers as int64/float64 with a
+           .mask.npy for missing values, strings dictionary-encoded as
+           int32 codes (-1 = missing) + .dict.json
+  parquet  one .parquet per table (pyarrow), strings as dictionary arrays
+
+Nested values (lists/maps) are stored as JSON strings. Secrets
+(password_hash) are never exported.
+
+Usage:
+    python scripts/export_snapshot.py [--out snapshots] [--format npy|parquet]
+                                      [--tables Courses Enrollments Users] [--segments 8]
+    python scripts/export_snapshot.py --report snapshots/20251019T120000
+"""
+import sys
+import os
+import json
+import time
+import asyncio
+import argparse
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional dependency
+    pa = None
+
+from app.dynamodb import db, scan_pages, Tables
+
+DEFAULT_TABLES = [Tables.COURSES, Tables.ENROLLMENTS, Tables.USERS]
+EXCLUDED_COLUMNS = {'password_hash'}
+
+
+class ColumnBuilder:
+    """Accumulates one attribute across rows and infers its column type"""
+
+    def __init__(self, rows_before: int):
+        self.values = [None] * rows_before
+        self.kinds = set()
+
+    def append(self, value):
+        if value is None:
+            self.values.append(None)
+            return
+        if isinstance(value, bool):
+            self.kinds.add('bool')
+        elif isinstance(value, (int, float, Decimal)):
+            self.kinds.add('int' if value == int(value) else 'float')
+        elif isinstance(value, str):
+            self.kinds.add('string')
+        else:
+            self.kinds.add('json')
+            value = json.dumps(value, default=str, sort_keys=True)
+        self.values.append(value)
+
+    @property
+    def kind(self) -> str:
+        if self.kinds <= {'bool'}:
+            return 'bool'
+        if self.kinds <= {'int'}:
+            return 'int'
+        if self.kinds <= {'int', 'float'}:
+            return 'float'
+        return 'string'
+
+
+class TableBuilder:
+    """Row-at-a-time input, column-at-a-time output"""
+
+    def __init__(self):
+        self.rows = 0
+        self.columns = {}
+
+    def add_page(self, items):
+        for item in items:
+            for name in item.keys() - self.columns.keys() - EXCLUDED_COLUMNS:
+                self.columns[name] = ColumnBuilder(self.rows)
+            for name, column in self.columns.items():
+                column.append(item.get(name))
+            self.rows += 1
+
+
+def dictionary_encode(values):
+    """(codes, dictionary) with -1 for missing values"""
+    index = {}
+    codes = np.empty(len(values), dtype=np.int32)
+    for i, value in enumerate(values):
+        if value is None:
+            codes[i] = -1
+        else:
+            codes[i] = index.setdefault(str(value), len(index))
+    return codes, list(index)
+
+
+def write_npy(table_dir, table):
+    os.makedirs(table_dir, exist_ok=True)
+    schema = {}
+    for name, column in table.columns.items():
+        base = os.path.join(table_dir, name)
+        kind = column.kind
+        if kind == 'string':
+            codes, dictionary = dictionary_encode(column.values)
+            np.save(f"{base}.npy", codes)
+            with open(f"{base}.dict.json", 'w') as f:
+                json.dump(dictionary, f)
+        else:
+            dtype = {'bool': np.bool_, 'int': np.int64, 'float': np.float64}[kind]
+            missing = np.array([v is None for v in column.values], dtype=np.bool_)
+            data = np.array([0 if v is None else v for v in column.values]).astype(dtype)
+            np.save(f"{base}.npy", data)
+            if missing.any():
+                np.save(f"{base}.mask.npy", missing)
+        schema[name] = kind
+    return schema
+
+
+def write_parquet(path, table):
+    arrays, names, schema = [], [], {}
+    for name, column in table.columns.items():
+        kind = column.kind
+        if kind == 'string':
+            array = pa.array([None if v is None else str(v) for v in column.values]).dictionary_encode()
+        elif kind == 'float':
+            array = pa.array([None if v is None else float(v) for v in column.values], type=pa.float64())
+        elif kind == 'int':
+            array = pa.array([None if v is None else int(v) for v in column.values], type=pa.int64())
+        else:
+            array = pa.array(column.values, type=pa.bool_())
+        arrays.append(array)
+        names.append(name)
+        schema[name] = kind
+    pq.write_table(pa.Table.from_arrays(arrays, names=names), path, compression='zstd')
+    return schema
+
+
+async def scan_table(table_name, segments):
+    """Parallel scan into a TableBuilder"""
+    table = TableBuilder()
+
+    async def run_segment(segment):
+        async for page in scan_pages(table_name, segment=segment, total_segments=segments):
+            table.add_page(page)
+
+    await asyncio.gather(*[run_segment(s) for s in range(segments)])
+    return table
+
+
+def load_table(snapshot_dir, table_name):
+    """npy snapshot table -> {column: ndarray}; strings decoded to object arrays"""
+    table_dir = os.path.join(snapshot_dir, table_name)
+    with open(os.path.join(snapshot_dir, 'manifest.json')) as f:
+        schema = json.load(f)['tables'][table_name]['columns']
+
+    columns = {}
+    for name, kind in schema.items():
+        base = os.path.join(table_dir, name)
+        data = np.load(f"{base}.npy")
+        if kind == 'string':
+            with open(f"{base}.dict.json") as f:
+                dictionary = np.array(json.load(f) + [None], dtype=object)
+            data = dictionary[data]     # code -1 picks the trailing None
+        elif os.path.exists(f"{base}.mask.npy"):
+            data = np.ma.masked_array(data, mask=np.load(f"{base}.mask.npy"))
+        columns[name] = data
+    return columns
+
+
+def report(snapshot_dir):
+    """Example offline analysis: fill rates and enrollments per department"""
+    courses = load_table(snapshot_dir, Tables.COURSES)
+    enrollments = load_table(snapshot_dir, Tables.ENROLLMENTS)
+
+    enrolled = np.asarray(courses['enrolled_count'], dtype=np.float64)
+    capacity = np.asarray(courses['max_students'], dtype=np.float64)
+    fill = np.divide(enrolled, capacity, out=np.zeros_like(enrolled), where=capacity > 0)
+    print(f"\n📈 Fill rate over {len(fill)} courses: "
+          f"mean {fill.mean():.1%}, p50 {np.median(fill):.1%}, full {int((fill >= 1).sum())}")
+
+    department_of = dict(zip(courses['course_id'], courses['department']))
+    per_department = defaultdict(int)
+    for course_id in enrollments['course_id']:
+        per_department[department_of.get(course_id) or 'unknown'] += 1
+    print("\n🏛️  Enrollments per department")
+    for department, count in sorted(per_department.items(), key=lambda kv: -kv[1]):
+        print(f"  {department:30}{count:>8}")
+
+
+async def export(args):
+    stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S')
+    snapshot_dir = os.path.join(args.out, stamp)
+    os.makedirs(snapshot_dir, exist_ok=True)
+    manifest = {'created_at': datetime.utcnow().isoformat(), 'format': args.format, 'tables': {}}
+
+    for table_name in args.tables:
+        started = time.perf_counter()
+        table = await scan_table(table_name, args.segments)
+        if args.format == 'parquet':
+            schema = write_parquet(os.path.join(snapshot_dir, f"{table_name}.parquet"), table)
+        else:
+            schema = write_npy(os.path.join(snapshot_dir, table_name), table)
+        manifest['tables'][table_name] = {'rows': table.rows, 'columns': schema}
+        print(f"📦 {table_name}: {table.rows} rows, {len(schema)} columns "
+              f"in {time.perf_counter() - started:.1f}s")
+
+    with open(os.path.join(snapshot_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"✅ Snapshot written to {snapshot_dir}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Columnar snapshot export")
+    parser.add_argument('--out', default='snapshots', help="output directory")
+    parser.add_argument('--format', choices=['npy', 'parquet'], default='npy')
+    parser.add_argument('--tables', nargs='+', default=DEFAULT_TABLES)
+    parser.add_argument('--segments', type=int, default=8, help="parallel scan segments")
+    parser.add_argument('--report', metavar='SNAPSHOT_DIR', help="analyze an npy snapshot instead of exporting")
+    args = parser.parse_args()
+
+    if np is None:
+        sys.exit("numpy is required: pip install numpy")
+    if args.format == 'parquet' and pa is None:
+        sys.exit("pyarrow is required for parquet: pip install pyarrow")
+
+    if args.report:
+        report(args.report)
+        return
+
+    db.connect()
+    try:
+        await export(args)
+    finally:
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""
+Backfill the single-table course layout
+Copies Courses, CourseSections and CourseSchedules into per-course item
+collections in CourseCollections (see app/course_repository.py).
+Idempotent: items are overwritten by key, so it can be re-run before
+switching COURSE_LAYOUT to single_table.
+
+Usage: python scripts/migrate_course_collections.py [--dry-run]
+"""
+import sys
+import os
+import asyncio
+import argparse
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.dynamodb import db, scan_pages, create_auxiliary_tables, Tables, ATTRIBUTE_CODECS
+from app.attribute_codecs import encode_attributes
+from app.course_repository import course_item, section_item, schedule_item
+
+
+async def load(table_name):
+    items = []
+    async for page in scan_pages(table_name):
+        items.extend(page)
+    print(f"  {table_name}: {len(items)} items")
+    return items
+
+
+def build_collection_items(courses, sections, schedules):
+    """Map per-entity items to collection items; returns (items, orphans)"""
+    course_ids = {c['course_id'] for c in courses}
+    section_course = {s['section_id']: s['course_id'] for s in sections if s.get('course_id') in course_ids}
+
+    items = [course_item(c) for c in courses]
+    items += [section_item(s) for s in sections if s['section_id'] in section_course]
+    items += [
+        schedule_item(s, section_course[s['section_id']])
+        for s in schedules if s.get('section_id') in section_course
+    ]
+    orphans = (len(sections) + len(schedules)) - (len(items) - len(courses))
+    return items, orphans
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Backfill CourseCollections")
+    parser.add_argument('--dry-run', action='store_true', help="count items without writing")
+    args = parser.parse_args()
+
+    db.connect()
+    try:
+        print("📖 Reading source tables...")
+        courses = await load(Tables.COURSES)
+        sections = await load(Tables.COURSE_SECTIONS)
+        schedules = await load(Tables.COURSE_SCHEDULES)
+
+        items, orphans = build_collection_items(courses, sections, schedules)
+        print(f"🧩 {len(items)} collection items for {len(courses)} courses")
+        if orphans:
+            print(f"⚠️  Skipping {orphans} sections/schedules with no matching course")
+        if args.dry_run:
+            return
+
+        create_auxiliary_tables()
+        codecs = ATTRIBUTE_CODECS.get(Tables.COURSE_COLLECTIONS, {})
+        table = db.get_table(Tables.COURSE_COLLECTIONS)
+
+        def write_all():
+            with table.batch_writer(overwrite_by_pkeys=['pk', 'sk']) as batch:
+                for item in items:
+                    batch.put_item(Item=encode_attributes(codecs, item))
+
+        await asyncio.get_running_loop().run_in_executor(None, write_all)
+        print(f"✅ Wrote {len(items)} items to {db.table_name(Tables.COURSE_COLLECTIONS)}")
+    finally:
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
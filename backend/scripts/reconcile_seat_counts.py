@@ -0,0 +1,62 @@
+"""
+Reconcile Courses.enrolled_count with the Enrollments table
+Parallel-scans both tables, repairs drifted counts with conditional
+updates and prints a drift report.
+
+Usage: python scripts/reconcile_seat_counts.py [--segments 8] [--dry-run] [--json]
+                                               [--every SECONDS]
+"""
+import sys
+import os
+import json
+import asyncio
+import argparse
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.dynamodb import db
+from app.reconciliation import reconcile_seat_counts, DEFAULT_SEGMENTS
+
+
+def print_report(report, as_json):
+    if as_json:
+        print(json.dumps(report.to_dict(), indent=2))
+        return
+
+    summary = report.summary()
+    print(f"\n📊 Scanned {summary['courses_scanned']} courses, "
+          f"{summary['enrollments_counted']} active enrollments in {summary['seconds']}s")
+    if not report.drifted:
+        print("✅ No drift")
+        return
+
+    print(f"⚠️  {summary['drifted']} seat counters drifted ({summary['seats_drift']} seats)")
+    print(f"  {'course_id':38}{'section_id':38}{'recorded':>10}{'actual':>10}{'delta':>8}  status")
+    for drift in sorted(report.drifted, key=lambda d: -abs(d.delta)):
+        print(f"  {drift.course_id:38}{drift.section_id or '-':38}"
+              f"{drift.recorded:>10}{drift.actual:>10}{drift.delta:>+8}  {drift.status}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Seat-count reconciliation")
+    parser.add_argument('--segments', type=int, default=DEFAULT_SEGMENTS, help="parallel scan segments")
+    parser.add_argument('--dry-run', action='store_true', help="report drift without repairing")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    parser.add_argument('--every', type=int, help="keep running, once every N seconds")
+    args = parser.parse_args()
+
+    db.connect()
+    try:
+        while True:
+            report = await reconcile_seat_counts(args.segments, args.dry_run)
+            print_report(report, args.json)
+            if not args.every:
+                break
+            await asyncio.sleep(args.every)
+    finally:
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())